@@ -1,5 +1,6 @@
 package com.u1mobis.dashboard_backend.controller;
 
+import java.util.List;
 import java.util.Map;
 
 import org.springframework.http.ResponseEntity;
@@ -49,4 +50,32 @@ public class IoTDataController {
             ));
         }
     }
+    
+    /**
+     * Data Collector에서 원시 IoT 데이터 일괄 수신 (JSON 배열, all-or-nothing)
+     */
+    @PostMapping("/iot-data/batch")
+    public ResponseEntity<Map<String, String>> receiveIoTDataBatch(@RequestBody List<Map<String, Object>> iotDataList) {
+        try {
+            log.info("IoT 데이터 일괄 수신: {}건", iotDataList.size());
+            
+            // 전체 성공 또는 전체 실패 - 실패 시 수집기가 배치를 그대로 재전송
+            iotDataService.processIoTDataBatch(iotDataList);
+            
+            return ResponseEntity.ok(Map.of(
+                "status", "success",
+                "message", iotDataList.size() + "건의 IoT 데이터가 성공적으로 처리되었습니다.",
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+            
+        } catch (Exception e) {
+            log.error("IoT 데이터 일괄 처리 중 오류 발생", e);
+            
+            return ResponseEntity.status(500).body(Map.of(
+                "status", "error",
+                "message", "IoT 데이터 일괄 처리 중 오류가 발생했습니다: " + e.getMessage(),
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+        }
+    }
 }
\ No newline at end of file
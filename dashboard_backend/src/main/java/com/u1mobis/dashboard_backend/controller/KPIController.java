@@ -1,5 +1,6 @@
 package com.u1mobis.dashboard_backend.controller;
 
+import java.util.List;
 import java.util.Map;
 
 import org.springframework.http.ResponseEntity;
@@ -52,6 +53,67 @@ public class KPIController {
         }
     }
     
+    /**
+     * Data Collector에서 주기 발행한 스테이션 KPI 스냅샷 일괄 수신 (JSON 배열, all-or-nothing)
+     */
+    @PostMapping("/data/batch")
+    public ResponseEntity<Map<String, String>> receiveKPIDataBatch(@RequestBody List<Map<String, Object>> kpiDataList) {
+        try {
+            log.info("KPI 데이터 일괄 수신: {}건", kpiDataList.size());
+            
+            // 한 트랜잭션으로 저장 - 실패 시 전체 롤백, 수집기가 배치를 그대로 재전송
+            kpiService.processKPIDataBatch(kpiDataList);
+            
+            return ResponseEntity.ok(Map.of(
+                "status", "success",
+                "message", kpiDataList.size() + "건의 KPI 데이터가 성공적으로 처리되었습니다.",
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+            
+        } catch (Exception e) {
+            log.error("KPI 데이터 일괄 처리 중 오류 발생", e);
+            
+            return ResponseEntity.status(500).body(Map.of(
+                "status", "error",
+                "message", "KPI 데이터 일괄 처리 중 오류가 발생했습니다: " + e.getMessage(),
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+        }
+    }
+    
+    /**
+     * Data Collector에서 확정된 이벤트 시간 KPI 윈도우 일괄 수신 (시간별/교대조/슬라이딩)
+     */
+    @PostMapping("/windows")
+    public ResponseEntity<Map<String, String>> receiveKPIWindows(@RequestBody List<Map<String, Object>> windows) {
+        try {
+            kpiService.processKPIWindows(windows);
+            
+            return ResponseEntity.ok(Map.of(
+                "status", "success",
+                "message", windows.size() + "건의 KPI 윈도우가 성공적으로 처리되었습니다.",
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+            
+        } catch (Exception e) {
+            log.error("KPI 윈도우 처리 중 오류 발생", e);
+            
+            return ResponseEntity.status(500).body(Map.of(
+                "status", "error",
+                "message", "KPI 윈도우 처리 중 오류가 발생했습니다: " + e.getMessage(),
+                "timestamp", java.time.LocalDateTime.now().toString()
+            ));
+        }
+    }
+    
+    /**
+     * 스테이션별 최신 KPI 윈도우 조회
+     */
+    @GetMapping("/windows/{stationId}")
+    public ResponseEntity<Map<String, Object>> getStationKPIWindows(@PathVariable String stationId) {
+        return ResponseEntity.ok(kpiService.getStationKPIWindows(stationId));
+    }
+    
     /**
      * 최신 KPI 데이터 조회 (React에서 사용)
      */
@@ -56,6 +56,25 @@ public class IoTDataDto {
     @JsonProperty("derivedMetrics")
     private Map<String, Object> derivedMetrics;
     
+    // 텔레메트리 롤업 (dataType = "telemetry_rollup")
+    @JsonProperty("dataType")
+    private String dataType;
+    
+    @JsonProperty("windowStart")
+    private String windowStart;
+    
+    @JsonProperty("windowEnd")
+    private String windowEnd;
+    
+    @JsonProperty("windowSeconds")
+    private Double windowSeconds;
+    
+    @JsonProperty("sampleCount")
+    private Integer sampleCount;
+    
+    @JsonProperty("metrics")
+    private Map<String, Map<String, Object>> metrics;
+    
     @JsonProperty("processedAt")
     private String processedAt;
     
@@ -188,7 +188,7 @@ public class InfluxDB3Service {
     /**
      * Line Protocol 문자열 생성
      */
-    private String buildLineProtocol(String measurement, Map<String, String> tags, 
+    public String buildLineProtocol(String measurement, Map<String, String> tags, 
                                    Map<String, Object> fields, Instant timestamp) {
         StringBuilder sb = new StringBuilder();
         sb.append(escapeValue(measurement));
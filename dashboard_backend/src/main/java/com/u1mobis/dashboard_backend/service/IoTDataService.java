@@ -2,6 +2,8 @@ package com.u1mobis.dashboard_backend.service;
 
 import java.time.LocalDateTime;
 import java.time.format.DateTimeFormatter;
+import java.util.ArrayList;
+import java.util.List;
 import java.util.Map;
 
 import org.springframework.stereotype.Service;
@@ -33,75 +35,127 @@ public class IoTDataService {
         }
     }
     
+    /**
+     * 일괄 처리 (all-or-nothing)
+     * 모든 레코드를 먼저 line protocol로 변환한 뒤 한 번의 쓰기 요청으로 저장하고, 실패하면 예외를 던진다.
+     * 수집기는 배치 전체를 재전송하며, InfluxDB는 같은 measurement/tag/timestamp 포인트를 덮어쓰므로
+     * 재전송으로 중복 행이 생기지 않는다 (timestamp가 없으면 processedAt 사용 - 재전송해도 같은 값).
+     */
+    public void processIoTDataBatch(List<Map<String, Object>> iotDataList) {
+        List<String> lines = new ArrayList<>(iotDataList.size());
+        for (Map<String, Object> iotData : iotDataList) {
+            lines.add(toLineProtocol(iotData));
+        }
+        
+        Boolean written = influxDB3Service.writeBatchData(lines).block();
+        if (!Boolean.TRUE.equals(written)) {
+            throw new RuntimeException("InfluxDB 일괄 저장 실패: " + lines.size() + "건");
+        }
+        log.info("IoT 데이터 일괄 저장 완료 - {}건", lines.size());
+    }
+    
     private void saveToInfluxDB(Map<String, Object> iotData) {
         try {
             String stationId = (String) iotData.get("stationId");
-            String timestamp = (String) iotData.get("timestamp");
+            influxDB3Service.writeData("IOT-sensor", buildTags(iotData), buildFields(iotData), parseInstant(iotData));
             
-            // InfluxDB 3.x writeData 메서드에 맞는 파라미터 준비
-            Map<String, String> tags = new java.util.HashMap<>();
-            Map<String, Object> fields = new java.util.HashMap<>();
+            log.debug("InfluxDB 저장 완료 - Station: {}", stationId);
             
-            // 태그 추가
-            tags.put("station_id", stationId);
-            if (iotData.containsKey("processType")) {
-                tags.put("process_type", (String) iotData.get("processType"));
+        } catch (Exception e) {
+            log.error("InfluxDB 저장 중 오류 발생", e);
+            // InfluxDB 오류는 전체 프로세스를 중단시키지 않음
+        }
+    }
+    
+    private String toLineProtocol(Map<String, Object> iotData) {
+        return influxDB3Service.buildLineProtocol("IOT-sensor", buildTags(iotData), buildFields(iotData),
+            parseInstant(iotData));
+    }
+    
+    private Map<String, String> buildTags(Map<String, Object> iotData) {
+        Map<String, String> tags = new java.util.HashMap<>();
+        tags.put("station_id", (String) iotData.get("stationId"));
+        if (iotData.containsKey("processType")) {
+            tags.put("process_type", (String) iotData.get("processType"));
+        }
+        if (iotData.containsKey("location")) {
+            tags.put("location", (String) iotData.get("location"));
+        }
+        if ("telemetry_rollup".equals(iotData.get("dataType"))) {
+            tags.put("data_type", "telemetry_rollup");
+        }
+        return tags;
+    }
+    
+    @SuppressWarnings("unchecked")
+    private Map<String, Object> buildFields(Map<String, Object> iotData) {
+        Map<String, Object> fields = new java.util.HashMap<>();
+        
+        // 센서 데이터
+        if (iotData.containsKey("sensors")) {
+            Map<String, Object> sensors = (Map<String, Object>) iotData.get("sensors");
+            for (Map.Entry<String, Object> entry : sensors.entrySet()) {
+                fields.put("sensor_" + entry.getKey(), entry.getValue());
             }
-            if (iotData.containsKey("location")) {
-                tags.put("location", (String) iotData.get("location"));
+        }
+        
+        // 생산 데이터
+        if (iotData.containsKey("production")) {
+            Map<String, Object> production = (Map<String, Object>) iotData.get("production");
+            for (Map.Entry<String, Object> entry : production.entrySet()) {
+                fields.put("production_" + entry.getKey(), entry.getValue());
             }
-            
-            // 필드 추가
-            // 센서 데이터
-            if (iotData.containsKey("sensors")) {
-                Map<String, Object> sensors = (Map<String, Object>) iotData.get("sensors");
-                for (Map.Entry<String, Object> entry : sensors.entrySet()) {
-                    fields.put("sensor_" + entry.getKey(), entry.getValue());
-                }
+        }
+        
+        // 품질 데이터
+        if (iotData.containsKey("quality")) {
+            Map<String, Object> quality = (Map<String, Object>) iotData.get("quality");
+            for (Map.Entry<String, Object> entry : quality.entrySet()) {
+                fields.put("quality_" + entry.getKey(), entry.getValue());
             }
-            
-            // 생산 데이터
-            if (iotData.containsKey("production")) {
-                Map<String, Object> production = (Map<String, Object>) iotData.get("production");
-                for (Map.Entry<String, Object> entry : production.entrySet()) {
-                    fields.put("production_" + entry.getKey(), entry.getValue());
-                }
+        }
+        
+        // 텔레메트리 롤업 (Data Collector 다운샘플링): metrics.{센서 경로}.{min,max,mean,last,count}
+        if ("telemetry_rollup".equals(iotData.get("dataType"))) {
+            if (iotData.get("windowSeconds") instanceof Number windowSeconds) {
+                fields.put("window_seconds", windowSeconds);
             }
-            
-            // 품질 데이터
-            if (iotData.containsKey("quality")) {
-                Map<String, Object> quality = (Map<String, Object>) iotData.get("quality");
-                for (Map.Entry<String, Object> entry : quality.entrySet()) {
-                    fields.put("quality_" + entry.getKey(), entry.getValue());
-                }
+            if (iotData.get("sampleCount") instanceof Number sampleCount) {
+                fields.put("sample_count", sampleCount);
             }
-            
-            // 기본 필드 추가 (필드가 비어있으면 안됨)
-            if (fields.isEmpty()) {
-                fields.put("value", 1.0);
+            if (iotData.get("metrics") instanceof Map<?, ?> metrics) {
+                for (Map.Entry<?, ?> metric : metrics.entrySet()) {
+                    if (!(metric.getValue() instanceof Map<?, ?> stats)) {
+                        continue;
+                    }
+                    for (Map.Entry<?, ?> stat : stats.entrySet()) {
+                        fields.put(metric.getKey() + "_" + stat.getKey(), stat.getValue());
+                    }
+                }
             }
-            
-            // 타임스탬프 파싱
-            java.time.Instant instant;
-            if (timestamp != null) {
+        }
+        
+        // 기본 필드 추가 (필드가 비어있으면 안됨)
+        if (fields.isEmpty()) {
+            fields.put("value", 1.0);
+        }
+        return fields;
+    }
+    
+    /**
+     * 포인트 시각: timestamp, 없거나 형식 오류면 processedAt (재전송해도 같은 값), 둘 다 없으면 현재 시각
+     */
+    private java.time.Instant parseInstant(Map<String, Object> iotData) {
+        for (String key : List.of("timestamp", "processedAt")) {
+            if (iotData.get(key) instanceof String value) {
                 try {
-                    LocalDateTime dateTime = LocalDateTime.parse(timestamp.replace("Z", ""));
-                    instant = dateTime.atZone(java.time.ZoneId.systemDefault()).toInstant();
+                    LocalDateTime dateTime = LocalDateTime.parse(value.replace("Z", ""));
+                    return dateTime.atZone(java.time.ZoneId.systemDefault()).toInstant();
                 } catch (Exception e) {
-                    instant = java.time.Instant.now();
+                    // 다음 후보 사용
                 }
-            } else {
-                instant = java.time.Instant.now();
             }
-            
-            // InfluxDB에 쓰기
-            influxDB3Service.writeData("IOT-sensor", tags, fields, instant);
-            
-            log.debug("InfluxDB 저장 완료 - Station: {}", stationId);
-            
-        } catch (Exception e) {
-            log.error("InfluxDB 저장 중 오류 발생", e);
-            // InfluxDB 오류는 전체 프로세스를 중단시키지 않음
         }
+        return java.time.Instant.now();
     }
-}
\ No newline at end of file
+}
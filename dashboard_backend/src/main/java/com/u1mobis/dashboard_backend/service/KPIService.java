@@ -6,6 +6,7 @@ import java.util.HashMap;
 import java.util.List;
 import java.util.Map;
 import java.util.Optional;
+import java.util.concurrent.ConcurrentHashMap;
 
 import org.springframework.stereotype.Service;
 import org.springframework.transaction.annotation.Transactional;
@@ -25,6 +26,9 @@ public class KPIService {
     private final KPIDataRepository kpiDataRepository;
     private final ObjectMapper objectMapper;
     
+    // 스테이션별 최신 확정 KPI 윈도우 (windowType → 레코드)
+    private final Map<String, Map<String, Map<String, Object>>> latestWindows = new ConcurrentHashMap<>();
+    
     @Transactional
     public void processKPIData(Map<String, Object> rawData) {
         try {
@@ -42,6 +46,47 @@ public class KPIService {
         }
     }
     
+    /**
+     * 일괄 저장 (all-or-nothing) - 전체를 먼저 변환한 뒤 한 트랜잭션으로 저장
+     * 한 건이라도 실패하면 전체 롤백되므로 수집기가 배치를 재전송해도 중복 행이 생기지 않는다.
+     */
+    @Transactional
+    public void processKPIDataBatch(List<Map<String, Object>> rawDataList) {
+        List<KPIData> entities = new java.util.ArrayList<>(rawDataList.size());
+        for (Map<String, Object> rawData : rawDataList) {
+            entities.add(convertToEntity(rawData));
+        }
+        kpiDataRepository.saveAll(entities);
+        kpiDataRepository.flush();
+        
+        log.info("KPI 데이터 일괄 저장 완료 - {}건", entities.size());
+    }
+    
+    public void processKPIWindows(List<Map<String, Object>> windows) {
+        for (Map<String, Object> window : windows) {
+            Object stationId = window.get("station_id");
+            Object windowType = window.get("window_type");
+            if (stationId == null || windowType == null) {
+                continue;
+            }
+            latestWindows
+                .computeIfAbsent(stationId.toString(), key -> new ConcurrentHashMap<>())
+                .put(windowType.toString(), window);
+        }
+        log.info("KPI 윈도우 수신: {}건", windows.size());
+    }
+    
+    public Map<String, Object> getStationKPIWindows(String stationId) {
+        Map<String, Map<String, Object>> windows = latestWindows.get(stationId);
+        if (windows == null) {
+            return Map.of(
+                "stationId", stationId,
+                "message", "해당 스테이션의 KPI 윈도우 데이터가 없습니다."
+            );
+        }
+        return new HashMap<>(windows);
+    }
+    
     public Map<String, Object> getLatestKPIData() {
         try {
             List<KPIData> latestKPIs = kpiDataRepository.findLatestKPIByAllStations();
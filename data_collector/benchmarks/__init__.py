@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Data Collector 벤치마크
+"""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+JSON 코덱 마이크로 벤치마크
+실제 스테이션 시뮬레이터 페이로드로 코덱별 직렬화/역직렬화 비용 비교
+
+사용법 (data_collector 디렉토리에서):
+    python benchmarks/bench_codec.py --stations 15 --rounds 20 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+COLLECTOR_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COLLECTOR_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTOR_ROOT)
+
+from src.codec import available_codecs, get_codec  # noqa: E402
+from benchmarks.station_payloads import sample_payloads  # noqa: E402
+
+
+def _best_of(repeat: int, func) -> float:
+    """repeat회 실행 중 최소 소요 시간 (초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(stations: int, rounds: int, repeat: int):
+    messages = sample_payloads(stations, rounds)
+    payloads = [data for _, data in messages]
+    count = len(payloads)
+
+    print(f"📦 페이로드: {count}건 (스테이션 {stations}개 × {rounds}라운드)")
+
+    results = {}
+    for name in available_codecs():
+        codec = get_codec(name)
+        encoded = [codec.dumps(data) for data in payloads]
+
+        dumps_time = _best_of(repeat, lambda: [codec.dumps(data) for data in payloads])
+        loads_time = _best_of(repeat, lambda: [codec.loads(item) for item in encoded])
+
+        results[name] = {
+            "dumps_us": dumps_time / count * 1e6,
+            "loads_us": loads_time / count * 1e6,
+            "avg_bytes": sum(len(item) for item in encoded) / count
+        }
+
+    baseline = results["json"]["dumps_us"] + results["json"]["loads_us"]
+
+    print(f"{'codec':<8} {'dumps µs/msg':>14} {'loads µs/msg':>14} {'avg bytes':>10} {'vs json':>9}")
+    for name, result in results.items():
+        total = result["dumps_us"] + result["loads_us"]
+        print(f"{name:<8} {result['dumps_us']:>14.2f} {result['loads_us']:>14.2f} "
+              f"{result['avg_bytes']:>10.0f} {baseline / total:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 코덱 마이크로 벤치마크")
+    parser.add_argument("--stations", type=int, default=15, help="스테이션 수")
+    parser.add_argument("--rounds", type=int, default=20, help="스테이션당 라운드 수 (10초 분량/라운드)")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (최소값 사용)")
+    args = parser.parse_args()
+
+    run(args.stations, args.rounds, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+DataCollector 처리량 벤치마크
+실제 스테이션 시뮬레이터 페이로드를 가짜 브로커(paho 콜백 직접 호출)로 주입하고,
+응답 지연/오류를 주입할 수 있는 프로세스 내 HTTP 서버를 백엔드로 사용
+
+사용법 (data_collector 디렉토리에서):
+    python benchmarks/bench_collector.py --stations 15,150,1500 --rounds 5
+    python benchmarks/bench_collector.py --stations 150 --backend-latency-ms 20 --error-rate 0.05
+    python benchmarks/bench_collector.py --stations 150 --no-shedding
+    python benchmarks/bench_collector.py --stations 150 --config-features   # 설정 파일의 기능 on/off 그대로
+
+기본은 선택 기능(spool, 다운샘플링, 지연 추적, KPI 주기 발행/윈도우/체크포인트, journey)을 모두 켠 전체 파이프라인 측정
+
+recv/s는 주입한 메시지 수 기준(레인 정책으로 병합/폐기된 메시지 포함), proc/s는 실제 처리한 메시지 기준
+"""
+
+import argparse
+import contextlib
+import gc
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+
+COLLECTOR_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COLLECTOR_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTOR_ROOT)
+
+from src.codec import get_codec  # noqa: E402
+from benchmarks.station_payloads import create_stations, generate_messages  # noqa: E402
+from tools.recording_server import RecordingServer  # noqa: E402
+
+
+class _FakeMQTTMessage:
+    """paho MQTTMessage 대역 (topic, payload만 사용)"""
+
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+def _rss_bytes() -> int:
+    """현재 RSS (Linux는 /proc, 그 외는 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_messages(station_count: int, rounds: int, codec):
+    """시뮬레이터 페이로드를 미리 직렬화 (측정 구간에서 생성 비용 제외)"""
+    stations = create_stations(station_count)
+    return [_FakeMQTTMessage(topic, codec.dumps(payload))
+            for topic, payload in generate_messages(stations, rounds)]
+
+
+def write_config(base_config_path: str, work_dir: str, backend_url: str, args) -> str:
+    """벤치마크용 설정 파일 (백엔드/InfluxDB는 가짜 서버, 디스크에 쓰는 경로는 모두 임시 디렉토리)
+
+    작업 디렉토리의 스풀/이력/체크포인트/journey DB를 읽거나 덮어쓰지 않도록
+    기록 경로를 전부 work_dir 아래로 옮기고, 읽기 전용 KPI 목표 파일은 절대 경로로 고정한다.
+    """
+    with open(base_config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    base_dir = os.path.dirname(os.path.abspath(base_config_path))
+
+    config['api']['backend_url'] = backend_url
+    config.setdefault('spool', {})['directory'] = os.path.join(work_dir, "spool")
+    config.setdefault('history', {})['directory'] = os.path.join(work_dir, "history")
+    config.setdefault('influxdb', {})['url'] = backend_url
+    for section, disabled in (('history', args.no_history), ('influxdb', args.no_influx)):
+        enabled = config[section].get('enabled', False) if args.config_features else True
+        config[section]['enabled'] = enabled and not disabled
+    config.setdefault('metrics', {})['enabled'] = False
+    config.setdefault('multiprocess', {})['enabled'] = False
+
+    kpi_config = config.setdefault('kpi', {})
+    if not args.config_features:
+        # 설정 파일 기본값은 선택 기능 비활성화 - 전체 파이프라인을 측정하도록 켬
+        for section in ('spool', 'aggregation', 'latency', 'journey'):
+            config.setdefault(section, {})['enabled'] = True
+        for section in ('publish', 'windows', 'checkpoint'):
+            kpi_config.setdefault(section, {})['enabled'] = True
+    kpi_config.setdefault('checkpoint', {})['path'] = os.path.join(work_dir, "checkpoint", "kpi_state.json.gz")
+    targets_config = kpi_config.setdefault('targets', {})
+    targets_config['path'] = os.path.join(base_dir, targets_config.get('path', 'config/kpi_targets.json'))
+    config.setdefault('journey', {})['database'] = os.path.join(work_dir, "history", "journeys.db")
+
+    processing_config = config.setdefault('processing', {})
+    if args.workers:
+        processing_config['workers'] = args.workers
+    if args.no_shedding:
+        # 모든 레인을 대기(block) 정책으로 - 처리량이 폐기/병합으로 부풀려지지 않음
+        for lane in processing_config.get('lanes', {}).values():
+            lane['policy'] = "block"
+        processing_config['block_timeout'] = 60
+
+    path = os.path.join(work_dir, "config.yaml")
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return path
+
+
+def run_once(station_count: int, args, codec) -> dict:
+    from main import DataCollector
+
+    messages = build_messages(station_count, args.rounds, codec)
+    server = RecordingServer(status_code=200, latency_ms=args.backend_latency_ms,
+                             error_rate=args.error_rate, record_bodies=False)
+    server.start()
+    work_dir = tempfile.mkdtemp(prefix="bench_collector_")
+
+    try:
+        config_path = write_config(args.config, work_dir, server.url, args)
+
+        # 수집기의 건별 print 출력은 측정에서 제외 (터미널 I/O 비용)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            collector = DataCollector(config_path)
+
+            on_message = collector.mqtt_client._on_message
+            gc.collect()
+            rss_before = _rss_bytes()
+            cpu_before = time.process_time()
+            started = time.perf_counter()
+
+            # 가짜 브로커: paho 네트워크 스레드처럼 단일 스레드에서 콜백 호출
+            for message in messages:
+                on_message(None, None, message)
+            delivered = time.perf_counter()
+
+            # 인입 큐 소진 + 싱크 플러시까지 측정
+            while collector.ingest_queue.get_depth():
+                time.sleep(0.001)
+            collector.sink.flush()
+            if collector.history_store is not None:
+                collector.history_store.flush()
+
+            elapsed = time.perf_counter() - started
+            # CPU 시간은 프로세스 전체 기준 (같은 프로세스의 가짜 백엔드 스레드 포함)
+            cpu = time.process_time() - cpu_before
+            gc.collect()
+            rss_after = _rss_bytes()
+            queue_stats = collector.ingest_queue.get_stats()
+
+            collector.shutdown()
+
+        count = len(messages)
+        processed = queue_stats['processed_count']
+        return {
+            "stations": station_count,
+            "messages": count,
+            "elapsed": elapsed,
+            "deliver_rate": count / max(delivered - started, 1e-9),
+            # 수신 기준(폐기/병합 포함)과 실제 처리 기준 처리량을 구분
+            "received_rate": count / max(elapsed, 1e-9),
+            "processed_rate": processed / max(elapsed, 1e-9),
+            "cpu_us": cpu / max(processed, 1) * 1e6,
+            "rss_growth_mb": (rss_after - rss_before) / (1024 * 1024),
+            "processed": processed,
+            "coalesced": queue_stats['coalesced_count'],
+            "dropped": queue_stats['dropped_count'],
+            "backend_requests": sum(server.request_counts.values()),
+            "backend_errors": server.error_count
+        }
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataCollector 처리량 벤치마크")
+    parser.add_argument("--stations", default="15,150,1500", help="스테이션 수 목록 (쉼표 구분)")
+    parser.add_argument("--rounds", type=int, default=5, help="라운드 수 (스테이션당 10초 분량 = 8건)")
+    parser.add_argument("--workers", type=int, default=0, help="인입 큐 워커 수 (0이면 설정 파일 값)")
+    parser.add_argument("--backend-latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-history", action="store_true", help="이력 저장소 비활성화")
+    parser.add_argument("--no-influx", action="store_true", help="InfluxDB 싱크 비활성화")
+    parser.add_argument("--config-features", action="store_true",
+                        help="선택 기능 on/off를 설정 파일 값 그대로 사용 (기본은 전체 활성화)")
+    parser.add_argument("--no-shedding", action="store_true",
+                        help="모든 레인을 block 정책으로 (폐기/병합 없이 전체 메시지 처리)")
+    parser.add_argument("--config", default=os.path.join(COLLECTOR_ROOT, "config.yaml"))
+    parser.add_argument("--verbose", action="store_true", help="수집기 경고 로그 출력")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    codec = get_codec()
+    print(f"코덱: {codec.name}, 백엔드 지연 {args.backend_latency_ms}ms, 오류율 {args.error_rate * 100:.0f}%")
+    print(f"{'stations':>8} {'msgs':>8} {'deliver/s':>10} {'recv/s':>9} {'proc/s':>9} {'CPU µs/proc':>12} "
+          f"{'RSS +MB':>8} {'processed':>10} {'coalesced':>10} {'dropped':>8} {'HTTP':>6} {'errors':>7}")
+
+    for station_count in [int(value) for value in args.stations.split(",") if value.strip()]:
+        result = run_once(station_count, args, codec)
+        print(f"{result['stations']:>8} {result['messages']:>8} {result['deliver_rate']:>10.0f} "
+              f"{result['received_rate']:>9.0f} {result['processed_rate']:>9.0f} {result['cpu_us']:>12.1f} "
+              f"{result['rss_growth_mb']:>8.1f} "
+              f"{result['processed']:>10} {result['coalesced']:>10} {result['dropped']:>8} "
+              f"{result['backend_requests']:>6} {result['backend_errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
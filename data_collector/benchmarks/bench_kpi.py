@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+KPI 계산 마이크로 벤치마크
+현재 KPIProcessor와 기준 리비전(기본: 최초 커밋)의 KPIProcessor를 같은 메시지 스트림으로 비교
+
+사이클 타임/품질 점수 윈도우가 가득 찬 상태(스테이션당 WINDOW_SIZE건 이상)에서
+status/quality 메시지 1건당 메트릭 갱신 + calculate_station_kpis 비용을 측정한다.
+(process_mqtt_message는 리비전마다 인자 형식이 달라 내부 갱신 메서드를 직접 호출)
+
+사용법 (data_collector 디렉토리에서):
+    python benchmarks/bench_kpi.py --stations 15 --messages 400
+    python benchmarks/bench_kpi.py --baseline HEAD~1
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime
+
+COLLECTOR_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COLLECTOR_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTOR_ROOT)
+
+import src.kpi_processor as current_module  # noqa: E402
+
+KPI_MODULE_PATH = "data_collector/src/kpi_processor.py"
+
+
+def load_baseline(revision: str):
+    """git 리비전의 kpi_processor.py를 src 패키지 하위 모듈로 로드"""
+    if not revision:
+        revision = subprocess.check_output(["git", "rev-list", "--max-parents=0", "HEAD"],
+                                           cwd=COLLECTOR_ROOT, text=True).split()[0]
+    source = subprocess.check_output(["git", "show", f"{revision}:{KPI_MODULE_PATH}"],
+                                     cwd=COLLECTOR_ROOT, text=True)
+
+    module = types.ModuleType("src._kpi_processor_baseline")
+    module.__package__ = "src"
+    sys.modules[module.__name__] = module
+    exec(compile(source, f"{revision}:{KPI_MODULE_PATH}", "exec"), module.__dict__)
+    return revision, module
+
+
+def build_messages(stations: int, per_station: int, seed: int = 7):
+    """스테이션별 status(생산 수 증가 + 사이클 타임) 2건 : quality 1건 비율의 메시지 스트림"""
+    rng = random.Random(seed)
+    station_ids = [f"S{index:04d}" for index in range(stations)]
+    counts = dict.fromkeys(station_ids, 0)
+    messages = []
+
+    for step in range(per_station):
+        for station_id in station_ids:
+            now = datetime.now().isoformat()
+            if step % 3 == 2:
+                data_type = "quality"
+                data = {"station_id": station_id, "timestamp": now,
+                        "overall_score": round(rng.uniform(0.8, 1.0), 3), "passed": rng.random() > 0.05}
+            else:
+                data_type = "status"
+                counts[station_id] += 1
+                data = {"station_id": station_id, "timestamp": now, "station_status": "RUNNING",
+                        "production_count": counts[station_id], "cycle_time": round(rng.uniform(150, 210), 1)}
+            messages.append((station_id, data_type, data))
+    return messages
+
+
+def feed(processor, station_metrics_class, messages):
+    """KPIProcessor.process_mqtt_message와 같은 순서로 메트릭 갱신 후 KPI 계산"""
+    for station_id, data_type, data in messages:
+        if station_id not in processor.station_metrics:
+            processor.station_metrics[station_id] = station_metrics_class(station_id)
+        if data_type == "status":
+            processor._process_status_data(station_id, data)
+        else:
+            processor._process_quality_data(station_id, data)
+        processor.calculate_station_kpis(station_id)
+
+
+def measure(module, warmup, messages, repeat: int) -> float:
+    """메시지 1건당 최소 소요 시간 (µs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor = module.KPIProcessor()
+        feed(processor, module.StationMetrics, warmup)
+
+        started = time.perf_counter()
+        feed(processor, module.StationMetrics, messages)
+        best = min(best, time.perf_counter() - started)
+    return best / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KPI 계산 마이크로 벤치마크")
+    parser.add_argument("--stations", type=int, default=15, help="스테이션 수")
+    parser.add_argument("--warmup", type=int, default=300, help="스테이션당 워밍업 메시지 수 (윈도우 채우기)")
+    parser.add_argument("--messages", type=int, default=300, help="스테이션당 측정 메시지 수")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (최소값 사용)")
+    parser.add_argument("--baseline", default="", help="비교할 git 리비전 (기본: 최초 커밋)")
+    args = parser.parse_args()
+
+    stream = build_messages(args.stations, args.warmup + args.messages)
+    split = args.stations * args.warmup
+    warmup, messages = stream[:split], stream[split:]
+
+    revision, baseline_module = load_baseline(args.baseline)
+    baseline_us = measure(baseline_module, warmup, messages, args.repeat)
+    current_us = measure(current_module, warmup, messages, args.repeat)
+
+    print(f"📦 메시지: {len(messages)}건 (스테이션 {args.stations}개, 워밍업 {len(warmup)}건)")
+    print(f"{'version':<16} {'µs/msg':>10} {'speedup':>9}")
+    print(f"{'baseline ' + revision[:7]:<16} {baseline_us:>10.2f} {1.0:>8.2f}x")
+    print(f"{'current':<16} {current_us:>10.2f} {baseline_us / current_us:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
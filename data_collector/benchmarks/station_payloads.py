@@ -0,0 +1,87 @@
+"""
+벤치마크용 스테이션 페이로드 생성기
+mosquitto_MQTT/assembly의 실제 스테이션 시뮬레이터로 telemetry/status/quality 페이로드 생성
+"""
+
+import contextlib
+import io
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+# 프로젝트 루트를 Python 경로에 추가 (run_simulation.py와 동일한 방식)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from mosquitto_MQTT.assembly import (  # noqa: E402
+    A01DoorRemovalSimulator, A02WiringSimulator, A03HeadlinerSimulator, A04CrashPadSimulator,
+    B01FuelTankSimulator, B02ChassisMergeSimulator, B03MufflerSimulator,
+    C01FEMSimulator, C02GlassSimulator, C03SeatSimulator, C04BumperSimulator, C05TireSimulator,
+    D01WheelAlignmentSimulator, D02HeadlampSimulator, D03WaterLeakTestSimulator,
+)
+
+# AssemblyLineSimulator와 동일한 15개 스테이션 구성
+STATION_CLASSES = {
+    "A01_DOOR": A01DoorRemovalSimulator,
+    "A02_WIRING": A02WiringSimulator,
+    "A03_HEADLINER": A03HeadlinerSimulator,
+    "A04_CRASH_PAD": A04CrashPadSimulator,
+    "B01_FUEL_TANK": B01FuelTankSimulator,
+    "B02_CHASSIS_MERGE": B02ChassisMergeSimulator,
+    "B03_MUFFLER": B03MufflerSimulator,
+    "C01_FEM": C01FEMSimulator,
+    "C02_GLASS": C02GlassSimulator,
+    "C03_SEAT": C03SeatSimulator,
+    "C04_BUMPER": C04BumperSimulator,
+    "C05_TIRE": C05TireSimulator,
+    "D01_WHEEL_ALIGNMENT": D01WheelAlignmentSimulator,
+    "D02_HEADLAMP": D02HeadlampSimulator,
+    "D03_WATER_LEAK_TEST": D03WaterLeakTestSimulator,
+}
+
+
+def create_stations(count: int = 15) -> Dict[str, Any]:
+    """스테이션 시뮬레이터 생성
+
+    15개를 넘으면 기본 스테이션을 반복하며 station_id에 일련번호를 붙인다.
+    (예: 150개 → A01_DOOR_00 ... D03_WATER_LEAK_TEST_09)
+    """
+    base_ids = list(STATION_CLASSES)
+    replicas = max(1, -(-count // len(base_ids)))
+    stations = {}
+
+    # 시뮬레이터 초기화 메시지 출력 억제
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(count):
+            base_id = base_ids[index % len(base_ids)]
+            station_id = base_id if replicas == 1 else f"{base_id}_{index // len(base_ids):02d}"
+            stations[station_id] = STATION_CLASSES[base_id](station_id)
+
+    return stations
+
+
+def generate_messages(stations: Dict[str, Any], rounds: int = 1) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """스테이션별 (topic, payload dict) 생성
+
+    실제 발행 주기(telemetry 2초 / status 5초 / quality 10초)의 비율을 반영하여
+    한 라운드(10초 분량)당 telemetry 5건, status 2건, quality 1건을 만든다.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for station_id, simulator in stations.items():
+                for _ in range(5):
+                    yield f"factory/{station_id}/telemetry", simulator.generate_telemetry()
+                for _ in range(2):
+                    yield f"factory/{station_id}/status", simulator.generate_status()
+
+                # 품질 데이터는 검사 주기와 무관하게 강제로 생성
+                simulator.last_quality_check = simulator.cycle_count - simulator.quality_interval
+                quality = simulator.generate_quality()
+                if quality:
+                    yield f"factory/{station_id}/quality", quality
+
+
+def sample_payloads(count: int = 15, rounds: int = 1) -> List[Tuple[str, Dict[str, Any]]]:
+    """메시지 목록 생성 (반복 측정용)"""
+    return list(generate_messages(create_stations(count), rounds))
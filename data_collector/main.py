@@ -1,28 +1,265 @@
 """
 Data Collector 메인 - KPI 계산 통합
 """
+import os
+import queue
 import signal
 import sys
+import time
 import yaml
 from src.mqtt_client import MQTTClient
-from src.api_client import APIClient  
+from src.api_client import APIClient, SEND_OK
 from src.data_processor import DataProcessor
 from src.kpi_processor import KPIProcessor  # 🆕 추가
+from src.kpi_windows import KPIWindowManager, DEFAULT_SHIFTS
+from src.kpi_publisher import KPIPublisher
+from src.kpi_checkpoint import KPICheckpointer
+from src.ingest_queue import IngestQueue
+from src.batch_sink import BatchSink, FanoutSink
+from src.influx_sink import InfluxSink
+from src.aggregator import TelemetryAggregator
+from src.history_store import HistoryStore
+from src.journey_store import JourneyStore
+from src.vehicle_journey import VehicleJourneyIndex, DEFAULT_FINAL_STATIONS
+from src.models.message import MQTTMessage
+from src.codec import get_codec
+from src.process_pool import CollectorProcessPool, make_station_filter, worker_topics
+from src.factory_kpis import format_cycle_time_percentiles
+from src.metrics import REGISTRY, STAGE_SECONDS, MetricsServer, format_summary
+from src.latency_tracker import LatencyTracker, STAGE_RECEIVED, STAGE_PROCESSED
+
+_QUEUE_WAIT_SECONDS = STAGE_SECONDS.labels("queue_wait")
+_KPI_SECONDS = STAGE_SECONDS.labels("kpi")
 
 class DataCollector:
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", worker_index: int = None,
+                 worker_count: int = 1, kpi_queue=None):
+        """worker_index가 주어지면 멀티 프로세스 워커로 동작 (담당 스테이션만 처리, KPI는 kpi_queue로 전달)"""
         # 설정 로드
         with open(config_path, 'r', encoding='utf-8') as f:
             self.config = yaml.safe_load(f)
         
+        self.worker_index = worker_index
+        self.kpi_queue = kpi_queue
+        
         # API 설정 업데이트 (KPI 엔드포인트 추가)
         if 'kpi_data' not in self.config['api']['endpoints']:
             self.config['api']['endpoints']['kpi_data'] = '/api/kpi/data'
         
-        self.mqtt_client = MQTTClient()
-        self.api_client = APIClient(self.config)
-        self.data_processor = DataProcessor(self.api_client)
-        self.kpi_processor = KPIProcessor()  # 🆕 KPI 프로세서 추가
+        processing_config = self.config.get('processing', {})
+        
+        # JSON 코덱: 고속 라이브러리(orjson/ujson) 설치 시 사용, 없으면 표준 json
+        self.codec = get_codec(processing_config.get('json_codec', 'auto'))
+        
+        mqtt_topics = None
+        station_filter = None
+        if worker_index is not None:
+            # 워커별 스풀 디렉토리 분리 (세그먼트/커서 파일 충돌 방지)
+            spool_config = self.config.setdefault('spool', {})
+            spool_config['directory'] = os.path.join(spool_config.get('directory', 'spool'), f"worker_{worker_index}")
+            
+            multiprocess_config = self.config.get('multiprocess', {})
+            shared_data_types = multiprocess_config.get('shared_data_types', [])
+            mqtt_topics = worker_topics(self.config['mqtt']['topics'],
+                                        multiprocess_config.get('shared_group', 'collector'),
+                                        shared_data_types)
+            station_filter = make_station_filter(worker_index, worker_count, shared_data_types)
+        
+        self.station_filter = station_filter
+        self.mqtt_client = MQTTClient(config_path, codec=self.codec, topics=mqtt_topics,
+                                      station_filter=station_filter,
+                                      client_suffix=str(worker_index) if worker_index is not None else None)
+        self.api_client = APIClient(self.config, codec=self.codec)
+        
+        # 종단 간 지연 추적: 발행 timestamp → 수신 → 가공 → 백엔드 응답
+        self.latency_tracker = None
+        latency_config = self.config.get('latency', {})
+        if latency_config.get('enabled', False):
+            self.latency_tracker = LatencyTracker(
+                budget_seconds=latency_config.get('budget_ms', 2000) / 1000,
+                budgets={data_type: value / 1000 for data_type, value in latency_config.get('budgets_ms', {}).items()},
+                window_seconds=latency_config.get('window_seconds', 60),
+                check_interval=latency_config.get('check_interval', 10),
+                min_samples=latency_config.get('min_samples', 20)
+            )
+            self.latency_tracker.start()
+            # 재시도/스풀 재전송으로 늦게 수락된 배치도 지연 분포에 포함
+            self.api_client.add_ack_handler(self.api_client.endpoint('iot_data_batch'),
+                                            self.latency_tracker.record_acked)
+            self.api_client.add_ack_handler(self.api_client.endpoints['iot_data'],
+                                            lambda record: self.latency_tracker.record_acked([record]))
+        
+        self.api_client.start()  # 재시도 스케줄러 + 스풀 재전송 스레드 (ack 콜백 등록 후 시작)
+        
+        # 배치 싱크: processing.batch_size / flush_interval 기준 일괄 전송
+        self.iot_sink = BatchSink(
+            self._send_iot_batch,
+            batch_size=processing_config.get('batch_size', 100),
+            flush_interval=processing_config.get('flush_interval', 5),
+            name="iot_data"
+        )
+        
+        # InfluxDB 싱크: line protocol 배치 기록
+        self.influx_sink = None
+        influx_config = self.config.get('influxdb', {})
+        if influx_config.get('enabled', False):
+            self.influx_sink = InfluxSink(
+                url=influx_config['url'],
+                org=influx_config['org'],
+                bucket=influx_config['bucket'],
+                token=influx_config.get('token', ''),
+                measurement=influx_config.get('measurement', 'station_data'),
+                batch_size=influx_config.get('batch_size', 500),
+                flush_interval=influx_config.get('flush_interval', 5),
+                use_gzip=influx_config.get('gzip', True)
+            )
+        
+        self.sink = FanoutSink([self.iot_sink, self.influx_sink])
+        self.sink.start()
+        
+        # 텔레메트리 다운샘플링: 윈도우 롤업만 배치 싱크로 전달
+        self.aggregator = None
+        aggregation_config = self.config.get('aggregation', {})
+        if aggregation_config.get('enabled', False):
+            self.aggregator = TelemetryAggregator(
+                self.sink.add,
+                window_seconds=aggregation_config.get('window_seconds', 10),
+                fields=aggregation_config.get('fields'),
+                passthrough_stations=aggregation_config.get('passthrough_stations'),
+                grace_seconds=aggregation_config.get('grace_seconds', 5)
+            )
+            self.aggregator.start()
+        
+        # 로컬 이력 저장소: 수신 메시지를 일자별 SQLite 파일에 기록
+        self.history_store = None
+        history_config = self.config.get('history', {})
+        if history_config.get('enabled', False):
+            self.history_store = HistoryStore(
+                directory=history_config.get('directory', 'history'),
+                codec=self.codec,
+                batch_size=history_config.get('batch_size', 500),
+                flush_interval=history_config.get('flush_interval', 2),
+                retention_days=history_config.get('retention_days', 30),
+                data_types=history_config.get('data_types'),
+                busy_timeout=history_config.get('busy_timeout', 30),
+                max_future_seconds=history_config.get('max_future_seconds', 300)
+            )
+            self.history_store.start()
+        
+        self.data_processor = DataProcessor(self.api_client, sink=self.sink, aggregator=self.aggregator)
+        self.kpi_processor = KPIProcessor(self.config.get('kpi', {}))  # 🆕 KPI 프로세서 추가
+        self.kpi_processor.targets.start()  # kpi_targets.json 변경 시 목표 핫 리로드
+        
+        # KPI 발행 스케줄러: 주기마다 변경된 스테이션 스냅샷만 공장 단위 1회 요청으로 전송
+        self.kpi_publisher = None
+        publish_config = self.config.get('kpi', {}).get('publish', {})
+        if publish_config.get('enabled', False):
+            self.kpi_publisher = KPIPublisher(
+                self.kpi_processor.calculate_station_kpis,
+                self._send_kpi_batch,
+                interval=publish_config.get('interval', 10),
+                max_batch=publish_config.get('max_batch', 500),
+                on_snapshot=self._queue_kpi_data if kpi_queue is not None else None,
+                on_tick=self.kpi_processor.refresh_factory_kpis
+            )
+            self.kpi_publisher.start()
+        
+        # KPI 상태 체크포인트: 마지막 스냅샷 복원 후 이력 저장소로 중단 구간 캐치업
+        self.kpi_checkpointer = None
+        checkpoint_config = self.config.get('kpi', {}).get('checkpoint', {})
+        if checkpoint_config.get('enabled', False):
+            checkpoint_path = checkpoint_config.get('path', 'checkpoint/kpi_state.json.gz')
+            if worker_index is not None:
+                checkpoint_path = os.path.join(os.path.dirname(checkpoint_path), f"worker_{worker_index}",
+                                               os.path.basename(checkpoint_path))
+            self.kpi_checkpointer = KPICheckpointer(
+                self.kpi_processor,
+                path=checkpoint_path,
+                interval=checkpoint_config.get('interval', 60),
+                codec=self.codec
+            )
+            saved_at = self.kpi_checkpointer.restore()
+            if saved_at is not None and self.kpi_publisher is not None:
+                # 복원한 스테이션은 새 메시지가 없어도 첫 주기에 발행 (멀티 프로세스 모드의 공장 집계 포함)
+                for station_id in list(self.kpi_processor.station_metrics):
+                    self.kpi_publisher.mark_dirty(station_id)
+            if saved_at is not None and checkpoint_config.get('catch_up', True):
+                self._catch_up_kpis(saved_at - checkpoint_config.get('catch_up_overlap', 60))
+            self.kpi_checkpointer.start()
+        
+        # 이벤트 시간 KPI 윈도우: 시간별/교대조/슬라이딩 윈도우 확정 레코드를 배치 전송
+        self.kpi_windows = None
+        self.kpi_window_sink = None
+        windows_config = self.config.get('kpi', {}).get('windows', {})
+        if windows_config.get('enabled', False):
+            self.kpi_window_sink = BatchSink(
+                self.api_client.send_kpi_windows,
+                batch_size=windows_config.get('batch_size', 100),
+                flush_interval=windows_config.get('flush_interval', 5),
+                name="kpi_windows"
+            )
+            self.kpi_window_sink.start()
+            self.kpi_windows = KPIWindowManager(
+                self.kpi_window_sink.add,
+                hourly=windows_config.get('hourly', True),
+                shifts=windows_config.get('shifts', DEFAULT_SHIFTS),
+                sliding_seconds=windows_config.get('sliding_minutes', 15) * 60,
+                sliding_step=windows_config.get('sliding_step_seconds', 60),
+                watermark_delay=windows_config.get('watermark_delay', 10),
+                allowed_lateness=windows_config.get('allowed_lateness', 30),
+                idle_timeout=windows_config.get('idle_timeout', 300),
+                targets=self.kpi_processor.targets
+            )
+            self.kpi_windows.start()
+        
+        # 차량 journey 추적: 리드 타임/스테이션 체류/WIP (완료·만료 차량은 SQLite로 내보냄)
+        self.journey_index = None
+        self.journey_store = None
+        journey_config = self.config.get('journey', {})
+        if journey_config.get('enabled', False):
+            if worker_index is not None:
+                # 차량은 여러 스테이션(=여러 워커)을 거치므로 워커별 인덱스로는 journey를 완성할 수 없음
+                print(f"⚠️ 워커 {worker_index}: 차량 journey 추적은 단일 프로세스 모드에서만 지원")
+            else:
+                self.journey_store = JourneyStore(
+                    path=journey_config.get('database', 'history/journeys.db'),
+                    codec=self.codec,
+                    batch_size=journey_config.get('batch_size', 200),
+                    flush_interval=journey_config.get('flush_interval', 5)
+                )
+                self.journey_store.start()
+                self.journey_index = VehicleJourneyIndex(
+                    self.journey_store.add,
+                    final_stations=journey_config.get('final_stations', DEFAULT_FINAL_STATIONS),
+                    exit_timeout=journey_config.get('exit_timeout', 600),
+                    max_active=journey_config.get('max_active', 20000),
+                    sweep_interval=journey_config.get('sweep_interval', 30)
+                )
+                self.journey_index.start()
+        
+        # 인입 큐: MQTT 수신 스레드는 적재만, 처리/전송은 워커 풀에서
+        self.ingest_queue = IngestQueue(
+            self._process_message,
+            workers=processing_config.get('workers', 4),
+            capacity=processing_config.get('queue_size', 10000),
+            lanes=processing_config.get('lanes'),
+            block_timeout=processing_config.get('block_timeout', 0.5),
+            # block 레인 대기 초과분은 이력 저장소에 보존 (없으면 건마다 ERROR 로그로 유실 기록)
+            on_block_timeout=self.history_store.add if self.history_store is not None else None
+        )
+        self.ingest_queue.start()
+        
+        # 자체 메트릭: Prometheus 텍스트 엔드포인트 (멀티 프로세스 워커는 port + worker_index)
+        self.metrics_server = None
+        self._register_gauges()
+        metrics_config = self.config.get('metrics', {})
+        if metrics_config.get('enabled', False):
+            self.metrics_server = MetricsServer(
+                REGISTRY,
+                host=metrics_config.get('host', '127.0.0.1'),
+                port=metrics_config.get('port', 9108) + (worker_index or 0)
+            )
+            self.metrics_server.start()
         
         # MQTT 메시지 핸들러 등록
         self.mqtt_client.add_message_handler(self.handle_mqtt_message)
@@ -31,56 +268,280 @@ class DataCollector:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
-    def handle_mqtt_message(self, topic: str, payload: str):
-        """MQTT 메시지 처리 - 기존 + KPI 계산"""
+    def _register_gauges(self):
+        """큐 깊이, 싱크 대기, 스풀/재시도, 서킷 상태 게이지 등록"""
+        REGISTRY.gauge("collector_queue_depth", "Ingest queue depth by lane",
+                       lambda: {name: lane['depth'] for name, lane in self.ingest_queue.get_stats()['lanes'].items()},
+                       ("lane",))
+        REGISTRY.gauge("collector_queue_dropped", "Messages dropped or sampled out by lane",
+                       lambda: {name: lane['dropped_count'] + lane['sampled_out_count']
+                                for name, lane in self.ingest_queue.get_stats()['lanes'].items()},
+                       ("lane",))
+        REGISTRY.gauge("collector_sink_pending", "Records buffered in batch sinks",
+                       lambda: {sink.name: sink.get_stats()['pending']
+                                for sink in self.sink.sinks + [self.history_store, self.kpi_window_sink,
+                                                               self.journey_store]
+                                if sink is not None},
+                       ("sink",))
+        REGISTRY.gauge("collector_retry_pending", "Scheduled backend retries",
+                       self.api_client.retry_scheduler.pending)
+        REGISTRY.gauge("collector_spool_pending_bytes", "Bytes waiting in the disk spool",
+                       lambda: self.api_client.spool.pending_bytes() if self.api_client.spool else 0)
+        REGISTRY.gauge("collector_circuit_open", "1 if the endpoint circuit breaker is not closed",
+                       lambda: {endpoint: 0 if breaker.state == 'closed' else 1
+                                for endpoint, breaker in list(self.api_client.breakers.items())},
+                       ("endpoint",))
+        if self.journey_index is not None:
+            REGISTRY.gauge("collector_wip_vehicles", "Vehicles currently tracked at each station",
+                           self.journey_index.get_wip, ("station",))
+    
+    def _send_iot_batch(self, records: list) -> str:
+        """IoT 배치 전송 (백엔드 수락 시점은 APIClient ack 콜백으로 지연 추적에 기록)"""
+        return self.api_client.send_iot_data_batch(records)
+    
+    def handle_mqtt_message(self, message: MQTTMessage):
+        """MQTT 메시지 수신 - 인입 큐에 적재만 수행 (paho 네트워크 루프 블로킹 방지)"""
+        self.ingest_queue.submit(message)
+    
+    def _process_message(self, message: MQTTMessage):
+        """MQTT 메시지 처리 - 기존 + KPI 계산 (인입 큐 워커에서 실행)"""
         try:
+            _QUEUE_WAIT_SECONDS.observe(max(0.0, time.time() - message.received_at))
+            
+            if self.history_store is not None:
+                self.history_store.add(message)
+            
             # 1. 기존 데이터 처리 (원시 데이터 → Spring Boot)
-            processed_data = self.data_processor.process_message(topic, payload)
+            processed_data = self.data_processor.process_message(message)
+            
+            if self.latency_tracker is not None:
+                self.latency_tracker.record_message(message, STAGE_RECEIVED)
+                self.latency_tracker.record_message(message, STAGE_PROCESSED)
             
             # 2. 🆕 KPI 계산 (원시 데이터 → KPI → Spring Boot)
-            if topic.endswith(('/status', '/quality')):  # KPI 관련 토픽만
-                kpi_data = self.kpi_processor.process_mqtt_message(topic, payload)
+            if message.data_type in ('status', 'quality'):  # KPI 관련 토픽만
+                started = time.perf_counter()
+                kpi_data = None
+                if self.kpi_publisher is not None:
+                    # 메트릭 갱신만 하고 계산/전송은 발행 주기에 일괄 처리
+                    if self.kpi_processor.update_metrics(message):
+                        self.kpi_publisher.mark_dirty(message.station_id)
+                else:
+                    kpi_data = self.kpi_processor.process_mqtt_message(message)
+                if self.kpi_windows is not None:
+                    self.kpi_windows.add(message)
+                _KPI_SECONDS.observe(time.perf_counter() - started)
                 if kpi_data:
                     self._send_kpi_data(kpi_data)
+            elif message.data_type == 'telemetry':
+                # 작업 중인 차종만 기록 (차종별 목표 사이클 타임 선택)
+                self.kpi_processor.update_metrics(message)
+                if self.journey_index is not None:
+                    self.journey_index.observe(message)
                     
         except Exception as e:
             print(f"❌ 메시지 처리 오류: {e}")
     
-    def _send_kpi_data(self, kpi_data: dict):
-        """계산된 KPI 데이터를 Spring Boot로 전송"""
+    def _catch_up_kpis(self, since: float):
+        """체크포인트 이후 이력 저장소에 기록된 status/quality 메시지를 KPI 메트릭에 재반영
+
+        겹치는 구간은 KPIProcessor가 스냅샷의 스테이션/data_type별 이벤트 시각으로 중복 제거한다.
+        """
+        if self.history_store is None:
+            return
+        started = time.perf_counter()
+        replayed = 0
+        for message in self.history_store.iter_since(since, ['status', 'quality']):
+            if self.station_filter is not None and not self.station_filter(message.station_id, message.data_type):
+                continue
+            if self.kpi_processor.update_metrics(message, catch_up=True):
+                replayed += 1
+                if self.kpi_publisher is not None:
+                    self.kpi_publisher.mark_dirty(message.station_id)
+        print(f"♻️ KPI 캐치업: {replayed}건 반영, 중복 {self.kpi_processor.duplicate_count}건 "
+              f"({(time.perf_counter() - started) * 1000:.0f}ms)")
+    
+    def _queue_kpi_data(self, kpi_data: dict):
+        """멀티 프로세스 모드: 부모 프로세스의 공장 KPI 집계로 전달"""
         try:
-            response = self.api_client.session.post(
-                f"{self.api_client.base_url}/api/kpi/data",  # 🆕 KPI 전용 엔드포인트
-                json=kpi_data,
-                timeout=self.api_client.timeout
-            )
-            
-            if response.status_code == 200:
-                station_id = kpi_data.get('station_id', 'Unknown')
-                oee_value = kpi_data.get('oee', {}).get('value', 0)
-                print(f"✅ KPI 전송 성공: {station_id} (OEE: {oee_value}%)")
-            else:
-                print(f"⚠️ KPI 전송 실패: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ KPI 전송 오류: {e}")
+            station_id = kpi_data.get('station_id')
+            self.kpi_queue.put_nowait((station_id, kpi_data,
+                                       self.kpi_processor.export_cycle_time_sketches(station_id)))
+        except queue.Full:
+            pass
+    
+    def _send_kpi_batch(self, snapshots: list) -> str:
+        """주기 발행 KPI 스냅샷 일괄 전송 (실패 시 재시도 예약/스풀)"""
+        result = self.api_client.send_kpi_data_batch(snapshots)
+        if result == SEND_OK:
+            print(f"✅ KPI 일괄 전송 성공: {len(snapshots)}개 스테이션")
+        return result
+    
+    def _send_kpi_data(self, kpi_data: dict):
+        """계산된 KPI 데이터를 Spring Boot로 전송 (실패 시 재시도 예약/스풀, 블로킹 없음)"""
+        if self.kpi_queue is not None:
+            self._queue_kpi_data(kpi_data)
+        
+        if self.api_client.send_kpi_data(kpi_data) == SEND_OK:
+            station_id = kpi_data.get('station_id', 'Unknown')
+            oee_value = kpi_data.get('oee', {}).get('value', 0)
+            print(f"✅ KPI 전송 성공: {station_id} (OEE: {oee_value}%)")
     
     def _signal_handler(self, signum, frame):
         """종료 시그널 처리"""
+        self.shutdown()
+        sys.exit(0)
+    
+    def shutdown(self):
+        """수신 중지, 남은 데이터 전송 후 요약 출력 (캡처 재생/벤치마크에서도 사용)"""
         print(f"\n📊 KPI 프로세서 종료 중...")
         
+        # MQTT 수신 중지 후 인입 큐에 남은 메시지 처리
+        self.mqtt_client.stop()
+        self.ingest_queue.stop()
+        if self.aggregator is not None:
+            self.aggregator.stop()  # 남은 윈도우 롤업 방출
+        self.sink.stop()  # 남은 배치 최종 전송
+        if self.history_store is not None:
+            self.history_store.stop()
+        if self.kpi_publisher is not None:
+            self.kpi_publisher.stop()  # 남은 변경분 최종 발행
+        if self.kpi_windows is not None:
+            self.kpi_windows.stop()  # 열린 윈도우 미완료로 방출
+            self.kpi_window_sink.stop()
+        if self.kpi_checkpointer is not None:
+            self.kpi_checkpointer.stop()  # 최종 상태 저장
+        if self.journey_index is not None:
+            self.journey_index.stop()
+            self.journey_store.stop()  # 내보낸 journey 최종 기록
+        self.kpi_processor.targets.stop()
+        self.api_client.close()
+        
+        if self.latency_tracker is not None:
+            self.latency_tracker.stop()
+            for name, stats in sorted(self.latency_tracker.get_stats()['by_type'].items()):
+                print(f"⏱️ 지연 {name}: p50 {stats['p50'] * 1000:.0f}ms, p99 {stats['p99'] * 1000:.0f}ms "
+                      f"({stats['count']}건)")
+        
+        queue_stats = self.ingest_queue.get_stats()
+        print(f"📥 인입 큐: 처리 {queue_stats['processed_count']}건, 폐기 {queue_stats['dropped_count']}건 "
+              f"(대기 초과 {queue_stats['block_timeout_count']}건, 이력 보존 {queue_stats['overflow_count']}건, "
+              f"유실 {queue_stats['lost_count']}건), 병합 {queue_stats['coalesced_count']}건")
+        
+        sink_stats = self.iot_sink.get_stats()
+        print(f"📦 배치 전송: {sink_stats['batches_sent']}회 ({sink_stats['records_sent']}건), "
+              f"재시도/스풀 {sink_stats['deferred_records']}건, 실패 {sink_stats['failed_records']}건")
+        
+        if self.influx_sink is not None:
+            influx_stats = self.influx_sink.get_stats()
+            print(f"📈 InfluxDB: {influx_stats['lines_written']}줄 기록, 실패 {influx_stats['failed_records']}건")
+        
+        if self.history_store is not None:
+            history_stats = self.history_store.get_stats()
+            print(f"🗄️ 이력 저장: {history_stats['rows_written']}건 ({history_stats['days']}일)")
+        
+        if self.kpi_publisher is not None:
+            publish_stats = self.kpi_publisher.get_stats()
+            print(f"📤 KPI 발행: 스냅샷 {publish_stats['snapshots_sent']}건 ({publish_stats['batches_sent']}회 요청), "
+                  f"변경 없음 {publish_stats['unchanged_skipped']}건")
+        
+        if self.kpi_checkpointer is not None:
+            checkpoint_stats = self.kpi_checkpointer.get_stats()
+            print(f"💾 KPI 체크포인트: 저장 {checkpoint_stats['saves']}회 ({checkpoint_stats['last_size_bytes']} bytes, "
+                  f"{checkpoint_stats['last_save_ms']}ms), 실패 {checkpoint_stats['failed_saves']}회")
+        
+        if self.journey_index is not None:
+            flow = self.journey_index.get_flow_kpis()
+            lead_time = flow['lead_time']
+            line = f"🚗 차량 journey: 추적 중 {flow['active_vehicles']}대, 완료 {lead_time['count']}대"
+            if lead_time['count']:
+                line += f" (리드 타임 평균 {lead_time['average']}s, p90 {lead_time['p90']}s)"
+            print(line)
+        
+        if self.kpi_windows is not None:
+            window_stats = self.kpi_windows.get_stats()
+            print(f"🪟 KPI 윈도우: {window_stats['windows_out']}건 방출, 지연 폐기 {window_stats['late_events']}건")
+        
+        api_stats = self.api_client.get_stats()
+        open_circuits = [endpoint for endpoint, stats in api_stats['circuit_breakers'].items() if stats['state'] != 'closed']
+        if open_circuits:
+            print(f"⚡ 열린 서킷: {', '.join(open_circuits)}")
+        
+        spool_stats = api_stats['spool']
+        if spool_stats:
+            print(f"💾 스풀: 저장 {spool_stats['spooled_records']}건, 재전송 {spool_stats['replayed_records']}건, "
+                  f"대기 {spool_stats['pending_bytes']} bytes")
+        
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        for line in format_summary(REGISTRY):
+            print(line)
+        
+        # 멀티 프로세스 워커는 담당 스테이션만 알기 때문에 공장 KPI는 부모 프로세스에서 출력
+        factory_kpis = self.kpi_processor.get_factory_kpis() if self.kpi_queue is None else {}
+        if factory_kpis:
+            print(f"🏭 공장 KPI: OEE {factory_kpis['factory_oee']}%, FTY {factory_kpis['factory_fty']}%, "
+                  f"처리량 {factory_kpis['factory_throughput']}/h ({factory_kpis['active_stations']}개 스테이션)")
+            for line, kpis in factory_kpis['lines'].items():
+                print(f"   {line}라인: OEE {kpis['oee']}%, FTY {kpis['fty']}%, 처리량 {kpis['throughput']}/h "
+                      f"({kpis['active_stations']}개)")
+            for line in format_cycle_time_percentiles(self.kpi_processor.get_cycle_time_percentiles()):
+                print(line)
+        
         # 최종 KPI 요약 출력
         for station_id, metrics in self.kpi_processor.station_metrics.items():
-            print(f"📈 {station_id}: {metrics.total_cycles}사이클, {metrics.total_inspections}검사")
-        
-        self.mqtt_client.stop()
+            line = f"📈 {station_id}: {metrics.total_cycles}사이클, {metrics.total_inspections}검사"
+            top_defects = metrics.defects.top(3)
+            if top_defects:
+                line += ", 주요 불량 " + ", ".join(f"{entry['type']} {entry['count']}" for entry in top_defects)
+            print(line)
+
+def run_worker(config_path: str, index: int, workers: int, kpi_queue):
+    """멀티 프로세스 모드 워커 진입점 (담당 스테이션 메시지만 처리)"""
+    collector = DataCollector(config_path, worker_index=index, worker_count=workers, kpi_queue=kpi_queue)
+    
+    if collector.mqtt_client.connect():
+        print(f"✅ 워커 {index}/{workers} MQTT 연결 성공")
+        collector.mqtt_client.start_loop()
+    else:
+        print(f"❌ 워커 {index} MQTT 연결 실패")
+
+def run_multiprocess(config_path: str, multiprocess_config: dict):
+    """워커 프로세스 N개 실행 + 공장 KPI 집계"""
+    pool = CollectorProcessPool(
+        run_worker,
+        config_path=config_path,
+        workers=multiprocess_config.get('workers', os.cpu_count() or 1),
+        report_interval=multiprocess_config.get('report_interval', 30)
+    )
+    
+    def _stop(signum, frame):
+        print(f"\n📊 워커 프로세스 종료 대기 중...")
+        if signum != signal.SIGINT:
+            pool.signal_workers()
+        pool.stop()
+        pool.print_factory_kpis()
         sys.exit(0)
+    
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    
+    pool.start()
+    print(f"🧩 멀티 프로세스 모드: 워커 {pool.workers}개 (스테이션 해시 분배)")
+    print("🛑 종료하려면 Ctrl+C\n")
+    pool.run()
 
-def main():
+def main(config_path: str = "config.yaml"):
     print("🔢 Data Collector with KPI Processing v2.0")
     print("=" * 50)
     
-    collector = DataCollector()
+    with open(config_path, 'r', encoding='utf-8') as f:
+        multiprocess_config = (yaml.safe_load(f) or {}).get('multiprocess', {})
+    if multiprocess_config.get('enabled', False):
+        run_multiprocess(config_path, multiprocess_config)
+        return
+    
+    collector = DataCollector(config_path)
     
     if collector.mqtt_client.connect():
         print("✅ MQTT 연결 성공")
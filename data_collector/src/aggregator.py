@@ -0,0 +1,208 @@
+"""
+텔레메트리 다운샘플링
+스테이션별 중첩 센서 값을 텀블링 윈도우 단위 min/max/mean/last 롤업으로 집계
+"""
+
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .flattener import PayloadFlattener
+from .models.message import MQTTMessage
+
+
+class _Window:
+    """스테이션 1개의 현재 윈도우 누적값"""
+
+    __slots__ = ("start", "topic", "count", "stats")
+
+    def __init__(self, start: float, topic: str):
+        self.start = start
+        self.topic = topic
+        self.count = 0
+        # metric → [min, max, sum, count, last]
+        self.stats: Dict[str, List[float]] = {}
+
+    def add(self, metrics: Dict[str, float]):
+        self.count += 1
+        for name, value in metrics.items():
+            stat = self.stats.get(name)
+            if stat is None:
+                self.stats[name] = [value, value, value, 1, value]
+            else:
+                if value < stat[0]:
+                    stat[0] = value
+                if value > stat[1]:
+                    stat[1] = value
+                stat[2] += value
+                stat[3] += 1
+                stat[4] = value
+
+
+class TelemetryAggregator:
+    """스테이션별 텀블링 윈도우 집계
+
+    - 윈도우는 epoch 기준으로 window_seconds 단위 정렬 (페이로드 timestamp 기준)
+    - 다음 윈도우의 메시지가 오거나, 윈도우 종료 후 grace_seconds 동안 메시지가 없으면 롤업 방출
+    - 이미 방출한 윈도우에 해당하는 지연 샘플은 late_samples로 집계하고 버림
+      (다른 윈도우에 섞거나 같은 윈도우 롤업을 두 번 방출하지 않음)
+    - passthrough_stations에 포함된 스테이션은 원시 telemetry도 그대로 전달
+    """
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], Any], window_seconds: float = 10.0,
+                 fields: Optional[List[str]] = None, passthrough_stations: Optional[List[str]] = None,
+                 grace_seconds: float = 5.0):
+        self.emit = emit
+        self.window_seconds = float(window_seconds)
+        self.fields = fields or ["sensors"]
+        self.passthrough_stations = set(passthrough_stations or [])
+        self.grace_seconds = float(grace_seconds)
+        self.flattener = PayloadFlattener(self.fields)
+        self.logger = logging.getLogger(__name__)
+
+        self._windows: Dict[str, _Window] = {}
+        # 스테이션별 방출 완료된 마지막 윈도우 종료 시각
+        self._emitted_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.samples_in = 0
+        self.rollups_out = 0
+        self.late_samples = 0
+
+    def is_passthrough(self, station_id: str) -> bool:
+        """원시 telemetry 전달 대상 여부"""
+        return station_id in self.passthrough_stations
+
+    def add(self, message: MQTTMessage):
+        """telemetry 메시지 1건 집계"""
+        metrics = self.flattener.flatten((message.station_id, message.data_type), message.data)
+
+        event_time = message.event_time
+        window_start = event_time - (event_time % self.window_seconds)
+
+        closed = None
+        with self._lock:
+            self.samples_in += 1
+            window = self._windows.get(message.station_id)
+
+            if (window is not None and window_start < window.start) or \
+                    window_start < self._emitted_until.get(message.station_id, float("-inf")):
+                # 이미 닫힌 윈도우에 해당하는 지연 샘플
+                self.late_samples += 1
+                return
+            if window is None or window_start > window.start:
+                closed = window
+                if closed is not None:
+                    self._close(message.station_id, closed)
+                window = _Window(window_start, message.topic)
+                self._windows[message.station_id] = window
+
+            window.add(metrics)
+
+        if closed is not None:
+            self._emit(message.station_id, closed)
+
+    def flush_expired(self, now: Optional[float] = None):
+        """종료 후 grace_seconds가 지난 윈도우 방출 (메시지가 끊긴 스테이션 대비)"""
+        if now is None:
+            now = time.time()
+        deadline = now - self.window_seconds - self.grace_seconds
+
+        with self._lock:
+            expired = [(station_id, window) for station_id, window in self._windows.items()
+                       if window.start <= deadline]
+            for station_id, window in expired:
+                del self._windows[station_id]
+                self._close(station_id, window)
+
+        for station_id, window in expired:
+            self._emit(station_id, window)
+
+    def flush_all(self):
+        """모든 윈도우 방출 (종료 시)"""
+        with self._lock:
+            windows = list(self._windows.items())
+            self._windows.clear()
+            for station_id, window in windows:
+                self._close(station_id, window)
+
+        for station_id, window in windows:
+            self._emit(station_id, window)
+
+    def _close(self, station_id: str, window: _Window):
+        """방출 경계 갱신 (lock 보유 상태에서 호출)"""
+        self._emitted_until[station_id] = window.start + self.window_seconds
+
+    def _emit(self, station_id: str, window: _Window):
+        """롤업 레코드 생성 및 전달"""
+        if window.count == 0:
+            return
+
+        window_end = window.start + self.window_seconds
+        rollup = {
+            "stationId": station_id,
+            "timestamp": datetime.fromtimestamp(window_end).isoformat(),
+            "dataType": "telemetry_rollup",
+            "windowStart": datetime.fromtimestamp(window.start).isoformat(),
+            "windowEnd": datetime.fromtimestamp(window_end).isoformat(),
+            "windowSeconds": self.window_seconds,
+            "sampleCount": window.count,
+            "metrics": {
+                name: {
+                    "min": stat[0],
+                    "max": stat[1],
+                    "mean": round(stat[2] / stat[3], 4),
+                    "last": stat[4],
+                    "count": stat[3]
+                }
+                for name, stat in window.stats.items()
+            },
+            "processedAt": datetime.now().isoformat(),
+            "topic": window.topic
+        }
+
+        with self._lock:
+            self.rollups_out += 1
+
+        try:
+            self.emit(rollup)
+        except Exception as e:
+            self.logger.error(f"롤업 전달 오류 ({station_id}): {e}")
+
+    def start(self):
+        """만료 윈도우 방출 스레드 시작"""
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="telemetry-aggregator", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📉 텔레메트리 다운샘플링: {self.window_seconds}초 윈도우")
+
+    def stop(self):
+        """스레드 종료 및 남은 윈도우 방출"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.window_seconds)
+            self._thread = None
+        self.flush_all()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(max(1.0, self.window_seconds / 2)):
+            self.flush_expired()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """집계 통계 반환"""
+        with self._lock:
+            return {
+                "open_windows": len(self._windows),
+                "samples_in": self.samples_in,
+                "rollups_out": self.rollups_out,
+                "late_samples": self.late_samples,
+                "flattener": self.flattener.get_stats()
+            }
@@ -1,63 +1,247 @@
 import requests
-import json
+import threading
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
+from .codec import get_codec
+from .spool import DiskSpool
+from .circuit_breaker import CircuitBreaker
+from .retry_scheduler import RetryScheduler
+from .metrics import BACKEND_REQUESTS_TOTAL, BACKEND_REQUEST_SECONDS
+
+# 전송 결과 (send_* 반환값)
+SEND_OK = "sent"            # 백엔드 200 응답
+SEND_DEFERRED = "deferred"  # 재시도 예약 또는 스풀 보관 - 나중에 재전송되므로 실패로 집계하지 않음
+SEND_DROPPED = "dropped"    # 스풀 비활성화/레코드 크기 초과로 폐기 (영구 실패)
+
+# config api.endpoints에 없을 때 사용하는 경로
+DEFAULT_ENDPOINTS = {
+    "iot_data_batch": "/api/iot-data/batch",
+    "kpi_data_batch": "/api/kpi/data/batch",
+    "kpi_windows": "/api/kpi/windows",
+}
 
 class APIClient:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], codec=None):
         self.base_url = config['api'].get('base_url', config['api'].get('backend_url'))
         self.endpoints = config['api']['endpoints']
         self.timeout = config['api']['timeout']
         self.retry_count = config['api'].get('retry_count', 3)
         self.logger = logging.getLogger(__name__)
         
+        # 요청 본문 직렬화 코덱 (processing.json_codec)
+        self.codec = codec or get_codec(config.get('processing', {}).get('json_codec', 'auto'))
+        
+        # 전송 실패 요청을 보관하는 디스크 스풀 (백엔드 장애 대비)
+        spool_config = config.get('spool', {})
+        self.spool: Optional[DiskSpool] = None
+        if spool_config.get('enabled', False):
+            self.spool = DiskSpool(
+                directory=spool_config.get('directory', 'spool'),
+                codec=self.codec,
+                segment_bytes=spool_config.get('segment_size_mb', 8) * 1024 * 1024,
+                max_bytes=spool_config.get('max_size_mb', 256) * 1024 * 1024,
+                replay_interval=spool_config.get('replay_interval', 5),
+                cursor_sync_records=spool_config.get('cursor_sync_records', 100)
+            )
+        
+        # 엔드포인트별 서킷 브레이커 + 비블로킹 재시도 스케줄러
+        self.breaker_config = config['api'].get('circuit_breaker', {})
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._breaker_lock = threading.Lock()
+        self.retry_scheduler = RetryScheduler(max_pending=config['api'].get('max_pending_retries', 1000))
+        
+        # 엔드포인트별 수락(200 응답) 콜백 - 첫 시도/타이머 재시도/스풀 재전송 모두에서 호출
+        self._ack_handlers: Dict[str, List[Callable[[Any], Any]]] = {}
+        
+        # 통계 (요청 단위: 성공(재시도 포함) / 재시도 예약 / 스풀 / 폐기)
+        self._stats_lock = threading.Lock()
+        self.sent_count = 0
+        self.retried_count = 0
+        self.spooled_count = 0
+        self.dropped_count = 0
+        
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'DataCollector-KPI/2.0'
         })
     
-    def send_iot_data(self, data: Dict[str, Any]) -> bool:
+    def send_iot_data(self, data: Dict[str, Any]) -> str:
         """기존 IoT 데이터 전송"""
         return self._send_data(self.endpoints['iot_data'], data)
     
-    def send_kpi_data(self, kpi_data: Dict[str, Any]) -> bool:
+    def send_iot_data_batch(self, records: List[Dict[str, Any]]) -> str:
+        """IoT 데이터 일괄 전송 (JSON 배열 1회 요청)"""
+        return self._send_data(self.endpoint('iot_data_batch'), records)
+    
+    def send_kpi_data(self, kpi_data: Dict[str, Any]) -> str:
         """🆕 KPI 데이터 전송"""
         return self._send_data(self.endpoints['kpi_data'], kpi_data)
     
-    def _send_data(self, endpoint: str, data: Dict[str, Any]) -> bool:
-        """데이터 전송 (재시도 로직 포함)"""
+    def send_kpi_data_batch(self, snapshots: List[Dict[str, Any]]) -> str:
+        """스테이션 KPI 스냅샷 일괄 전송 (JSON 배열 1회 요청)"""
+        return self._send_data(self.endpoint('kpi_data_batch'), snapshots)
+    
+    def send_kpi_windows(self, records: List[Dict[str, Any]]) -> str:
+        """확정된 이벤트 시간 KPI 윈도우 일괄 전송"""
+        return self._send_data(self.endpoint('kpi_windows'), records)
+    
+    def endpoint(self, name: str) -> str:
+        """설정 이름(iot_data_batch 등) → 요청 경로"""
+        return self.endpoints.get(name) or DEFAULT_ENDPOINTS[name]
+    
+    def add_ack_handler(self, endpoint: str, handler: Callable[[Any], Any]):
+        """endpoint 요청이 백엔드에 수락될 때마다 handler(data) 호출
+
+        첫 시도뿐 아니라 타이머 재시도와 스풀 재전송이 성공한 경우에도 호출되므로,
+        종단 간 지연 추적에서 느린 꼬리(재시도/장애 복구 구간)가 빠지지 않는다.
+        """
+        self._ack_handlers.setdefault(endpoint, []).append(handler)
+    
+    def _acked(self, endpoint: str, data: Any):
+        for handler in self._ack_handlers.get(endpoint, ()):
+            try:
+                handler(data)
+            except Exception as e:
+                self.logger.error(f"수락 콜백 오류 ({endpoint}): {e}")
+    
+    def _send_data(self, endpoint: str, data: Any, attempt: int = 0) -> str:
+        """데이터 전송 - 1회 시도 후 실패하면 타이머로 재시도 예약 (호출 스레드 블로킹 없음)
+
+        서킷이 열려 있으면 요청 없이 즉시 스풀로 보내고,
+        재시도(retry_count)를 모두 소진하면 스풀에 보관한다.
+        반환값: SEND_OK / SEND_DEFERRED(재시도 예약·스풀 보관) / SEND_DROPPED(영구 실패)
+        """
+        breaker = self._get_breaker(endpoint)
+        
+        if not breaker.allow_request():
+            # 백엔드 장애 확인 상태 - 건별 재시도 없이 즉시 버퍼링
+            return self._spool(endpoint, data)
+        
+        if self._post(endpoint, data, attempt):
+            breaker.record_success()
+            with self._stats_lock:
+                self.sent_count += 1
+            self._acked(endpoint, data)
+            return SEND_OK
+        
+        breaker.record_failure()
+        
+        if attempt + 1 >= self.retry_count:
+            return self._spool(endpoint, data)
+        
+        # 지수 백오프 재시도를 타이머에 예약 (예약 불가 시 on_cancel에서 스풀)
+        cancelled = []
+        scheduled = self.retry_scheduler.schedule(
+            2 ** attempt,
+            lambda: self._send_data(endpoint, data, attempt + 1),
+            on_cancel=lambda: cancelled.append(self._spool(endpoint, data))
+        )
+        if not scheduled:
+            return cancelled[0] if cancelled else SEND_DROPPED
+        with self._stats_lock:
+            self.retried_count += 1
+        return SEND_DEFERRED
+    
+    def _post(self, endpoint: str, data: Any, attempt: int = 0) -> bool:
+        """단일 POST 요청 (지연/결과는 collector_backend_* 메트릭에 기록)"""
         url = f"{self.base_url}{endpoint}"
+        outcome = "error"
+        started = time.perf_counter()
         
-        for attempt in range(self.retry_count):
-            try:
-                response = self.session.post(
-                    url, 
-                    json=data, 
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    return True
-                else:
-                    self.logger.warning(f"⚠️ API 오류 ({attempt+1}/{self.retry_count}): {response.status_code}")
-                    
-            except requests.exceptions.ConnectionError:
-                self.logger.warning("⚠️ API 서버 연결 실패 (Spring Boot 서버가 실행 중인지 확인)")
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"❌ 네트워크 오류 ({attempt+1}/{self.retry_count}): {e}")
+        try:
+            response = self.session.post(
+                url, 
+                data=self.codec.dumps(data), 
+                timeout=self.timeout
+            )
             
-            if attempt < self.retry_count - 1:
-                time.sleep(2 ** attempt)  # 지수 백오프
+            if response.status_code == 200:
+                outcome = "success"
+                return True
+            else:
+                outcome = "http_error"
+                self.logger.warning(f"⚠️ API 오류 ({attempt+1}/{self.retry_count}): {response.status_code}")
+                
+        except requests.exceptions.ConnectionError:
+            outcome = "connection_error"
+            self.logger.warning("⚠️ API 서버 연결 실패 (Spring Boot 서버가 실행 중인지 확인)")
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"❌ 네트워크 오류 ({attempt+1}/{self.retry_count}): {e}")
+        finally:
+            BACKEND_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+            BACKEND_REQUESTS_TOTAL.inc(endpoint, outcome)
         
         return False
     
+    def _spool(self, endpoint: str, data: Any) -> str:
+        """전송 실패 요청 스풀 저장 (스풀 비활성화 시 폐기)"""
+        if self.spool is not None and self.spool.append(endpoint, data):
+            self.logger.debug(f"💾 전송 실패 요청 스풀 저장: {endpoint}")
+            with self._stats_lock:
+                self.spooled_count += 1
+            return SEND_DEFERRED
+        with self._stats_lock:
+            self.dropped_count += 1
+        return SEND_DROPPED
+    
+    def _get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """엔드포인트별 서킷 브레이커"""
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            with self._breaker_lock:
+                breaker = self.breakers.setdefault(endpoint, CircuitBreaker(
+                    endpoint,
+                    failure_threshold=self.breaker_config.get('failure_threshold', 5),
+                    reset_timeout=self.breaker_config.get('reset_timeout', 30)
+                ))
+        return breaker
+    
+    def _replay_data(self, endpoint: str, data: Any) -> bool:
+        """스풀 재전송 - 1회 시도, 실패 시 다음 재전송 주기에 다시 시도"""
+        breaker = self._get_breaker(endpoint)
+        if self._post(endpoint, data):
+            breaker.record_success()
+            self._acked(endpoint, data)
+            return True
+        breaker.record_failure()
+        return False
+    
+    def start(self):
+        """재시도 스케줄러 및 스풀 재전송 스레드 시작"""
+        self.retry_scheduler.start()
+        if self.spool is not None:
+            self.spool.start(self._replay_data, self.health_check)
+    
+    def close(self):
+        """대기 중인 재시도는 스풀로 이관하고 종료"""
+        self.retry_scheduler.stop()
+        if self.spool is not None:
+            self.spool.stop()
+        self.session.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """전송/스풀 통계 반환"""
+        with self._stats_lock:
+            counts = {
+                "sent_count": self.sent_count,
+                "retried_count": self.retried_count,
+                "spooled_count": self.spooled_count,
+                "dropped_count": self.dropped_count
+            }
+        return {
+            **counts,
+            "retries": self.retry_scheduler.get_stats(),
+            "circuit_breakers": {endpoint: breaker.get_stats() for endpoint, breaker in list(self.breakers.items())},
+            "spool": self.spool.get_stats() if self.spool is not None else None
+        }
+    
     def health_check(self) -> bool:
         """API 서버 상태 확인"""
         try:
             response = self.session.get(
-                f"{self.base_url}/actuator/health", 
+                f"{self.base_url}{self.endpoints.get('health', '/actuator/health')}", 
                 timeout=5
             )
             return response.status_code == 200
@@ -0,0 +1,174 @@
+"""
+배치 전송 싱크
+처리된 레코드를 모아서 크기/경과 시간 기준으로 한 번에 전송
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, Any, List, Union
+
+from .api_client import SEND_OK, SEND_DEFERRED
+
+
+class BatchSink:
+    """레코드 버퍼링 후 일괄 전송
+
+    - batch_size 만큼 모이면 즉시 전송 (add를 호출한 워커 스레드에서)
+    - 가장 오래된 레코드가 flush_interval 초를 넘기면 백그라운드 스레드가 전송
+    - stop() 시 남은 레코드 최종 전송
+    - send_batch는 bool 또는 APIClient 전송 결과(SEND_OK / SEND_DEFERRED / SEND_DROPPED)를 반환
+      (SEND_DEFERRED는 재시도/스풀로 넘어간 배치 - 실패가 아니라 deferred로 집계)
+    """
+
+    def __init__(self, send_batch: Callable[[List[Dict[str, Any]]], Union[bool, str]],
+                 batch_size: int = 100, flush_interval: float = 5.0, name: str = "batch"):
+        self.send_batch = send_batch
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._oldest_at = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.batches_sent = 0
+        self.records_sent = 0
+        self.deferred_batches = 0
+        self.deferred_records = 0
+        self.failed_batches = 0
+        self.failed_records = 0
+
+    def start(self):
+        """시간 기준 플러시 스레드 시작"""
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name=f"{self.name}-flusher",
+            daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"📦 배치 싱크 시작 ({self.name}): {self.batch_size}건 / {self.flush_interval}초")
+
+    def stop(self):
+        """플러시 스레드 종료 및 남은 레코드 최종 전송"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        self.flush()
+
+    def add(self, record: Dict[str, Any]):
+        """레코드 추가 (크기 도달 시 즉시 플러시)"""
+        batch = None
+        with self._lock:
+            if not self._buffer:
+                self._oldest_at = time.monotonic()
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                batch = self._take_buffer()
+
+        if batch:
+            self._send(batch)
+
+    def flush(self) -> bool:
+        """버퍼에 있는 레코드 즉시 전송"""
+        with self._lock:
+            batch = self._take_buffer()
+
+        if not batch:
+            return True
+        return self._send(batch)
+
+    def _take_buffer(self) -> List[Dict[str, Any]]:
+        """버퍼 교체 (lock 보유 상태에서 호출)"""
+        batch = self._buffer
+        self._buffer = []
+        return batch
+
+    def _flush_loop(self):
+        """경과 시간 기준 플러시"""
+        check_interval = max(0.1, self.flush_interval / 4)
+        while not self._stop_event.wait(check_interval):
+            with self._lock:
+                expired = bool(self._buffer) and (time.monotonic() - self._oldest_at) >= self.flush_interval
+                batch = self._take_buffer() if expired else None
+
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        """배치 전송 및 통계 갱신 (재시도/스풀로 넘어간 배치도 True)"""
+        try:
+            result = self.send_batch(batch)
+        except Exception as e:
+            self.logger.error(f"❌ 배치 전송 오류 ({self.name}): {e}")
+            result = False
+
+        with self._lock:
+            if result is True or result == SEND_OK:
+                self.batches_sent += 1
+                self.records_sent += len(batch)
+            elif result == SEND_DEFERRED:
+                self.deferred_batches += 1
+                self.deferred_records += len(batch)
+            else:
+                self.failed_batches += 1
+                self.failed_records += len(batch)
+
+        if result is True or result == SEND_OK:
+            self.logger.debug(f"✅ 배치 전송 완료 ({self.name}): {len(batch)}건")
+            return True
+        if result == SEND_DEFERRED:
+            self.logger.debug(f"🔁 배치 재시도/스풀 ({self.name}): {len(batch)}건")
+            return True
+        self.logger.warning(f"⚠️ 배치 전송 실패 ({self.name}): {len(batch)}건")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """싱크 통계 반환"""
+        with self._lock:
+            return {
+                "pending": len(self._buffer),
+                "batches_sent": self.batches_sent,
+                "records_sent": self.records_sent,
+                "deferred_batches": self.deferred_batches,
+                "deferred_records": self.deferred_records,
+                "failed_batches": self.failed_batches,
+                "failed_records": self.failed_records
+            }
+
+
+class FanoutSink:
+    """여러 싱크(Spring Boot 배치, InfluxDB 등)에 같은 레코드를 전달"""
+
+    def __init__(self, sinks: List[Any]):
+        self.sinks = [sink for sink in sinks if sink is not None]
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, record: Dict[str, Any]):
+        """모든 싱크에 레코드 전달 (한 싱크의 오류가 다른 싱크에 영향 없음)"""
+        for sink in self.sinks:
+            try:
+                sink.add(record)
+            except Exception as e:
+                self.logger.error(f"싱크 전달 오류 ({type(sink).__name__}): {e}")
+
+    def flush(self) -> bool:
+        """모든 싱크 즉시 플러시"""
+        return all([sink.flush() for sink in self.sinks])
+
+    def start(self):
+        for sink in self.sinks:
+            sink.start()
+
+    def stop(self):
+        for sink in self.sinks:
+            sink.stop()
@@ -0,0 +1,98 @@
+"""
+MQTT 캡처 파일
+수신 시각과 함께 MQTT 메시지를 압축 바이너리 파일로 기록하고, 원래 간격(또는 N배속)으로 재생
+
+파일 형식 (gzip 스트림):
+    헤더  b"MQCAP1\\n"
+    레코드 struct("<dHI") = (수신 epoch 초, 토픽 길이, 페이로드 길이) + 토픽(UTF-8) + 페이로드
+"""
+
+import gzip
+import struct
+import threading
+import time
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+MAGIC = b"MQCAP1\n"
+_RECORD_HEADER = struct.Struct("<dHI")
+
+# (수신 epoch 초, 토픽, 페이로드)
+CaptureRecord = Tuple[float, str, bytes]
+
+
+class CaptureWriter:
+    """캡처 파일 기록 (MQTT 수신 스레드에서 호출해도 되도록 lock 보호)"""
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        self.path = path
+        self._file: BinaryIO = gzip.open(path, "wb", compresslevel=compresslevel)
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self.record_count = 0
+        self.payload_bytes = 0
+
+    def write(self, topic: str, payload: bytes, received_at: Optional[float] = None):
+        if received_at is None:
+            received_at = time.time()
+        topic_bytes = topic.encode("utf-8")
+        with self._lock:
+            self._file.write(_RECORD_HEADER.pack(received_at, len(topic_bytes), len(payload)))
+            self._file.write(topic_bytes)
+            self._file.write(payload)
+            self.record_count += 1
+            self.payload_bytes += len(payload)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """캡처 파일 레코드를 순서대로 반환"""
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"캡처 파일 형식이 아님: {path}")
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < _RECORD_HEADER.size:
+                raise ValueError(f"캡처 파일이 잘림: {path}")
+            received_at, topic_length, payload_length = _RECORD_HEADER.unpack(header)
+            topic = f.read(topic_length).decode("utf-8")
+            payload = f.read(payload_length)
+            if len(payload) < payload_length:
+                raise ValueError(f"캡처 파일이 잘림: {path}")
+            yield received_at, topic, payload
+
+
+def replay(records: Iterator[CaptureRecord], deliver: Callable[[str, bytes], None],
+           speed: float = 1.0, stop_event: Optional[threading.Event] = None) -> Tuple[int, float]:
+    """캡처 레코드를 원래 간격으로 재생
+
+    speed: 1.0 = 원래 속도, N = N배속, 0 이하 = 대기 없이 최대 속도
+    반환: (전달 건수, 경과 초)
+    """
+    started = time.monotonic()
+    first_at = None
+    count = 0
+
+    for received_at, topic, payload in records:
+        if stop_event is not None and stop_event.is_set():
+            break
+
+        if speed > 0:
+            if first_at is None:
+                first_at = received_at
+            delay = (received_at - first_at) / speed - (time.monotonic() - started)
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        break
+                else:
+                    time.sleep(delay)
+
+        deliver(topic, payload)
+        count += 1
+
+    return count, time.monotonic() - started
@@ -0,0 +1,95 @@
+"""
+서킷 브레이커
+백엔드 장애가 확인되면 요청을 즉시 실패 처리하여 건별 재시도/대기를 막음
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, Any
+
+
+class CircuitBreaker:
+    """엔드포인트 단위 서킷 브레이커 (closed → open → half_open → closed)
+
+    - closed: 정상. 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 모든 요청 즉시 거부
+    - half_open: 시험 요청 1건만 허용, 성공하면 closed / 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # 통계
+        self.rejected_count = 0
+        self.open_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """open 상태에서 reset_timeout 경과 시 half_open으로 전환 (lock 보유 상태에서 호출)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """요청 허용 여부"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self):
+        """요청 성공 기록"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info(f"✅ 서킷 닫힘 ({self.name}): 백엔드 복구")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """요청 실패 기록"""
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or (state == self.CLOSED and
+                                           self._consecutive_failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+                self.open_count += 1
+                self.logger.warning(f"⚠️ 서킷 열림 ({self.name}): 연속 실패 {self._consecutive_failures}회, "
+                                    f"{self.reset_timeout}초 동안 즉시 실패 처리")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """브레이커 통계 반환"""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                "rejected_count": self.rejected_count,
+                "open_count": self.open_count
+            }
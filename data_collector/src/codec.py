@@ -0,0 +1,172 @@
+"""
+JSON 코덱
+고속 JSON 라이브러리(orjson → ujson)가 설치되어 있으면 사용하고, 없으면 표준 json으로 대체
+(시뮬레이터는 같은 규칙의 자체 모듈 mosquitto_MQTT/utils/json_codec.py 사용)
+
+코덱과 관계없이 결과가 같도록 orjson 동작에 맞춘다:
+- NaN/Infinity는 null로 직렬화 (JSON 표준에 없는 값, 백엔드 파서가 거부)
+- datetime/date/time은 isoformat() 문자열
+- numpy 스칼라/배열은 숫자/리스트 (orjson OPT_SERIALIZE_NUMPY와 동일)
+- 문자열이 아닌 dict 키(int/float/bool/None)는 문자열 키 (표준 json과 동일)
+- 역직렬화 시 NaN/Infinity 리터럴은 ValueError
+"""
+
+import json
+import logging
+import math
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _is_numpy(obj: Any) -> bool:
+    """numpy 스칼라/배열 (numpy를 import하지 않고 판별)"""
+    return type(obj).__module__ == "numpy" and hasattr(obj, "tolist")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/Infinity → None (비유한 값이 있을 때만 호출되는 느린 경로)"""
+    if _is_numpy(obj):
+        return _finite(obj.tolist())
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _with_isoformat(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """datetime 계열은 isoformat(), numpy는 tolist(), 그 외는 사용자 default (없으면 TypeError)"""
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if _is_numpy(obj):
+            return obj.tolist()
+        if default is not None:
+            return default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return _default
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"JSON에 허용되지 않는 값: {name}")
+
+
+class JSONCodec:
+    """표준 json 코덱 (기본 구현)
+
+    dumps()는 항상 UTF-8 bytes를 반환하여 HTTP 본문/MQTT 페이로드로 바로 사용한다.
+    """
+
+    name = "json"
+
+    def __init__(self, default: Optional[Callable[[Any], Any]] = None):
+        self.default = default
+        self._default = _with_isoformat(default)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data, parse_constant=_reject_constant)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                              allow_nan=False, default=self._default)
+        except ValueError:
+            text = json.dumps(_finite(obj), ensure_ascii=False, separators=(',', ':'),
+                              allow_nan=False, default=self._default)
+        return text.encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """orjson 코덱 (Rust 구현, datetime 기본 지원)
+
+    orjson이 직렬화하지 못하는 값(64비트를 넘는 정수 등)은 표준 json 경로로 다시 시도
+    """
+
+    name = "orjson"
+
+    def __init__(self, default: Optional[Callable[[Any], Any]] = None):
+        import orjson
+        super().__init__(default)
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._orjson.dumps(obj, default=self.default, option=self._options)
+        except self._orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """ujson 코덱 (C 구현)"""
+
+    name = "ujson"
+
+    def __init__(self, default: Optional[Callable[[Any], Any]] = None):
+        import ujson
+        super().__init__(default)
+        self._ujson = ujson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            text = self._ujson.dumps(obj, ensure_ascii=False, allow_nan=False, default=self._default)
+        except (ValueError, OverflowError):
+            text = self._ujson.dumps(_finite(obj), ensure_ascii=False, allow_nan=False, default=self._default)
+        return text.encode('utf-8')
+
+
+# auto 선택 시 우선순위
+_CODECS: Dict[str, type] = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+
+
+def get_codec(name: str = "auto", default: Optional[Callable[[Any], Any]] = None) -> JSONCodec:
+    """설정 이름으로 코덱 생성 (auto | orjson | ujson | json)
+
+    요청한 라이브러리가 설치되어 있지 않으면 경고 후 다음 후보로 대체한다.
+    """
+    name = (name or "auto").lower()
+    if name == "auto":
+        candidates = list(_CODECS)
+    elif name in _CODECS:
+        candidates = [name, "json"]
+    else:
+        logger.warning(f"⚠️ 알 수 없는 JSON 코덱 '{name}' - 자동 선택")
+        candidates = list(_CODECS)
+
+    for candidate in candidates:
+        try:
+            codec = _CODECS[candidate](default)
+        except ImportError:
+            if candidate == name:
+                logger.warning(f"⚠️ {name} 미설치 - 표준 json 사용")
+            continue
+        logger.info(f"🧩 JSON 코덱: {codec.name}")
+        return codec
+
+    return JSONCodec(default)
+
+
+def available_codecs() -> List[str]:
+    """현재 환경에서 사용 가능한 코덱 이름 목록"""
+    names = []
+    for name, codec_class in _CODECS.items():
+        try:
+            codec_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
@@ -1,54 +1,77 @@
-import json
 import logging
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
+from .models.message import MQTTMessage
+from .api_client import SEND_OK, SEND_DEFERRED
+from .metrics import STAGE_SECONDS
+from .flattener import PayloadFlattener
+
+_TRANSFORM_SECONDS = STAGE_SECONDS.labels("transform")
 
 class DataProcessor:
-    def __init__(self, api_client):
-        """데이터 프로세서 초기화"""
+    def __init__(self, api_client, sink=None, aggregator=None, flattener=None):
+        """데이터 프로세서 초기화
+
+        sink가 주어지면 레코드를 배치 싱크에 적재하고, 없으면 건별로 즉시 전송
+        aggregator가 주어지면 telemetry는 윈도우 롤업만 전달 (패스스루 스테이션 제외)
+        flattener는 파생 지표 계산용 센서 평탄화 (없으면 sensors 필드 전용으로 생성)
+        """
         self.api_client = api_client
+        self.sink = sink
+        self.aggregator = aggregator
+        self.flattener = flattener or PayloadFlattener(["sensors"])
         self.logger = logging.getLogger(__name__)
         self.processed_count = 0
         
         self.logger.info("데이터 프로세서 초기화 완료")
     
-    def process_message(self, topic: str, payload: str) -> Optional[Dict[str, Any]]:
-        """MQTT 메시지 처리 및 API 전송"""
+    def process_message(self, message: MQTTMessage) -> Optional[Dict[str, Any]]:
+        """MQTT 메시지 처리 및 API 전송 (디코딩된 봉투 사용)"""
         try:
-            # JSON 파싱
-            raw_data = json.loads(payload)
+            # telemetry 다운샘플링: 롤업은 aggregator가 윈도우 종료 시 전달
+            if self.aggregator is not None and message.data_type == "telemetry":
+                self.aggregator.add(message)
+                if not self.aggregator.is_passthrough(message.station_id):
+                    self.processed_count += 1
+                    return None
             
             # 데이터 정제 및 가공
-            processed_data = self._process_iot_data(raw_data, topic)
+            started = time.perf_counter()
+            processed_data = self._process_iot_data(message)
+            _TRANSFORM_SECONDS.observe(time.perf_counter() - started)
+            
+            # 배치 싱크 적재 (크기/시간 기준으로 일괄 전송)
+            if self.sink is not None:
+                self.sink.add(processed_data)
+                self.processed_count += 1
+                return processed_data
             
             # Spring Boot API로 전송 (실패해도 계속 진행)
-            success = self.api_client.send_iot_data(processed_data)
+            result = self.api_client.send_iot_data(processed_data)
             
-            if success:
+            if result == SEND_OK:
                 self.processed_count += 1
                 self.logger.debug(f"✅ 데이터 처리 완료: {processed_data.get('stationId')}")
+            elif result == SEND_DEFERRED:
+                self.processed_count += 1
+                self.logger.debug(f"🔁 전송 재시도/스풀 예약: {processed_data.get('stationId')}")
             else:
                 self.logger.warning(f"⚠️ API 전송 실패: {processed_data.get('stationId')} (Spring Boot 서버 확인)")
             
             return processed_data
                 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON 파싱 오류: {e}")
-            return None
         except Exception as e:
             self.logger.error(f"데이터 처리 오류: {e}")
             return None
     
-    def _process_iot_data(self, raw_data: Dict[str, Any], topic: str) -> Dict[str, Any]:
+    def _process_iot_data(self, message: MQTTMessage) -> Dict[str, Any]:
         """IoT 데이터 정제 및 가공"""
-        
-        # 토픽에서 스테이션 ID 추출
-        topic_parts = topic.split('/')
-        station_id = topic_parts[2] if len(topic_parts) > 2 else "UNKNOWN"
+        raw_data = message.data
         
         # 기본 구조 생성
         processed_data = {
-            "stationId": raw_data.get("station_id", station_id),
+            "stationId": raw_data.get("station_id", message.station_id),
             "timestamp": raw_data.get("timestamp", datetime.now().isoformat()),
             "processType": raw_data.get("process_type", "unknown"),
             "location": raw_data.get("location", "Unknown Location"),
@@ -57,7 +80,7 @@ class DataProcessor:
             "quality": raw_data.get("quality", {}),
             "alerts": raw_data.get("alerts", {}),
             "processedAt": datetime.now().isoformat(),
-            "topic": topic
+            "topic": message.topic
         }
         
         # 특화 데이터 통합
@@ -73,31 +96,53 @@ class DataProcessor:
         if "inventory_specific" in raw_data:
             processed_data["inventoryData"] = raw_data["inventory_specific"]
         
-        # 파생 지표 계산
-        processed_data["derivedMetrics"] = self._calculate_derived_metrics(processed_data)
+        # 파생 지표 계산 (중첩 센서 값은 평탄화해서 사용)
+        flat_sensors = self.flattener.flatten((message.station_id, message.data_type), raw_data)
+        processed_data["derivedMetrics"] = self._calculate_derived_metrics(processed_data, raw_data, flat_sensors)
         
         return processed_data
     
-    def _calculate_derived_metrics(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """파생 지표 계산"""
+    def _calculate_derived_metrics(self, data: Dict[str, Any], raw_data: Optional[Dict[str, Any]] = None,
+                                   flat_sensors: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """파생 지표 계산
+
+        시뮬레이터 센서는 중첩 구조(sensors.temperature_sensor.value 등)이므로
+        평탄화된 경로에서 온도 측정값을 찾는다 (target_* 설정값 제외)
+        """
         metrics = {}
+        raw_data = raw_data or {}
         
-        sensors = data.get("sensors", {})
+        if flat_sensors is None:
+            flat_sensors = {}
+            sensors = data.get("sensors", {})
+            if isinstance(sensors, dict):
+                flat_sensors = {f"sensors.{key}": float(value) for key, value in sensors.items()
+                                if isinstance(value, (int, float)) and not isinstance(value, bool)}
         
-        # 효율성 지표
-        if "temperature" in sensors:
-            temp_efficiency = max(0, 1 - abs(sensors["temperature"] - 35) / 35)
+        # 효율성 지표 (온도 측정값 기준)
+        temperature = None
+        for name, value in flat_sensors.items():
+            if "temperature" in name and "target" not in name:
+                temperature = value
+                break
+        if temperature is not None:
+            temp_efficiency = max(0, 1 - abs(temperature - 35) / 35)
             metrics["efficiency"] = round(temp_efficiency, 3)
         
-        # 성능 지표
+        # 성능 지표 (시간당 처리량, 없으면 목표/실제 사이클 타임 비율)
         production = data.get("production", {})
+        cycle_info = raw_data.get("cycle_info")
         if "throughput_per_hour" in production:
             metrics["performanceScore"] = min(1.0, production["throughput_per_hour"] / 100)
+        elif isinstance(cycle_info, dict) and cycle_info.get("cycle_time") and cycle_info.get("target_time"):
+            metrics["performanceScore"] = round(min(1.0, cycle_info["target_time"] / cycle_info["cycle_time"]), 3)
         
-        # 품질 지표
+        # 품질 지표 (quality 토픽은 overall_score가 최상위)
         quality = data.get("quality", {})
         if "overall_score" in quality:
             metrics["qualityIndex"] = quality["overall_score"]
+        elif "overall_score" in raw_data:
+            metrics["qualityIndex"] = raw_data["overall_score"]
         
         return metrics
     
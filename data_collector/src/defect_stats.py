@@ -0,0 +1,171 @@
+"""
+불량 통계
+스테이션별 불량 유형 빈도를 고정 크기 메모리로 집계 (Space-Saving 상위 유형 + 시간 버킷)
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# capacity를 넘는 신규 유형이 버킷에서 합산되는 키
+OTHER = "_other"
+
+
+class DefectStats:
+    """불량 유형별 카운터 (가동 시간과 무관하게 메모리 일정)
+
+    - 전체 누적: Space-Saving 알고리즘으로 최대 capacity개 유형 추적.
+      유형 수가 capacity 이하이면 정확한 값이고, 넘으면 최소 카운트 유형을 교체하며
+      교체된 유형은 카운트를 물려받는다 (error = 과대 추정 상한)
+    - 시간 버킷: bucket_seconds 단위 최근 bucket_count개, 버킷당 추적 중이던 유형만 집계
+      (추적 대상이 아니었거나 방금 교체로 들어온 유형, 버킷의 유형 수가 capacity에 도달한 뒤의
+      새 유형은 OTHER로 합산 → 버킷당 키는 최대 capacity + 1개)
+    """
+
+    __slots__ = ("capacity", "bucket_seconds", "bucket_count", "total_defects",
+                 "defective_inspections", "_counts", "_errors", "_buckets", "_top")
+
+    def __init__(self, capacity: int = 32, bucket_seconds: float = 3600.0, bucket_count: int = 24):
+        self.capacity = max(1, int(capacity))
+        self.bucket_seconds = float(bucket_seconds)
+        self.bucket_count = max(1, int(bucket_count))
+
+        self.total_defects = 0
+        self.defective_inspections = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # [(버킷 시작 epoch, {유형: 건수})], 오래된 순
+        self._buckets: List[Tuple[float, Dict[str, int]]] = []
+        # top() 결과 캐시 (k, 결과) - add 시 무효화 (KPI 계산마다 정렬하지 않음)
+        self._top: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+
+    def add(self, defects: Iterable[Any], at: Optional[float] = None):
+        """검사 1건의 불량 목록 기록 (문자열 외 항목은 type/name 키 또는 str 사용)"""
+        names = [_defect_name(defect) for defect in defects]
+        if not names:
+            return
+        if at is None:
+            at = time.time()
+
+        self.defective_inspections += 1
+        self.total_defects += len(names)
+        self._top = None
+        bucket = self._bucket(at)
+
+        for name in names:
+            # 버킷 키는 교체 전에 결정 (교체되어 들어온 유형은 항상 _counts에 있으므로)
+            tracked = self._count(name)
+            if not tracked or (name not in bucket and len(bucket) - (OTHER in bucket) >= self.capacity):
+                name = OTHER
+            bucket[name] = bucket.get(name, 0) + 1
+
+    def _count(self, name: str) -> bool:
+        """Space-Saving 갱신 - 교체 없이 추적 중인(또는 빈 자리에 추가된) 유형이면 True"""
+        counts = self._counts
+        if name in counts:
+            counts[name] += 1
+            return True
+        elif len(counts) < self.capacity:
+            counts[name] = 1
+            self._errors[name] = 0
+            return True
+        else:
+            # 최소 카운트 유형 교체 (capacity는 작으므로 선형 탐색)
+            victim = min(counts, key=counts.get)
+            floor = counts.pop(victim)
+            del self._errors[victim]
+            counts[name] = floor + 1
+            self._errors[name] = floor
+            return False
+
+    def _bucket(self, at: float) -> Dict[str, int]:
+        start = at - (at % self.bucket_seconds)
+        buckets = self._buckets
+        if buckets and buckets[-1][0] == start:
+            return buckets[-1][1]
+
+        # 지연 도착분은 해당 버킷이 남아 있으면 그곳에, 없으면 최신 버킷에 합산
+        for bucket_start, counts in reversed(buckets):
+            if bucket_start == start:
+                return counts
+        if buckets and start < buckets[-1][0]:
+            return buckets[-1][1]
+
+        counts: Dict[str, int] = {}
+        buckets.append((start, counts))
+        if len(buckets) > self.bucket_count:
+            del buckets[0]
+        return counts
+
+    def top(self, k: int = 5) -> List[Dict[str, Any]]:
+        """빈도 상위 k개 유형 [{type, count, error}]"""
+        cached = self._top
+        if cached is None or cached[0] != k:
+            ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:k]
+            cached = self._top = (k, [{"type": name, "count": count, "error": self._errors[name]}
+                                      for name, count in ranked])
+        return [dict(entry) for entry in cached[1]]
+
+    def pareto(self, k: int = 10) -> List[Dict[str, Any]]:
+        """상위 k개 유형과 누적 비율(%) - 파레토 차트용"""
+        result = []
+        cumulative = 0
+        for entry in self.top(k):
+            cumulative += entry["count"]
+            entry["cumulative_percent"] = round(cumulative / self.total_defects * 100, 1) if self.total_defects else 0.0
+            result.append(entry)
+        return result
+
+    def recent(self, seconds: float, now: Optional[float] = None) -> Dict[str, int]:
+        """최근 seconds 동안(버킷 단위) 유형별 건수"""
+        if now is None:
+            now = time.time()
+        cutoff = now - seconds
+        result: Dict[str, int] = {}
+        for bucket_start, counts in self._buckets:
+            if bucket_start + self.bucket_seconds <= cutoff:
+                continue
+            for name, count in counts.items():
+                result[name] = result.get(name, 0) + count
+        return result
+
+    def __len__(self) -> int:
+        """누적 불량 건수 (기존 defects 리스트 길이와 동일)"""
+        return self.total_defects
+
+    def to_state(self) -> Dict[str, Any]:
+        """체크포인트용 전체 상태"""
+        return {
+            "total_defects": self.total_defects,
+            "defective_inspections": self.defective_inspections,
+            "counts": dict(self._counts),
+            "errors": dict(self._errors),
+            "buckets": [[start, dict(counts)] for start, counts in self._buckets]
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], capacity: int = 32, bucket_seconds: float = 3600.0,
+                   bucket_count: int = 24) -> "DefectStats":
+        """체크포인트 복원 (capacity가 줄었으면 상위 유형만 유지)"""
+        stats = cls(capacity, bucket_seconds, bucket_count)
+        stats.total_defects = state.get("total_defects", 0)
+        stats.defective_inspections = state.get("defective_inspections", 0)
+        ranked = sorted(state.get("counts", {}).items(), key=lambda item: item[1], reverse=True)[:stats.capacity]
+        errors = state.get("errors", {})
+        stats._counts = dict(ranked)
+        stats._errors = {name: errors.get(name, 0) for name in stats._counts}
+        stats._buckets = [(float(start), dict(counts))
+                          for start, counts in state.get("buckets", [])][-stats.bucket_count:]
+        return stats
+
+    def to_dict(self, top_k: int = 5) -> Dict[str, Any]:
+        return {
+            "total": self.total_defects,
+            "defective_inspections": self.defective_inspections,
+            "top": self.top(top_k)
+        }
+
+
+def _defect_name(defect: Any) -> str:
+    if isinstance(defect, dict):
+        return str(defect.get("type") or defect.get("name") or "unknown")
+    return str(defect)
@@ -0,0 +1,196 @@
+"""
+공장/라인 KPI 증분 집계
+스테이션 KPI가 갱신될 때마다 이전 기여분을 빼고 새 값을 더해 공장 전체와 라인(A/B/C/D)별 합계를 유지
+사이클 타임 분위수는 스테이션별 스케치를 등록해 두었다가 조회 시 라인/공장 단위로 병합
+"""
+
+import math
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .quantile_sketch import TDigest, merge_all
+
+# 스테이션 기여분: (oee, fty, otd, quality_score, throughput)
+_Contribution = Tuple[float, float, float, float, float]
+
+# 증분 합계의 부동소수점 오차 보정 주기 (갱신 횟수)
+RESUM_INTERVAL = 10000
+
+_LINE_PATTERN = re.compile(r"[A-Za-z]+")
+
+
+def station_line(station_id: str) -> str:
+    """스테이션 ID의 라인 접두어 (A01_DOOR → A, WELDING_01 → WELDING)"""
+    match = _LINE_PATTERN.match(station_id)
+    return match.group(0).upper() if match else "UNKNOWN"
+
+
+def _contribution(kpis: Dict[str, Any]) -> _Contribution:
+    return (
+        float(kpis["oee"]["value"]),
+        float(kpis["fty"]["value"]),
+        float(kpis["otd"]["value"]),
+        float(kpis["quality_score"]["value"]),
+        float(kpis["throughput"]["value"])
+    )
+
+
+class _GroupSums:
+    """그룹(공장 또는 라인) 1개의 스테이션 수와 KPI 합계"""
+
+    __slots__ = ("stations", "sums")
+
+    def __init__(self):
+        self.stations = 0
+        self.sums = [0.0, 0.0, 0.0, 0.0, 0.0]
+
+    @classmethod
+    def from_contributions(cls, contributions: List[_Contribution]) -> "_GroupSums":
+        sums = cls()
+        sums.stations = len(contributions)
+        if contributions:
+            sums.sums = [math.fsum(column) for column in zip(*contributions)]
+        return sums
+
+    def add(self, contribution: _Contribution, sign: int):
+        self.stations += sign
+        sums = self.sums
+        for index, value in enumerate(contribution):
+            sums[index] += sign * value
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.stations
+        if count <= 0:
+            return {"oee": 0, "fty": 0, "otd": 0, "quality": 0, "throughput": 0, "active_stations": 0}
+        oee, fty, otd, quality, throughput = self.sums
+        return {
+            "oee": round(oee / count, 2),
+            "fty": round(fty / count, 2),
+            "otd": round(otd / count, 2),
+            "quality": round(quality / count, 3),
+            "throughput": round(throughput, 1),
+            "active_stations": count
+        }
+
+
+class FactoryKPIAggregate:
+    """공장/라인 KPI 증분 집계 - update는 O(1), 조회는 라인 수에 비례 (스테이션 수와 무관)
+
+    스테이션마다 마지막 KPI 기여분만 보관하므로 같은 스테이션이 여러 번 갱신되어도
+    합계에는 최신 값 1개만 반영된다.
+    """
+
+    def __init__(self):
+        self._contributions: Dict[str, _Contribution] = {}
+        self._factory = _GroupSums()
+        self._lines: Dict[str, _GroupSums] = {}
+        self._lock = threading.Lock()
+        self._updates = 0
+        # 스테이션별 사이클 타임 스케치 (전체, {차종: 스케치}) - 복사하지 않고 참조만 보관
+        self._sketches: Dict[str, Tuple[TDigest, Dict[str, TDigest]]] = {}
+
+    def update(self, station_id: str, kpis: Optional[Dict[str, Any]]):
+        """스테이션 KPI 반영 (빈 값이면 해당 스테이션 제거)"""
+        contribution = _contribution(kpis) if kpis else None
+        line = station_line(station_id)
+
+        with self._lock:
+            previous = self._contributions.pop(station_id, None)
+            line_sums = self._lines.get(line)
+            if line_sums is None:
+                line_sums = self._lines[line] = _GroupSums()
+
+            if previous is not None:
+                self._factory.add(previous, -1)
+                line_sums.add(previous, -1)
+            if contribution is not None:
+                self._contributions[station_id] = contribution
+                self._factory.add(contribution, 1)
+                line_sums.add(contribution, 1)
+
+            self._updates += 1
+            if self._updates >= RESUM_INTERVAL:
+                self._resum()
+
+    def _resum(self):
+        """저장된 기여분으로 합계 재계산 (lock 보유 상태에서 호출)"""
+        self._updates = 0
+        grouped: Dict[str, List[_Contribution]] = {line: [] for line in self._lines}
+        for station_id, contribution in self._contributions.items():
+            grouped[station_line(station_id)].append(contribution)
+        self._factory = _GroupSums.from_contributions(list(self._contributions.values()))
+        self._lines = {line: _GroupSums.from_contributions(values) for line, values in grouped.items()}
+
+    def update_cycle_time_sketches(self, station_id: str, overall: TDigest, by_model: Dict[str, TDigest]):
+        """스테이션 사이클 타임 스케치 등록 (같은 객체면 재등록 생략)
+
+        스케치는 계속 갱신되는 원본이므로 get_cycle_time_percentiles는 스케치 소유자의 lock 안에서 호출한다.
+        """
+        stored = self._sketches.get(station_id)
+        if stored is not None and stored[0] is overall and stored[1] is by_model:
+            return
+        with self._lock:
+            self._sketches[station_id] = (overall, by_model)
+
+    def get_cycle_time_percentiles(self) -> Dict[str, Any]:
+        """공장/라인/차종별 사이클 타임 분위수 (스테이션 스케치 병합, 원본은 변경하지 않음)"""
+        with self._lock:
+            sketches = dict(self._sketches)
+        if not sketches:
+            return {}
+
+        by_line: Dict[str, List[TDigest]] = {}
+        by_model: Dict[str, List[TDigest]] = {}
+        for station_id, (overall, models) in sketches.items():
+            by_line.setdefault(station_line(station_id), []).append(overall)
+            for model, sketch in models.items():
+                by_model.setdefault(model, []).append(sketch)
+
+        return {
+            "factory": merge_all(overall for overall, _ in sketches.values()).summary(),
+            "lines": {line: merge_all(values).summary() for line, values in sorted(by_line.items())},
+            "models": {model: merge_all(values).summary() for model, values in sorted(by_model.items())}
+        }
+
+    def get_line_kpis(self) -> Dict[str, Dict[str, Any]]:
+        """라인별 KPI {line: {oee, fty, otd, quality, throughput, active_stations}}"""
+        with self._lock:
+            return {line: sums.summary() for line, sums in sorted(self._lines.items()) if sums.stations > 0}
+
+    def get_factory_kpis(self) -> Dict[str, Any]:
+        """공장 전체 KPI (기존 summarize 형식 + 라인별 롤업)"""
+        with self._lock:
+            if not self._contributions:
+                return {}
+            factory = self._factory.summary()
+            lines = {line: sums.summary() for line, sums in sorted(self._lines.items()) if sums.stations > 0}
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "factory_oee": factory["oee"],
+            "factory_fty": factory["fty"],
+            "factory_otd": factory["otd"],
+            "factory_quality": factory["quality"],
+            "factory_throughput": factory["throughput"],
+            "active_stations": factory["active_stations"],
+            "lines": lines
+        }
+
+
+def format_cycle_time_percentiles(percentiles: Dict[str, Any]) -> List[str]:
+    """get_cycle_time_percentiles 결과를 출력용 줄 목록으로 변환"""
+    if not percentiles or not percentiles["factory"]["count"]:
+        return []
+
+    def describe(stats: Dict[str, Any]) -> str:
+        return f"p50 {stats['p50']}s, p90 {stats['p90']}s, p99 {stats['p99']}s ({stats['count']}사이클)"
+
+    lines = [f"⏱️ 사이클 타임: {describe(percentiles['factory'])}"]
+    for line, stats in percentiles["lines"].items():
+        if stats["count"]:
+            lines.append(f"   {line}라인: {describe(stats)}")
+    for model, stats in percentiles["models"].items():
+        lines.append(f"   {model}: {describe(stats)}")
+    return lines
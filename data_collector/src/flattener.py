@@ -0,0 +1,177 @@
+"""
+페이로드 평탄화
+스테이션/data_type별로 중첩 payload의 숫자 경로를 처음 한 번 학습해 추출 함수를 컴파일하고,
+이후 메시지는 컴파일된 함수로 {metric_name: float} 맵을 만든다
+"""
+
+import threading
+import logging
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# 스테이션/data_type별 보관할 payload 형태 수 (선택 센서 유무 등으로 형태가 바뀌는 경우)
+MAX_VARIANTS = 4
+
+
+class ShapeChanged(Exception):
+    """학습한 payload 형태와 달라 재학습이 필요함"""
+
+
+def flatten_numeric(value: Any, prefix: str, out: Dict[str, float]):
+    """중첩 dict의 숫자 값을 점(.) 경로 키로 평탄화 (bool 제외)"""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            flatten_numeric(child, f"{prefix}.{key}" if prefix else key, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+# 평탄화 대상이 될 수 있는 값 타입 (bool은 int 하위 타입이지만 대상 아님)
+_TRACKED_TYPES = frozenset((dict, int, float))
+
+
+def _learn(data: Dict[str, Any], fields: Optional[Sequence[str]]) -> Tuple[List[Tuple[str, ...]], Dict[Tuple[str, ...], int], List[Tuple[str, ...]]]:
+    """숫자 leaf 경로, 경로상 dict의 key 개수(형태 검증용), 그 외 값(문자열/None/bool/list) 경로 수집"""
+    paths: List[Tuple[str, ...]] = []
+    sizes: Dict[Tuple[str, ...], int] = {}
+    opaque: List[Tuple[str, ...]] = []
+
+    def walk(value: Any, path: Tuple[str, ...]):
+        if isinstance(value, dict):
+            sizes[path] = len(value)
+            for key, child in value.items():
+                walk(child, path + (key,))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            paths.append(path)
+        else:
+            opaque.append(path)
+
+    if fields is None:
+        walk(data, ())
+    else:
+        for field in fields:
+            if field in data:
+                walk(data[field], (field,))
+    return paths, sizes, opaque
+
+
+def _compile(paths: List[Tuple[str, ...]], sizes: Dict[Tuple[str, ...], int],
+             opaque: List[Tuple[str, ...]],
+             absent_fields: Optional[Sequence[str]]) -> Callable[[Dict[str, Any]], Dict[str, float]]:
+    """학습한 경로로 추출 함수 생성
+
+    경로상의 dict마다 key 개수를 확인해 형태가 바뀌면 ShapeChanged를 발생시키고,
+    leaf 값은 `+ 0.0`으로 float 변환 (None/문자열이면 TypeError → 재학습).
+    숫자 leaf가 bool로 바뀌거나 숫자가 아니던 값이 숫자/dict로 바뀌어도 ShapeChanged
+    (일반 순회 flatten_numeric과 항상 같은 결과).
+    absent_fields: 학습 시 없던 대상 필드 (나타나면 형태 변경), None이면 payload 전체가 대상
+    key는 str만 허용 - repr()이 항상 문자열 리터럴이 되므로 생성 코드에 값이 섞이지 않음
+    """
+    for path in chain(sizes, opaque, paths):
+        for key in path:
+            if type(key) is not str:
+                raise ValueError(f"문자열이 아닌 key: {key!r}")
+
+    lines = ["def extract(data):"]
+    names: Dict[Tuple[str, ...], str] = {(): "data"}
+
+    if absent_fields is None:
+        lines.append(f"    if len(data) != {sizes.get((), 0)}: raise ShapeChanged")
+    elif absent_fields:
+        lines.append(f"    if {' or '.join(f'{field!r} in data' for field in absent_fields)}: raise ShapeChanged")
+
+    for path in sorted(sizes, key=len):
+        if not path:
+            continue
+        var = f"v{len(names)}"
+        lines.append(f"    {var} = {names[path[:-1]]}[{path[-1]!r}]")
+        lines.append(f"    if len({var}) != {sizes[path]}: raise ShapeChanged")
+        names[path] = var
+
+    checks = []
+    for index, path in enumerate(paths):
+        lines.append(f"    a{index} = {names[path[:-1]]}[{path[-1]!r}]")
+        checks.append(f"type(a{index}) is bool")
+    checks.extend(f"type({names[path[:-1]]}[{path[-1]!r}]) in TRACKED" for path in opaque)
+    if checks:
+        lines.append(f"    if {' or '.join(checks)}: raise ShapeChanged")
+
+    items = [f"{'.'.join(path)!r}: a{index} + 0.0" for index, path in enumerate(paths)]
+    lines.append("    return {" + ", ".join(items) + "}")
+
+    namespace: Dict[str, Any] = {"ShapeChanged": ShapeChanged, "TRACKED": _TRACKED_TYPES}
+    exec("\n".join(lines), namespace)
+    return namespace["extract"]
+
+
+class PayloadFlattener:
+    """키(예: (station_id, data_type))별 컴파일된 평탄화 함수 캐시
+
+    - 처음 본 키는 payload를 순회해 경로를 학습하고 추출 함수를 컴파일
+    - 이후에는 컴파일된 함수로 추출 (dict 순회/isinstance 검사 없음)
+    - 형태가 바뀌면(키 추가/삭제, 값 타입 변경 - 숫자 ↔ bool/문자열/None) 재학습하여 최대 MAX_VARIANTS개 형태 보관
+    - fields가 주어지면 해당 최상위 필드만 평탄화 (예: ["sensors"] → sensors.torque_sensor.value)
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        self.fields = tuple(fields) if fields is not None else None
+        self.logger = logging.getLogger(__name__)
+
+        self._extractors: Dict[Hashable, List[Callable]] = {}
+        self._lock = threading.Lock()
+
+        # 통계
+        self.compiled_count = 0
+        self.fallback_count = 0
+
+    def flatten(self, key: Hashable, data: Dict[str, Any]) -> Dict[str, float]:
+        """payload → {metric_name: float}"""
+        variants = self._extractors.get(key)
+        if variants:
+            for index, extract in enumerate(variants):
+                try:
+                    result = extract(data)
+                except (ShapeChanged, KeyError, TypeError):
+                    continue
+                if index:
+                    # 최근 사용한 형태를 앞으로
+                    with self._lock:
+                        if variants[index] is extract:
+                            variants.insert(0, variants.pop(index))
+                return result
+
+        return self._learn_and_extract(key, data)
+
+    def _learn_and_extract(self, key: Hashable, data: Dict[str, Any]) -> Dict[str, float]:
+        paths, sizes, opaque = _learn(data, self.fields)
+        absent_fields = None if self.fields is None else [field for field in self.fields if field not in data]
+        try:
+            extract = _compile(paths, sizes, opaque, absent_fields)
+            result = extract(data)
+        except Exception as e:
+            # 컴파일할 수 없는 payload(문자열이 아닌 key 등)는 일반 순회로 처리
+            self.logger.debug(f"평탄화 함수 컴파일 실패 ({key}): {e}")
+            self.fallback_count += 1
+            result: Dict[str, float] = {}
+            if self.fields is None:
+                flatten_numeric(data, "", result)
+            else:
+                for field in self.fields:
+                    flatten_numeric(data.get(field), field, result)
+            return result
+
+        with self._lock:
+            variants = self._extractors.setdefault(key, [])
+            variants.insert(0, extract)
+            del variants[MAX_VARIANTS:]
+            self.compiled_count += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._extractors),
+                "variants": sum(len(variants) for variants in self._extractors.values()),
+                "compiled_count": self.compiled_count,
+                "fallback_count": self.fallback_count
+            }
@@ -0,0 +1,290 @@
+"""
+로컬 이력 저장소
+수신한 MQTT 메시지를 일자별 SQLite(WAL) 파일에 배치 기록하고 스테이션/시간 범위로 조회
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from .batch_sink import BatchSink
+from .codec import get_codec
+from .models.message import MQTTMessage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    station_id  TEXT NOT NULL,
+    data_type   TEXT NOT NULL,
+    ts          REAL NOT NULL,
+    received_at REAL NOT NULL,
+    payload     BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_station_ts ON messages (station_id, ts);
+CREATE INDEX IF NOT EXISTS idx_messages_received_at ON messages (received_at);
+"""
+
+# 멀티 프로세스 모드에서 워커들이 같은 일자 파일에 기록하므로 쓰기 잠금을 기다릴 최대 시간 (초)
+DEFAULT_BUSY_TIMEOUT = 30.0
+
+# 수신 시각보다 이만큼 이상 미래인 payload timestamp는 시계 오류로 보고 수신 시각으로 대체 (초)
+DEFAULT_MAX_FUTURE_SECONDS = 300.0
+
+
+class HistoryStore:
+    """일자별 SQLite 이력 저장소
+
+    - 파일: {directory}/history_YYYY-MM-DD.db (이벤트 시각의 로컬 날짜 기준)
+    - 각 파일 안에서는 (station_id, ts) 인덱스로 스테이션별 범위 조회
+    - 기록은 BatchSink로 모아서 한 트랜잭션으로 executemany
+    - retention_days가 지난 파일은 새 일자 파일을 열 때 삭제 (기준은 현재 날짜, 열려 있는 파일은 유지)
+    - 수신 시각보다 max_future_seconds 넘게 미래인 이벤트 시각은 수신 시각으로 대체
+      (시계가 틀어진 스테이션의 메시지 1건이 미래 날짜 파일을 만들지 않도록)
+    - 여러 워커 프로세스가 같은 디렉토리를 써도 되도록 WAL + busy_timeout
+      (쓰기 잠금이 풀릴 때까지 대기, 'database is locked' 방지)
+    """
+
+    def __init__(self, directory: str = "history", codec=None, batch_size: int = 500,
+                 flush_interval: float = 2.0, retention_days: int = 30,
+                 data_types: Optional[List[str]] = None, busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+                 max_future_seconds: float = DEFAULT_MAX_FUTURE_SECONDS):
+        self.name = "history"
+        self.directory = directory
+        self.codec = codec or get_codec()
+        self.retention_days = int(retention_days)
+        self.data_types = set(data_types or [])  # 비어 있으면 전체 기록
+        self.busy_timeout = float(busy_timeout)
+        self.max_future_seconds = float(max_future_seconds)
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._connections: Dict[date, sqlite3.Connection] = {}
+        self._write_lock = threading.Lock()
+        self._batch = BatchSink(self._write, batch_size=batch_size,
+                                flush_interval=flush_interval, name="history")
+
+        # 통계
+        self.rows_written = 0
+        self.skipped_count = 0
+        self.clamped_count = 0
+        self.deleted_files = 0
+
+    def _path_for(self, day: date) -> str:
+        return os.path.join(self.directory, f"history_{day.isoformat()}.db")
+
+    def add(self, message: MQTTMessage):
+        """메시지 1건 기록 예약"""
+        if self.data_types and message.data_type not in self.data_types:
+            self.skipped_count += 1
+            return
+        self._batch.add(message)
+
+    def flush(self) -> bool:
+        return self._batch.flush()
+
+    def start(self):
+        self._batch.start()
+        self.logger.info(f"🗄️ 이력 저장소: {os.path.abspath(self.directory)} (보관 {self.retention_days}일)")
+
+    def stop(self):
+        self._batch.stop()
+        with self._write_lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+
+    def _connection_for(self, day: date) -> sqlite3.Connection:
+        """일자별 쓰기 연결 (write lock 보유 상태에서 호출)"""
+        connection = self._connections.get(day)
+        if connection is None:
+            connection = self._open(self._path_for(day), check_same_thread=False)
+            self._connections[day] = connection
+
+            # 새 날짜 파일이 열리면 오래된 연결 정리 및 보관 기간 적용
+            for old_day in sorted(self._connections)[:-2]:
+                self._connections.pop(old_day).close()
+            self._enforce_retention()
+        return connection
+
+    def _open(self, path: str, **kwargs) -> sqlite3.Connection:
+        """쓰기 연결 (WAL, busy_timeout, 스키마/인덱스 생성 - 기존 파일에는 새 인덱스만 추가)"""
+        connection = sqlite3.connect(path, timeout=self.busy_timeout, **kwargs)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _write(self, messages: List[MQTTMessage]) -> bool:
+        """메시지 배치를 일자별로 나누어 기록"""
+        rows_by_day: Dict[date, List[tuple]] = {}
+        for message in messages:
+            ts = message.event_time
+            if ts > message.received_at + self.max_future_seconds:
+                self.clamped_count += 1
+                ts = message.received_at
+            rows_by_day.setdefault(date.fromtimestamp(ts), []).append((
+                message.station_id,
+                message.data_type,
+                ts,
+                message.received_at,
+                self.codec.dumps(message.data)
+            ))
+
+        with self._write_lock:
+            for day, rows in rows_by_day.items():
+                connection = self._connection_for(day)
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO messages (station_id, data_type, ts, received_at, payload) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        rows
+                    )
+                self.rows_written += len(rows)
+        return True
+
+    def _enforce_retention(self, today: Optional[date] = None):
+        """보관 기간이 지난 일자 파일 삭제 (write lock 보유 상태에서 호출)
+
+        기준은 현재 날짜 - 메시지의 이벤트 날짜를 쓰면 미래 timestamp 1건으로 현재 파일이 삭제될 수 있음
+        """
+        if self.retention_days <= 0:
+            return
+        cutoff = (today or date.today()) - timedelta(days=self.retention_days)
+        for day in self.list_days():
+            if day >= cutoff or day in self._connections:
+                continue
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self._path_for(day) + suffix)
+                except FileNotFoundError:
+                    pass  # 다른 워커 프로세스가 먼저 삭제
+            self.deleted_files += 1
+            self.logger.info(f"🗑️ 이력 파일 삭제: {day.isoformat()}")
+
+    def list_days(self) -> List[date]:
+        """저장된 일자 목록"""
+        days = []
+        for name in os.listdir(self.directory):
+            if name.startswith("history_") and name.endswith(".db"):
+                try:
+                    days.append(date.fromisoformat(name[len("history_"):-len(".db")]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def query(self, station_id: str, start: float, end: float,
+              data_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """[start, end) 구간의 스테이션 메시지를 시간순으로 반환 (epoch 초)"""
+        day = date.fromtimestamp(start)
+        last_day = date.fromtimestamp(max(start, end - 1e-6))
+        sql = "SELECT data_type, ts, payload FROM messages WHERE station_id = ? AND ts >= ? AND ts < ?"
+        params: List[Any] = [station_id, start, end]
+        if data_type is not None:
+            sql += " AND data_type = ?"
+            params.append(data_type)
+        sql += " ORDER BY ts"
+
+        while day <= last_day:
+            path = self._path_for(day)
+            day += timedelta(days=1)
+            if not os.path.exists(path):
+                continue
+
+            # 읽기 전용 연결 (WAL 모드라 기록 중에도 조회 가능)
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=self.busy_timeout)
+            try:
+                for row_type, ts, payload in connection.execute(sql, params):
+                    yield {
+                        "station_id": station_id,
+                        "data_type": row_type,
+                        "timestamp": ts,
+                        "data": self.codec.loads(payload)
+                    }
+            finally:
+                connection.close()
+
+    def iter_since(self, since: float, data_types: Optional[List[str]] = None) -> Iterator[MQTTMessage]:
+        """수신 시각이 since 이후인 메시지를 수신 순서대로 재생 (재시작 후 KPI 캐치업용)
+
+        이벤트 시각 기준 일자 파일에 나뉘어 있으므로 since 전날부터 오늘까지 모두 확인한다.
+        received_at 인덱스로 범위 조회 (인덱스가 없던 이전 파일은 처음 열 때 인덱스 생성)
+        """
+        sql = "SELECT station_id, data_type, ts, received_at, payload FROM messages WHERE received_at > ?"
+        params: List[Any] = [since]
+        if data_types:
+            sql += f" AND data_type IN ({', '.join('?' for _ in data_types)})"
+            params.extend(data_types)
+        sql += " ORDER BY received_at, rowid"
+
+        first_day = date.fromtimestamp(since) - timedelta(days=1)
+        for day in self.list_days():
+            if day < first_day:
+                continue
+            connection = self._open(self._path_for(day))
+            try:
+                for station_id, data_type, ts, received_at, payload in connection.execute(sql, params):
+                    yield MQTTMessage(
+                        topic=f"factory/{station_id}/{data_type}",
+                        topic_parts=("factory", station_id, data_type),
+                        station_id=station_id,
+                        data_type=data_type,
+                        data=self.codec.loads(payload),
+                        received_at=received_at
+                    )
+            finally:
+                connection.close()
+
+    def summarize(self, station_id: str, start: float, end: float) -> Dict[str, Any]:
+        """구간 KPI 요약 (교대/일 단위 KPI 계산용)
+
+        생산 수량은 status의 production_count 증가분 합계, FTY는 quality의 passed 비율
+        """
+        counts: Dict[str, int] = {}
+        produced = 0
+        last_count = None
+        inspections = 0
+        passed = 0
+        score_sum = 0.0
+
+        for row in self.query(station_id, start, end):
+            counts[row["data_type"]] = counts.get(row["data_type"], 0) + 1
+            data = row["data"]
+
+            if row["data_type"] == "status" and isinstance(data.get("production_count"), (int, float)):
+                count = data["production_count"]
+                if last_count is not None and count >= last_count:
+                    produced += count - last_count
+                last_count = count
+
+            elif row["data_type"] == "quality":
+                inspections += 1
+                if data.get("passed"):
+                    passed += 1
+                score_sum += float(data.get("overall_score", 0) or 0)
+
+        return {
+            "station_id": station_id,
+            "start": datetime.fromtimestamp(start).isoformat(),
+            "end": datetime.fromtimestamp(end).isoformat(),
+            "message_counts": counts,
+            "produced": produced,
+            "inspections": inspections,
+            "passed": passed,
+            "fty": round(passed / inspections, 4) if inspections else None,
+            "avg_quality_score": round(score_sum / inspections, 4) if inspections else None
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 반환"""
+        stats = self._batch.get_stats()
+        stats.update({
+            "rows_written": self.rows_written,
+            "skipped_count": self.skipped_count,
+            "clamped_count": self.clamped_count,
+            "deleted_files": self.deleted_files,
+            "days": len(self.list_days())
+        })
+        return stats
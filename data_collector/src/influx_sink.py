@@ -0,0 +1,152 @@
+"""
+InfluxDB 싱크
+처리된 레코드를 line protocol로 변환하여 gzip 압축 배치로 기록 (/api/v2/write)
+"""
+
+import gzip
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .batch_sink import BatchSink
+from .flattener import PayloadFlattener, flatten_numeric
+from .models.message import parse_timestamp
+
+# 숫자 필드를 추출할 레코드 최상위 키 (DataProcessor / TelemetryAggregator 출력 형식)
+FIELD_SOURCES = ("sensors", "production", "quality", "derivedMetrics", "metrics")
+
+
+def _escape_measurement(value: str) -> str:
+    return value.replace(",", "\\,").replace(" ", "\\ ")
+
+
+def _escape_key(value: str) -> str:
+    """태그 키/값, 필드 키 이스케이프"""
+    return value.replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def to_line_protocol(record: Dict[str, Any], measurement: str = "station_data",
+                     flattener: Optional[PayloadFlattener] = None) -> Optional[str]:
+    """레코드 1건 → line protocol 1줄 (숫자 필드가 없으면 None)
+
+    태그: station_id, data_type / 필드: 중첩 숫자 값을 점(.) 경로로 평탄화한 float
+    flattener가 주어지면 (station_id, data_type)별 컴파일된 추출 함수 사용
+    필드는 항상 float로 기록 (bool은 평탄화 대상 아님 - 점마다 필드 타입이 바뀌면 InfluxDB가 거부),
+    NaN/Infinity는 InfluxDB가 배치 전체를 거부하므로 해당 필드만 제외
+    """
+    station_id = record.get("stationId") or "UNKNOWN"
+    data_type = record.get("dataType") or str(record.get("topic", "")).rsplit("/", 1)[-1] or "unknown"
+
+    if flattener is not None:
+        fields = flattener.flatten((station_id, data_type), record)
+    else:
+        fields = {}
+        for source in FIELD_SOURCES:
+            flatten_numeric(record.get(source), source, fields)
+    field_set = ",".join(f"{_escape_key(name)}={float(value)!r}" for name, value in fields.items()
+                         if math.isfinite(value))
+    if not field_set:
+        return None
+
+    timestamp_ns = int(parse_timestamp(record.get("timestamp"), 0.0) * 1e9)
+
+    line = (f"{_escape_measurement(measurement)},"
+            f"station_id={_escape_key(station_id)},data_type={_escape_key(data_type)} "
+            f"{field_set}")
+    if timestamp_ns > 0:
+        line += f" {timestamp_ns}"
+    return line
+
+
+class InfluxSink:
+    """InfluxDB line protocol 배치 싱크
+
+    BatchSink로 레코드를 모은 뒤 한 요청으로 기록한다. 로컬 HTTP 대역
+    (tools/recording_server.py)에 url을 지정하면 실제 요청 내용을 확인할 수 있다.
+    """
+
+    def __init__(self, url: str, org: str, bucket: str, token: str = "",
+                 measurement: str = "station_data", batch_size: int = 500,
+                 flush_interval: float = 5.0, use_gzip: bool = True, timeout: float = 5.0):
+        self.name = "influxdb"
+        self.write_url = f"{url.rstrip('/')}/api/v2/write"
+        self.params = {"org": org, "bucket": bucket, "precision": "ns"}
+        self.measurement = measurement
+        self.use_gzip = use_gzip
+        self.flattener = PayloadFlattener(FIELD_SOURCES)
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "text/plain; charset=utf-8",
+            "User-Agent": "DataCollector-KPI/2.0"
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Token {token}"
+        if use_gzip:
+            self.session.headers["Content-Encoding"] = "gzip"
+
+        self._batch = BatchSink(self._write, batch_size=batch_size,
+                                flush_interval=flush_interval, name="influxdb")
+
+        # 통계
+        self.lines_written = 0
+        self.bytes_sent = 0
+        self.skipped_records = 0
+
+    def add(self, record: Dict[str, Any]):
+        self._batch.add(record)
+
+    def flush(self) -> bool:
+        return self._batch.flush()
+
+    def start(self):
+        self._batch.start()
+
+    def stop(self):
+        self._batch.stop()
+        self.session.close()
+
+    def _write(self, records: List[Dict[str, Any]]) -> bool:
+        """레코드 배치를 line protocol로 변환하여 기록"""
+        lines = []
+        for record in records:
+            line = to_line_protocol(record, self.measurement, self.flattener)
+            if line is None:
+                self.skipped_records += 1
+            else:
+                lines.append(line)
+        if not lines:
+            return True
+
+        body = "\n".join(lines).encode("utf-8")
+        if self.use_gzip:
+            body = gzip.compress(body, compresslevel=5)
+
+        try:
+            response = self.session.post(self.write_url, params=self.params, data=body, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"⚠️ InfluxDB 기록 실패: {e}")
+            return False
+
+        # InfluxDB v2 write API는 성공 시 204 No Content
+        if response.status_code not in (200, 204):
+            self.logger.warning(f"⚠️ InfluxDB 기록 오류: {response.status_code} {response.text[:200]}")
+            return False
+
+        self.lines_written += len(lines)
+        self.bytes_sent += len(body)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """싱크 통계 반환"""
+        stats = self._batch.get_stats()
+        stats.update({
+            "lines_written": self.lines_written,
+            "bytes_sent": self.bytes_sent,
+            "skipped_records": self.skipped_records
+        })
+        return stats
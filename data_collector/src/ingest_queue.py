@@ -0,0 +1,383 @@
+"""
+MQTT 인입 큐
+paho 네트워크 루프(수신 스레드)와 데이터 처리/HTTP 전송을 분리
+"""
+
+import threading
+import time
+import logging
+import zlib
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Any, List, Optional
+from .models.message import MQTTMessage
+
+# 워커 종료 신호
+_STOP = object()
+
+# block 레인 최대 대기 시간 (초) - paho 네트워크 루프가 keepalive를 놓치지 않도록 짧게 유지
+DEFAULT_BLOCK_TIMEOUT = 0.5
+
+# 과부하 시 메시지 처리 정책
+POLICY_BLOCK = "block"              # 공간이 생길 때까지 수신 스레드 대기 (block_timeout 초과 시 on_block_timeout/폐기)
+POLICY_DROP_OLDEST = "drop_oldest"  # 가득 차면 가장 오래된 메시지 폐기
+POLICY_SAMPLE = "sample"            # 적재량이 임계치를 넘으면 N건 중 1건만 적재
+POLICY_COALESCE = "coalesce"        # 스테이션별 최신 메시지 1건만 유지
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_SAMPLE, POLICY_COALESCE)
+
+# lanes 설정이 없을 때의 기본값: KPI(FTY/OEE)에 쓰이는 quality/status는 가능한 한 대기 후 적재
+DEFAULT_LANES = {
+    "quality": {"priority": 0, "policy": POLICY_BLOCK},
+    "status": {"priority": 0, "policy": POLICY_BLOCK},
+    "telemetry": {"priority": 1, "policy": POLICY_DROP_OLDEST},
+    "sensors": {"priority": 1, "policy": POLICY_DROP_OLDEST},
+    "default": {"priority": 2, "policy": POLICY_DROP_OLDEST},
+}
+
+
+def validate_lanes(lane_configs: Dict[str, Dict[str, Any]], shard_count: int,
+                   default_capacity: int) -> List[str]:
+    """레인 설정 검증 - 잘못된 정책/용량은 ValueError, 샤드 수보다 작은 용량은 경고 목록 반환
+
+    레인 용량은 샤드(워커)마다 capacity // shard_count로 나뉘며 샤드당 최소 1
+    (capacity < shard_count이면 실제 합계 용량은 shard_count)
+    """
+    if not lane_configs:
+        raise ValueError("레인 설정이 비어 있음")
+    warnings = []
+    for name, lane_config in lane_configs.items():
+        policy = lane_config.get('policy', POLICY_DROP_OLDEST)
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 레인 정책: {name}.policy = {policy!r} (가능: {', '.join(POLICIES)})")
+        capacity = lane_config.get('capacity', default_capacity)
+        if isinstance(capacity, bool) or not isinstance(capacity, int) or capacity < 1:
+            raise ValueError(f"레인 용량은 1 이상의 정수: {name}.capacity = {capacity!r}")
+        if capacity < shard_count:
+            warnings.append(f"{name} 레인 용량 {capacity} < 워커 {shard_count}개 - 샤드당 1건으로 올림")
+    return warnings
+
+
+class _Lane:
+    """data_type별 레인 (샤드 내부, lock은 LaneQueue가 보유)"""
+
+    def __init__(self, name: str, priority: int, capacity: int, policy: str,
+                 sample_rate: int = 10, shed_threshold: float = 0.5):
+        self.name = name
+        self.priority = priority
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        self.sample_rate = max(1, int(sample_rate))
+        self.shed_level = max(1, int(self.capacity * shed_threshold))
+
+        # coalesce 레인은 station_id → 메시지 (삽입 순서 유지)
+        self.items = OrderedDict() if policy == POLICY_COALESCE else deque()
+        self._sample_counter = 0
+
+        # 통계
+        self.enqueued_count = 0
+        self.dropped_count = 0
+        self.sampled_out_count = 0
+        self.coalesced_count = 0
+        self.block_timeout_count = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def is_full(self) -> bool:
+        return len(self.items) >= self.capacity
+
+    def offer(self, message: MQTTMessage) -> bool:
+        """정책에 따라 적재 (block 정책의 대기는 LaneQueue에서 처리)"""
+        if self.policy == POLICY_COALESCE:
+            if message.station_id in self.items:
+                # 같은 스테이션의 미처리 메시지를 최신 값으로 교체
+                del self.items[message.station_id]
+                self.coalesced_count += 1
+            elif self.is_full():
+                self.items.popitem(last=False)
+                self.dropped_count += 1
+            self.items[message.station_id] = message
+
+        elif self.policy == POLICY_SAMPLE and len(self.items) >= self.shed_level:
+            self._sample_counter += 1
+            if self._sample_counter % self.sample_rate != 0 or self.is_full():
+                self.sampled_out_count += 1
+                return False
+            self.items.append(message)
+
+        else:
+            if self.is_full():
+                if self.policy == POLICY_BLOCK:
+                    return False
+                self.items.popleft()
+                self.dropped_count += 1
+            self.items.append(message)
+            self._sample_counter = 0
+
+        self.enqueued_count += 1
+        return True
+
+    def pop(self) -> MQTTMessage:
+        if self.policy == POLICY_COALESCE:
+            return self.items.popitem(last=False)[1]
+        return self.items.popleft()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self.items),
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "enqueued_count": self.enqueued_count,
+            "dropped_count": self.dropped_count,
+            "sampled_out_count": self.sampled_out_count,
+            "coalesced_count": self.coalesced_count,
+            "block_timeout_count": self.block_timeout_count
+        }
+
+
+class LaneQueue:
+    """우선순위 레인 큐 (워커 1개 전용 샤드)
+
+    get()은 우선순위가 높은(숫자가 작은) 레인부터 꺼낸다.
+    """
+
+    def __init__(self, lane_configs: Dict[str, Dict[str, Any]], shard_count: int, default_capacity: int):
+        self._condition = threading.Condition()
+        self._closed = False
+        self._blocked_puts = 0
+        self.lanes: Dict[str, _Lane] = {}
+
+        for name, lane_config in lane_configs.items():
+            capacity = lane_config.get('capacity', default_capacity)
+            self.lanes[name] = _Lane(
+                name,
+                priority=lane_config.get('priority', 1),
+                capacity=max(1, int(capacity) // shard_count),
+                policy=lane_config.get('policy', POLICY_DROP_OLDEST),
+                sample_rate=lane_config.get('sample_rate', 10),
+                shed_threshold=lane_config.get('shed_threshold', 0.5)
+            )
+        self._ordered = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+        self._default = self.lanes.get("default") or self._ordered[-1]
+
+    def lane_for(self, data_type: str) -> _Lane:
+        return self.lanes.get(data_type, self._default)
+
+    def put(self, message: MQTTMessage, block_timeout: float = DEFAULT_BLOCK_TIMEOUT) -> bool:
+        """적재 - block 정책 레인이 가득 차면 최대 block_timeout초 대기 후 폐기"""
+        lane = self.lane_for(message.data_type)
+        deadline = None
+        with self._condition:
+            while True:
+                if self._closed:
+                    lane.dropped_count += 1
+                    return False
+                if lane.offer(message):
+                    self._condition.notify()
+                    return True
+                if lane.policy != POLICY_BLOCK:
+                    return False
+                if deadline is None:
+                    deadline = time.monotonic() + block_timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # 수신 스레드를 무기한 멈추지 않음 - 폐기로 집계
+                    lane.block_timeout_count += 1
+                    lane.dropped_count += 1
+                    return False
+                self._blocked_puts += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._blocked_puts -= 1
+
+    def get(self):
+        """가장 높은 우선순위 메시지 반환 (종료 시 남은 메시지 처리 후 _STOP)"""
+        with self._condition:
+            while True:
+                for lane in self._ordered:
+                    if lane.items:
+                        message = lane.pop()
+                        if self._blocked_puts:
+                            # block 정책으로 대기 중인 수신 스레드 깨우기
+                            self._condition.notify_all()
+                        return message
+                if self._closed:
+                    return _STOP
+                self._condition.wait()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def depth(self) -> int:
+        with self._condition:
+            return sum(len(lane) for lane in self._ordered)
+
+
+class IngestQueue:
+    """유한 크기 인입 큐 + 워커 풀
+
+    MQTT 콜백은 submit()으로 적재만 하고 즉시 반환한다.
+    같은 스테이션의 메시지는 항상 같은 워커가 처리하도록 station_id 해시로
+    샤드를 고정하여, 스테이션 단위 순서와 KPI 상태 일관성을 유지한다.
+    샤드마다 data_type별 우선순위 레인을 두고, 과부하 시 레인 정책
+    (block / drop_oldest / sample / coalesce)에 따라 메시지를 정리한다.
+    block 레인도 block_timeout 이상 수신 스레드를 멈추지 않는다. 대기 시간을 넘긴 메시지는
+    on_block_timeout(예: 이력 저장소 기록 - 재시작 캐치업 시 KPI에 재반영)으로 넘기고,
+    콜백이 없으면 건마다 ERROR 로그로 데이터 유실을 남긴다 (block_timeout_count로 집계).
+    """
+
+    def __init__(self, handler: Callable, workers: int = 4, capacity: int = 10000,
+                 lanes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+                 on_block_timeout: Optional[Callable[[MQTTMessage], Any]] = None):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.capacity = max(self.workers, int(capacity))
+        self.lane_configs = lanes or DEFAULT_LANES
+        self.block_timeout = max(0.0, float(block_timeout))
+        self.on_block_timeout = on_block_timeout
+        self.logger = logging.getLogger(__name__)
+
+        for warning in validate_lanes(self.lane_configs, self.workers, self.capacity):
+            self.logger.warning(f"⚠️ {warning}")
+
+        # 워커별 레인 큐 (샤드)
+        self._queues: List[LaneQueue] = [
+            LaneQueue(self.lane_configs, self.workers, self.capacity) for _ in range(self.workers)
+        ]
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        # 통계
+        self._stats_lock = threading.Lock()
+        self.processed_count = 0
+        self.error_count = 0
+        self.rejected_count = 0  # submit()에서 적재되지 못한 메시지 (수신 스레드 전용)
+        self.overflow_count = 0  # block 레인 대기 초과로 on_block_timeout에 넘긴 메시지
+        self.lost_count = 0      # block 레인 대기 초과로 유실된 메시지 (콜백 없음/실패)
+
+    def start(self):
+        """워커 스레드 시작"""
+        if self._running:
+            return
+
+        self._running = True
+        for index, shard in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(shard,),
+                name=f"ingest-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        lanes = ", ".join(f"{name}({config.get('policy', POLICY_DROP_OLDEST)})"
+                          for name, config in self.lane_configs.items())
+        self.logger.info(f"🧵 인입 큐 시작: 워커 {self.workers}개, 용량 {self.capacity}, 레인 {lanes}")
+
+    def stop(self, timeout: float = 5.0):
+        """남은 메시지를 처리한 뒤 워커 종료"""
+        if not self._running:
+            return
+
+        self._running = False
+        for shard in self._queues:
+            shard.close()
+
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads.clear()
+
+        self.logger.info("✅ 인입 큐 종료")
+
+    def submit(self, message: MQTTMessage) -> bool:
+        """메시지 적재 (MQTT 수신 스레드에서 호출, block 레인이 가득 찬 경우에만 최대 block_timeout초 대기)"""
+        shard = self._queues[self._shard_index(message.station_id)]
+        accepted = shard.put(message, self.block_timeout)
+
+        if not accepted:
+            self.rejected_count += 1
+            if shard.lane_for(message.data_type).policy == POLICY_BLOCK:
+                self._handle_block_timeout(message)
+            # 로그 폭주 방지: 처음과 1000건마다 경고
+            elif self.rejected_count == 1 or self.rejected_count % 1000 == 0:
+                self.logger.warning(f"⚠️ 인입 큐 과부하 - 폐기/샘플링 누적 {self.rejected_count}건 "
+                                    f"({message.data_type} 레인)")
+        return accepted
+
+    def _handle_block_timeout(self, message: MQTTMessage):
+        """block 레인(KPI 계산용) 대기 초과 메시지 - 콜백으로 보존하거나 유실로 기록"""
+        if self.on_block_timeout is not None:
+            try:
+                self.on_block_timeout(message)
+                self.overflow_count += 1
+                if self.overflow_count == 1 or self.overflow_count % 1000 == 0:
+                    self.logger.warning(f"⚠️ 인입 큐 과부하 - {message.data_type} 레인 대기 초과 "
+                                        f"누적 {self.overflow_count}건 (처리 없이 보존)")
+                return
+            except Exception as e:
+                self.logger.error(f"대기 초과 메시지 보존 실패: {e}")
+        self.lost_count += 1
+        self.logger.error(f"❌ 데이터 유실: {message.station_id}/{message.data_type} "
+                          f"(block 레인 {self.block_timeout}초 대기 초과, 누적 {self.lost_count}건)")
+
+    def _shard_index(self, station_id: str) -> int:
+        """station_id로 워커 샤드 결정"""
+        if self.workers == 1:
+            return 0
+        return zlib.crc32(station_id.encode('utf-8')) % self.workers
+
+    def _worker_loop(self, shard: LaneQueue):
+        """워커 루프: 우선순위 순으로 꺼내 핸들러 호출"""
+        while True:
+            item = shard.get()
+            if item is _STOP:
+                return
+            try:
+                self.handler(item)
+                with self._stats_lock:
+                    self.processed_count += 1
+            except Exception as e:
+                with self._stats_lock:
+                    self.error_count += 1
+                self.logger.error(f"인입 큐 처리 오류: {e}")
+
+    def get_depth(self) -> int:
+        """현재 적재된 메시지 수"""
+        return sum(shard.depth() for shard in self._queues)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """큐 통계 반환 (레인별 합계 포함)"""
+        lanes: Dict[str, Dict[str, Any]] = {}
+        for shard in self._queues:
+            with shard._condition:
+                for name, lane in shard.lanes.items():
+                    lane_stats = lane.get_stats()
+                    total = lanes.setdefault(name, {"policy": lane.policy, "depth": 0, "capacity": 0,
+                                                    "enqueued_count": 0, "dropped_count": 0,
+                                                    "sampled_out_count": 0, "coalesced_count": 0,
+                                                    "block_timeout_count": 0})
+                    for key in ("depth", "capacity", "enqueued_count", "dropped_count",
+                                "sampled_out_count", "coalesced_count", "block_timeout_count"):
+                        total[key] += lane_stats[key]
+
+        with self._stats_lock:
+            return {
+                "depth": sum(lane["depth"] for lane in lanes.values()),
+                "capacity": self.capacity,
+                "workers": self.workers,
+                "shard_depths": [shard.depth() for shard in self._queues],
+                "enqueued_count": sum(lane["enqueued_count"] for lane in lanes.values()),
+                "dropped_count": sum(lane["dropped_count"] + lane["sampled_out_count"]
+                                     for lane in lanes.values()),
+                "coalesced_count": sum(lane["coalesced_count"] for lane in lanes.values()),
+                "block_timeout_count": sum(lane["block_timeout_count"] for lane in lanes.values()),
+                "overflow_count": self.overflow_count,
+                "lost_count": self.lost_count,
+                "processed_count": self.processed_count,
+                "error_count": self.error_count,
+                "lanes": lanes
+            }
@@ -0,0 +1,121 @@
+"""
+차량 이동 이력 저장소
+완료(또는 추적 만료)되어 메모리에서 내보낸 차량 journey를 SQLite(WAL)에 배치 기록하고 차량 ID로 조회
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from .batch_sink import BatchSink
+from .codec import get_codec
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journeys (
+    vehicle_id   TEXT PRIMARY KEY,
+    model        TEXT,
+    status       TEXT NOT NULL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    lead_time    REAL NOT NULL,
+    visits       BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_journeys_last_seen ON journeys (last_seen);
+"""
+
+
+class JourneyStore:
+    """차량 journey 저장소 (VehicleJourneyIndex의 내보내기 대상)
+
+    - 기록은 BatchSink로 모아서 한 트랜잭션으로 INSERT OR REPLACE
+    - visits는 [{station_id, entered_at, exited_at, dwell}] JSON
+    """
+
+    def __init__(self, path: str = "history/journeys.db", codec=None, batch_size: int = 200,
+                 flush_interval: float = 5.0):
+        self.name = "journeys"
+        self.path = path
+        self.codec = codec or get_codec()
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._write_lock = threading.Lock()
+        self._batch = BatchSink(self._write, batch_size=batch_size,
+                                flush_interval=flush_interval, name="journeys")
+
+        # 통계
+        self.rows_written = 0
+
+    def add(self, journey: Dict[str, Any]):
+        """journey 1건 기록 예약"""
+        self._batch.add(journey)
+
+    def flush(self) -> bool:
+        return self._batch.flush()
+
+    def start(self):
+        self._batch.start()
+        self.logger.info(f"🚗 차량 이동 이력: {os.path.abspath(self.path)}")
+
+    def stop(self):
+        self._batch.stop()
+        with self._write_lock:
+            self._connection.close()
+
+    def _write(self, journeys: List[Dict[str, Any]]) -> bool:
+        rows = [(
+            journey["vehicle_id"],
+            journey.get("model"),
+            journey["status"],
+            journey["first_seen"],
+            journey["last_seen"],
+            journey["lead_time"],
+            self.codec.dumps(journey["visits"])
+        ) for journey in journeys]
+
+        with self._write_lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO journeys (vehicle_id, model, status, first_seen, last_seen, lead_time, visits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self.rows_written += len(rows)
+        return True
+
+    def get(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        """저장된 차량 journey 조회 (읽기 전용 연결)"""
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            row = connection.execute(
+                "SELECT vehicle_id, model, status, first_seen, last_seen, lead_time, visits "
+                "FROM journeys WHERE vehicle_id = ?",
+                (vehicle_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return {
+            "vehicle_id": row[0],
+            "model": row[1],
+            "status": row[2],
+            "first_seen": row[3],
+            "last_seen": row[4],
+            "lead_time": row[5],
+            "visits": self.codec.loads(row[6])
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._batch.get_stats()
+        stats["rows_written"] = self.rows_written
+        return stats
@@ -0,0 +1,138 @@
+"""
+KPI 상태 체크포인트
+스테이션 메트릭(링 버퍼, 카운터, 가동 시간, 마지막 상태)을 주기적으로 디스크에 원자적으로 저장하고
+재시작 시 마지막 스냅샷에서 복원
+"""
+
+import gzip
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from .codec import get_codec
+
+# 체크포인트 형식 버전 (필드 구조 변경 시 증가, 다른 버전은 복원하지 않음)
+CHECKPOINT_VERSION = 1
+
+
+class KPICheckpointer:
+    """KPIProcessor 상태 체크포인트
+
+    - save: processor.export_state()를 lock 안에서 값만 복사한 뒤, 직렬화/압축/기록은 lock 밖에서 수행
+    - 기록은 임시 파일 → fsync → os.replace (저장 중 종료되어도 이전 스냅샷 유지)
+    - restore: 스냅샷을 읽어 processor.import_state()로 복원, 저장 시각(epoch) 반환
+    - 주기 저장은 별도 스레드 (메시지 처리 경로와 무관), stop 시 최종 저장
+    """
+
+    def __init__(self, processor, path: str = "checkpoint/kpi_state.json.gz",
+                 interval: float = 60.0, codec=None, compresslevel: int = 1):
+        self.processor = processor
+        self.path = path
+        self.interval = float(interval)
+        self.codec = codec or get_codec()
+        self.compresslevel = int(compresslevel)
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._save_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.saves = 0
+        self.failed_saves = 0
+        self.last_saved_at: Optional[float] = None
+        self.last_save_seconds = 0.0
+        self.last_size_bytes = 0
+        self.restored_stations = 0
+        self.restore_seconds = 0.0
+
+    def save(self) -> bool:
+        """현재 상태 스냅샷 저장"""
+        with self._save_lock:
+            started = time.perf_counter()
+            saved_at = time.time()
+            state = self.processor.export_state()
+            state["version"] = CHECKPOINT_VERSION
+            state["saved_at"] = saved_at
+
+            tmp_path = self.path + ".tmp"
+            try:
+                body = gzip.compress(self.codec.dumps(state), compresslevel=self.compresslevel)
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                self.failed_saves += 1
+                self.logger.error(f"KPI 체크포인트 저장 실패: {e}")
+                return False
+
+            self.saves += 1
+            self.last_saved_at = saved_at
+            self.last_size_bytes = len(body)
+            self.last_save_seconds = time.perf_counter() - started
+            return True
+
+    def restore(self) -> Optional[float]:
+        """마지막 스냅샷 복원 - 스냅샷 저장 시각 반환 (없거나 손상/버전 불일치면 None)"""
+        if not os.path.exists(self.path):
+            return None
+
+        started = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                state = self.codec.loads(gzip.decompress(f.read()))
+        except (OSError, EOFError, ValueError) as e:
+            self.logger.warning(f"KPI 체크포인트 읽기 실패 (새 상태로 시작): {e}")
+            return None
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            self.logger.warning(f"KPI 체크포인트 버전 불일치: {state.get('version')} (새 상태로 시작)")
+            return None
+
+        self.restored_stations = self.processor.import_state(state)
+        self.restore_seconds = time.perf_counter() - started
+        self.logger.info(f"♻️ KPI 체크포인트 복원: {self.restored_stations}개 스테이션 "
+                         f"({self.restore_seconds * 1000:.1f}ms)")
+        return state.get("saved_at")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._save_loop, name="kpi-checkpoint", daemon=True)
+        self._thread.start()
+        self.logger.info(f"💾 KPI 체크포인트: {os.path.abspath(self.path)} ({self.interval}초 주기)")
+
+    def stop(self):
+        """스레드 종료 및 최종 저장"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        self.save()
+
+    def _save_loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.save()
+            except Exception as e:
+                self.logger.error(f"KPI 체크포인트 오류: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "saves": self.saves,
+            "failed_saves": self.failed_saves,
+            "last_saved_at": self.last_saved_at,
+            "last_save_ms": round(self.last_save_seconds * 1000, 2),
+            "last_size_bytes": self.last_size_bytes,
+            "restored_stations": self.restored_stations,
+            "restore_ms": round(self.restore_seconds * 1000, 2)
+        }
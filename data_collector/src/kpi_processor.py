@@ -2,12 +2,76 @@
 Data Collector에서 Raw MQTT 데이터를 받아서 KPI로 계산
 """
 
-import json
+import math
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
-from collections import defaultdict
+from typing import Dict, Any, Iterator, List, Set
+from collections import defaultdict, deque
 from dataclasses import dataclass, asdict
+from .defect_stats import DefectStats
+from .factory_kpis import FactoryKPIAggregate
+from .kpi_targets import KPITargets
+from .quantile_sketch import TDigest
+from .models.message import MQTTMessage, parse_timestamp
+
+# 스테이션별 최근 사이클 타임/품질 점수 보관 개수
+WINDOW_SIZE = 100
+# 사이클 타임 트렌드(최근 평균) 계산 개수
+RECENT_SIZE = 10
+# 상태 메시지 간격이 이보다 길면(수집 중단, 시뮬레이터 재기동) 가동 시간에 넣지 않음 (초)
+MAX_STATUS_GAP = 300.0
+
+
+class RunningWindow:
+    """최근 maxlen개 값의 링 버퍼 + 누적 합계
+
+    append 시 밀려나는 값을 합계에서 빼서 평균을 O(1)로 계산한다.
+    부동소수점 오차가 쌓이지 않도록 버퍼가 한 바퀴 돌 때마다 합계를 다시 계산.
+    """
+
+    __slots__ = ("values", "total", "_appends")
+
+    def __init__(self, maxlen: int = WINDOW_SIZE):
+        self.values = deque(maxlen=maxlen)
+        self.total = 0.0
+        self._appends = 0
+
+    def append(self, value: float):
+        values = self.values
+        if len(values) == values.maxlen:
+            self.total -= values[0]
+        values.append(value)
+        self.total += value
+
+        self._appends += 1
+        if self._appends >= values.maxlen:
+            self._appends = 0
+            self.total = math.fsum(values)
+
+    def mean(self, default: float = 0.0) -> float:
+        return self.total / len(self.values) if self.values else default
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __bool__(self) -> bool:
+        return bool(self.values)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.values)
+    
+    def to_state(self) -> List[float]:
+        return list(self.values)
+    
+    @classmethod
+    def from_state(cls, values: List[float], maxlen: int) -> "RunningWindow":
+        window = cls(maxlen)
+        for value in values[-maxlen:]:
+            window.values.append(value)
+        window.total = math.fsum(window.values)
+        return window
+
 
 @dataclass
 class StationMetrics:
@@ -17,77 +81,148 @@ class StationMetrics:
     # 생산 메트릭
     total_cycles: int = 0
     total_runtime: float = 0.0  # 분 단위
-    cycle_times: List[float] = None
+    cycle_times: RunningWindow = None
+    recent_cycle_times: RunningWindow = None
+    # cycle_times와 같은 순서의 사이클별 목표 (차종별 목표 사이클 타임)
+    target_cycle_times: RunningWindow = None
+    # 완료 사이클 목표 시간 합계 (초) - 성능률 = 목표 시간 합계 / 가동 시간
+    ideal_seconds: float = 0.0
+    current_model: str = None
+    last_cycle_at: float = None
+    # 전체 기간 사이클 타임 분위수 스케치 (스테이션 전체, 차종별)
+    cycle_time_sketch: TDigest = None
+    model_cycle_sketches: Dict[str, TDigest] = None
+    # 분위수 요약 캐시 {percentiles, by_model} - 사이클 타임 추가 시 무효화
+    cycle_time_summary: Dict[str, Any] = None
     
     # 품질 메트릭
     total_inspections: int = 0
     passed_first_time: int = 0
-    quality_scores: List[float] = None
-    defects: List[str] = None
+    quality_scores: RunningWindow = None
+    defects: DefectStats = None
     
     # 시간 추적
     start_time: float = None
-    last_update: float = None
+    last_update: float = None  # 마지막 상태 메시지의 이벤트 시각 (가동 시간 누적 기준)
+    last_status: str = None
+    # data_type별 마지막 반영 이벤트 시각 (체크포인트 복원 후 중복 메시지 제거 경계)
+    last_event_times: Dict[str, float] = None
     
     def __post_init__(self):
         if self.cycle_times is None:
-            self.cycle_times = []
+            self.cycle_times = RunningWindow(WINDOW_SIZE)
+        if self.recent_cycle_times is None:
+            self.recent_cycle_times = RunningWindow(RECENT_SIZE)
+        if self.target_cycle_times is None:
+            self.target_cycle_times = RunningWindow(WINDOW_SIZE)
+        if self.cycle_time_sketch is None:
+            self.cycle_time_sketch = TDigest()
+        if self.model_cycle_sketches is None:
+            self.model_cycle_sketches = {}
         if self.quality_scores is None:
-            self.quality_scores = []
+            self.quality_scores = RunningWindow(WINDOW_SIZE)
         if self.defects is None:
-            self.defects = []
+            self.defects = DefectStats()
         if self.start_time is None:
             self.start_time = time.time()
-        if self.last_update is None:
-            self.last_update = time.time()
+        if self.last_event_times is None:
+            self.last_event_times = {}
 
 class KPIProcessor:
     """MQTT Raw 데이터에서 KPI 계산하는 프로세서"""
     
-    def __init__(self):
+    def __init__(self, config: Dict[str, Any] = None, targets: KPITargets = None):
+        """config: config.yaml의 kpi 섹션 (defects: capacity/bucket_seconds/bucket_count/top_k, targets: path/reload_interval)"""
+        config = config or {}
+        defect_config = config.get('defects', {})
+        self.defect_capacity = defect_config.get('capacity', 32)
+        self.defect_bucket_seconds = defect_config.get('bucket_seconds', 3600)
+        self.defect_bucket_count = defect_config.get('bucket_count', 24)
+        self.defect_top_k = defect_config.get('top_k', 5)
+        # 사이클 타임 분위수 스케치 (압축도가 클수록 정확, 스테이션당 중심점 수 ~ compression)
+        percentile_config = config.get('percentiles', {})
+        self.percentiles_enabled = percentile_config.get('enabled', True)
+        self.sketch_compression = percentile_config.get('compression', 100)
+        
         self.station_metrics = {}  # 스테이션별 메트릭 저장
-        self.kpi_targets = {
-            "oee": 85.0,
-            "fty": 95.0, 
-            "otd": 98.0,
-            "quality_score": 0.95,
-            "throughput": 20.0  # 개/시간
-        }
+        # 체크포인트 복원 시점까지 반영된 이벤트 시각 {station_id: {data_type: epoch}}
+        # 이 시각 이하의 status/quality는 스냅샷에 이미 포함 → 중복으로 버림 (복원하지 않았으면 비어 있음)
+        self._restored_until: Dict[str, Dict[str, float]] = {}
+        self.duplicate_count = 0
+        # 인입 큐 워커(갱신)와 KPI 발행 타이머(계산)가 동시에 접근
+        self._lock = threading.RLock()
+        # 공장/라인 KPI: 스테이션 KPI 계산 시마다 증분 반영
+        self.factory_kpis = FactoryKPIAggregate()
+        # 공통/스테이션별/차종별 목표 (config/kpi_targets.json, 핫 리로드는 targets.start())
+        if targets is None:
+            targets_config = config.get('targets', {})
+            targets = KPITargets(targets_config.get('path', 'config/kpi_targets.json'),
+                                 reload_interval=targets_config.get('reload_interval', 30))
+        self.targets = targets
         
         print("🔢 KPI 프로세서 초기화 완료")
     
-    def process_mqtt_message(self, topic: str, payload: str) -> Dict[str, Any]:
-        """MQTT 메시지를 받아서 KPI 계산"""
+    def process_mqtt_message(self, message: MQTTMessage) -> Dict[str, Any]:
+        """MQTT 메시지를 받아서 KPI 계산 (토픽/JSON은 수신 시 1회 파싱됨)"""
+        if not self.update_metrics(message):
+            return {}
+        
+        # KPI 계산 및 반환
+        return self.calculate_station_kpis(message.station_id)
+    
+    def update_metrics(self, message: MQTTMessage, catch_up: bool = False) -> bool:
+        """메시지를 스테이션 메트릭에 반영만 수행 (KPI 계산은 KPIPublisher 타이머에서)
+        
+        catch_up: 복원 후 이력 재생 - 반영한 이벤트 시각까지 복원 경계를 넓혀
+        재연결 후 브로커가 다시 보내는 같은 메시지(QoS 1)도 중복으로 처리
+        """
         try:
-            # 토픽 파싱: factory/A01_DOOR/telemetry
-            topic_parts = topic.split('/')
-            if len(topic_parts) != 3:
-                return {}
+            # 토픽 형식: factory/A01_DOOR/telemetry
+            if not message.is_station_topic:
+                return False
             
-            _, station_id, data_type = topic_parts
-            data = json.loads(payload)
-            
-            # 스테이션 메트릭 초기화
-            if station_id not in self.station_metrics:
-                self.station_metrics[station_id] = StationMetrics(station_id)
+            station_id = message.station_id
+            data_type = message.data_type
+            data = message.data
             
-            # 데이터 타입별 처리
-            if data_type == "status":
-                self._process_status_data(station_id, data)
-            elif data_type == "quality":
-                self._process_quality_data(station_id, data)
-            elif data_type == "telemetry":
-                self._process_telemetry_data(station_id, data)
-            
-            # KPI 계산 및 반환
-            return self.calculate_station_kpis(station_id)
+            with self._lock:
+                # 스테이션 메트릭 초기화
+                if station_id not in self.station_metrics:
+                    self.station_metrics[station_id] = StationMetrics(
+                        station_id,
+                        defects=DefectStats(self.defect_capacity, self.defect_bucket_seconds, self.defect_bucket_count),
+                        cycle_time_sketch=TDigest(self.sketch_compression)
+                    )
+                
+                # 체크포인트 복원 경계 이하의 메시지는 스냅샷/캐치업에 이미 반영된 중복
+                # (복원 경계 이후의 지연 도착 메시지는 정상 반영)
+                metrics = self.station_metrics[station_id]
+                if data_type in ("status", "quality") and "timestamp" in data:
+                    event_time = message.event_time
+                    restored = self._restored_until.get(station_id)
+                    if restored is not None and event_time <= restored.get(data_type, float("-inf")):
+                        self.duplicate_count += 1
+                        return False
+                    if catch_up:
+                        self._restored_until.setdefault(station_id, {})[data_type] = event_time
+                    if event_time > metrics.last_event_times.get(data_type, float("-inf")):
+                        metrics.last_event_times[data_type] = event_time
+                
+                # 데이터 타입별 처리
+                if data_type == "status":
+                    self._process_status_data(station_id, data, message.event_time)
+                elif data_type == "quality":
+                    self._process_quality_data(station_id, data)
+                elif data_type == "telemetry":
+                    self._process_telemetry_data(station_id, data)
+            return True
             
         except Exception as e:
             print(f"❌ KPI 처리 오류: {e}")
-            return {}
+            return False
     
-    def _process_status_data(self, station_id: str, data: Dict[str, Any]):
-        """상태 데이터 처리"""
+    def _process_status_data(self, station_id: str, data: Dict[str, Any], event_time: float):
+        """상태 데이터 처리 (가동 시간은 이벤트 시각 기준 - 캐치업 재생도 실제 간격으로 누적)"""
         metrics = self.station_metrics[station_id]
         
         # 사이클 완료 체크
@@ -95,24 +230,46 @@ class KPIProcessor:
             new_cycles = data['production_count'] - metrics.total_cycles
             if new_cycles > 0:
                 metrics.total_cycles = data['production_count']
+                target_cycle_time = self.targets.station(station_id).cycle_time_for(metrics.current_model)
+                metrics.ideal_seconds += new_cycles * target_cycle_time
                 
-                # 사이클 타임 기록
-                if 'cycle_time' in data:
-                    cycle_time = data['cycle_time']
+                # 사이클 타임: payload 값, 없으면 직전 사이클 완료 이후 경과 시간 / 완료 사이클 수
+                cycle_time = data.get('cycle_time')
+                if cycle_time is None:
+                    completed_at = parse_timestamp(data.get('timestamp'), time.time())
+                    if metrics.last_cycle_at is not None and completed_at > metrics.last_cycle_at:
+                        cycle_time = (completed_at - metrics.last_cycle_at) / new_cycles
+                    metrics.last_cycle_at = completed_at
+                
+                # 사이클 타임 기록 (최근 WINDOW_SIZE개만 유지)
+                if cycle_time is not None:
                     metrics.cycle_times.append(cycle_time)
-                    
-                    # 최근 100개만 유지
-                    if len(metrics.cycle_times) > 100:
-                        metrics.cycle_times.pop(0)
+                    metrics.recent_cycle_times.append(cycle_time)
+                    metrics.target_cycle_times.append(target_cycle_time)
+                    if self.percentiles_enabled:
+                        self._add_cycle_time_sample(metrics, cycle_time)
         
-        # 가동 시간 업데이트
-        if data.get('station_status') == 'RUNNING':
-            current_time = time.time()
-            if metrics.last_update:
-                runtime_increment = (current_time - metrics.last_update) / 60  # 분 단위
-                metrics.total_runtime += runtime_increment
+        # 가동 시간 업데이트 (순서가 뒤바뀐 메시지는 누적하지 않음)
+        if metrics.last_update is not None and event_time <= metrics.last_update:
+            return
+        if data.get('station_status') == 'RUNNING' and metrics.last_update is not None:
+            gap = event_time - metrics.last_update
+            if gap <= MAX_STATUS_GAP:
+                metrics.total_runtime += gap / 60  # 분 단위
         
-        metrics.last_update = time.time()
+        metrics.last_status = data.get('station_status', metrics.last_status)
+        metrics.last_update = event_time
+    
+    def _add_cycle_time_sample(self, metrics: StationMetrics, cycle_time: float):
+        """사이클 타임 분위수 스케치 갱신 (스테이션 전체 + 작업 중인 차종)"""
+        metrics.cycle_time_sketch.add(cycle_time)
+        metrics.cycle_time_summary = None
+        model = metrics.current_model
+        if model:
+            sketch = metrics.model_cycle_sketches.get(model)
+            if sketch is None:
+                sketch = metrics.model_cycle_sketches[model] = TDigest(self.sketch_compression)
+            sketch.add(cycle_time)
     
     def _process_quality_data(self, station_id: str, data: Dict[str, Any]):
         """품질 데이터 처리"""
@@ -121,32 +278,33 @@ class KPIProcessor:
         # 검사 완료 체크
         if 'overall_score' in data:
             metrics.total_inspections += 1
+            # 최근 WINDOW_SIZE개만 유지
             metrics.quality_scores.append(data['overall_score'])
             
             # 일회 통과 체크
             if data.get('passed', False):
                 metrics.passed_first_time += 1
             
-            # 불량 기록
-            if 'defects_found' in data and data['defects_found']:
-                metrics.defects.extend(data['defects_found'])
-            
-            # 최근 100개만 유지
-            if len(metrics.quality_scores) > 100:
-                metrics.quality_scores.pop(0)
+            # 불량 기록 (시뮬레이터는 defects, 구 형식은 defects_found)
+            defects = data.get('defects_found') or data.get('defects')
+            if defects and isinstance(defects, list):
+                metrics.defects.add(defects, parse_timestamp(data.get('timestamp'), time.time()))
     
     def _process_telemetry_data(self, station_id: str, data: Dict[str, Any]):
-        """텔레메트리 데이터 처리 (필요시)"""
-        # 현재는 상태/품질 데이터만 사용하지만, 
-        # 향후 센서 데이터 기반 KPI 계산 시 활용
-        pass
+        """텔레메트리 데이터 처리 - 작업 중인 차종 추적 (사이클 목표 선택용)"""
+        rfid = data.get('rfid')
+        if isinstance(rfid, dict) and rfid.get('model'):
+            self.station_metrics[station_id].current_model = rfid['model']
     
     def calculate_station_kpis(self, station_id: str) -> Dict[str, Any]:
         """스테이션별 모든 KPI 계산"""
-        if station_id not in self.station_metrics:
-            return {}
-        
-        metrics = self.station_metrics[station_id]
+        with self._lock:
+            if station_id not in self.station_metrics:
+                return {}
+            return self._calculate_station_kpis(self.station_metrics[station_id])
+    
+    def _calculate_station_kpis(self, metrics: StationMetrics) -> Dict[str, Any]:
+        station_id = metrics.station_id
         current_time = time.time()
         
         # 기본 통계
@@ -178,6 +336,12 @@ class KPIProcessor:
         # 6. 평균 사이클 타임
         kpis["avg_cycle_time"] = self._calculate_avg_cycle_time(metrics)
         
+        # 공장/라인 합계에 증분 반영
+        self.factory_kpis.update(station_id, kpis)
+        if self.percentiles_enabled:
+            self.factory_kpis.update_cycle_time_sketches(station_id, metrics.cycle_time_sketch,
+                                                         metrics.model_cycle_sketches)
+        
         return kpis
     
     def _calculate_oee(self, metrics: StationMetrics, planned_hours: float) -> Dict[str, float]:
@@ -188,16 +352,9 @@ class KPIProcessor:
         availability = (runtime_hours / planned_hours * 100) if planned_hours > 0 else 0
         availability = min(100, availability)
         
-        # 성능률 (Performance) 
-        if metrics.cycle_times and runtime_hours > 0:
-            avg_cycle_time = sum(metrics.cycle_times) / len(metrics.cycle_times)
-            target_cycle_time = 180  # 기본 목표 (설정에서 가져와야 함)
-            
-            # 이론적 최대 생산량
-            theoretical_max = (runtime_hours * 3600) / target_cycle_time
-            actual_production = metrics.total_cycles
-            
-            performance = (actual_production / theoretical_max * 100) if theoretical_max > 0 else 0
+        # 성능률 (Performance) = 완료 사이클의 목표 시간 합계 / 가동 시간 (차종별 목표 반영)
+        if metrics.ideal_seconds > 0 and runtime_hours > 0:
+            performance = metrics.ideal_seconds / (runtime_hours * 3600) * 100
             performance = min(100, performance)
         else:
             performance = 0
@@ -213,7 +370,7 @@ class KPIProcessor:
         
         return {
             "value": round(oee, 2),
-            "target": self.kpi_targets["oee"],
+            "target": self.targets.kpi["oee"],
             "components": {
                 "availability": round(availability, 2),
                 "performance": round(performance, 2),
@@ -230,16 +387,16 @@ class KPIProcessor:
         
         return {
             "value": round(fty, 2),
-            "target": self.kpi_targets["fty"],
+            "target": self.targets.kpi["fty"],
             "passed": metrics.passed_first_time,
             "total": metrics.total_inspections
         }
     
     def _calculate_otd(self, metrics: StationMetrics) -> Dict[str, float]:
         """정시 납기율 (사이클 타임 기준)"""
+        avg_cycle_time = metrics.cycle_times.mean()
         if metrics.cycle_times:
-            avg_cycle_time = sum(metrics.cycle_times) / len(metrics.cycle_times)
-            target_cycle_time = 180  # 설정에서 가져와야 함
+            target_cycle_time = metrics.target_cycle_times.mean(self.targets.station(metrics.station_id).cycle_time)
             
             # 목표 대비 실제 성능
             otd = (target_cycle_time / avg_cycle_time * 100) if avg_cycle_time > 0 else 0
@@ -249,22 +406,20 @@ class KPIProcessor:
         
         return {
             "value": round(otd, 2),
-            "target": self.kpi_targets["otd"],
-            "avg_cycle_time": round(sum(metrics.cycle_times) / len(metrics.cycle_times), 1) if metrics.cycle_times else 0
+            "target": self.targets.kpi["otd"],
+            "avg_cycle_time": round(avg_cycle_time, 1) if metrics.cycle_times else 0
         }
     
     def _calculate_quality_score(self, metrics: StationMetrics) -> Dict[str, float]:
         """평균 품질 점수"""
-        if metrics.quality_scores:
-            avg_score = sum(metrics.quality_scores) / len(metrics.quality_scores)
-        else:
-            avg_score = 1.0
+        avg_score = metrics.quality_scores.mean(1.0)
         
         return {
             "value": round(avg_score, 3),
-            "target": self.kpi_targets["quality_score"],
+            "target": self.targets.kpi["quality_score"],
             "inspections": len(metrics.quality_scores),
-            "defects": len(metrics.defects)
+            "defects": metrics.defects.total_defects,
+            "top_defects": metrics.defects.top(self.defect_top_k)
         }
     
     def _calculate_throughput(self, metrics: StationMetrics, runtime_hours: float) -> Dict[str, float]:
@@ -276,58 +431,135 @@ class KPIProcessor:
         
         return {
             "value": round(throughput, 1),
-            "target": self.kpi_targets["throughput"],
+            "target": self.targets.station(metrics.station_id).throughput,
             "unit": "개/시간"
         }
     
     def _calculate_avg_cycle_time(self, metrics: StationMetrics) -> Dict[str, float]:
         """평균 사이클 타임"""
-        if metrics.cycle_times:
-            avg_time = sum(metrics.cycle_times) / len(metrics.cycle_times)
-            # 최근 10개 평균 (트렌드)
-            recent_avg = sum(metrics.cycle_times[-10:]) / min(10, len(metrics.cycle_times))
-        else:
-            avg_time = 0
-            recent_avg = 0
+        avg_time = metrics.cycle_times.mean()
+        # 최근 RECENT_SIZE개 평균 (트렌드)
+        recent_avg = metrics.recent_cycle_times.mean()
+        # 최근 사이클들의 차종별 목표 평균 (사이클 기록 전에는 스테이션 기본 목표)
+        target = metrics.target_cycle_times.mean(self.targets.station(metrics.station_id).cycle_time)
+        
+        # 분위수 요약은 새 사이클이 기록됐을 때만 다시 만듦 (품질/텔레메트리 메시지는 캐시 사용)
+        summary = metrics.cycle_time_summary
+        if summary is None:
+            summary = metrics.cycle_time_summary = {
+                "percentiles": metrics.cycle_time_sketch.summary() if self.percentiles_enabled else {},
+                "by_model": {model: sketch.summary()
+                             for model, sketch in sorted(metrics.model_cycle_sketches.items())}
+            }
         
         return {
             "average": round(avg_time, 1),
             "recent": round(recent_avg, 1),
-            "target": 180,  # 설정에서 가져와야 함
-            "unit": "초"
+            "target": round(target, 1),
+            "unit": "초",
+            # 전체 기간 분위수 (느린 꼬리 확인용) 및 차종별 분위수
+            "percentiles": summary["percentiles"],
+            "by_model": summary["by_model"]
         }
     
-    def get_factory_kpis(self) -> Dict[str, Any]:
-        """전체 공장 KPI 계산"""
-        if not self.station_metrics:
-            return {}
-        
-        # 모든 스테이션 KPI 집계
-        total_oee = []
-        total_fty = []
-        total_otd = []
-        total_quality = []
-        total_throughput = 0
-        
-        for station_id in self.station_metrics:
-            station_kpis = self.calculate_station_kpis(station_id)
-            
-            if station_kpis:
-                total_oee.append(station_kpis["oee"]["value"])
-                total_fty.append(station_kpis["fty"]["value"])
-                total_otd.append(station_kpis["otd"]["value"])
-                total_quality.append(station_kpis["quality_score"]["value"])
-                total_throughput += station_kpis["throughput"]["value"]
+    def export_state(self) -> Dict[str, Any]:
+        """체크포인트용 스테이션 메트릭 스냅샷 (lock 안에서 값만 복사)"""
+        with self._lock:
+            stations = {
+                station_id: {
+                    "total_cycles": metrics.total_cycles,
+                    "total_runtime": metrics.total_runtime,
+                    "cycle_times": metrics.cycle_times.to_state(),
+                    "recent_cycle_times": metrics.recent_cycle_times.to_state(),
+                    "target_cycle_times": metrics.target_cycle_times.to_state(),
+                    "ideal_seconds": metrics.ideal_seconds,
+                    "current_model": metrics.current_model,
+                    "last_cycle_at": metrics.last_cycle_at,
+                    "cycle_time_sketch": metrics.cycle_time_sketch.to_state(),
+                    "model_cycle_sketches": {model: sketch.to_state()
+                                             for model, sketch in metrics.model_cycle_sketches.items()},
+                    "total_inspections": metrics.total_inspections,
+                    "passed_first_time": metrics.passed_first_time,
+                    "quality_scores": metrics.quality_scores.to_state(),
+                    "defects": metrics.defects.to_state(),
+                    "start_time": metrics.start_time,
+                    "last_update": metrics.last_update,
+                    "last_status": metrics.last_status,
+                    "last_event_times": dict(metrics.last_event_times)
+                }
+                for station_id, metrics in self.station_metrics.items()
+            }
+        return {"stations": stations}
+    
+    def import_state(self, state: Dict[str, Any]) -> int:
+        """체크포인트 복원 - 복원한 스테이션 수 반환
         
-        # 공장 전체 평균
-        factory_kpis = {
-            "timestamp": datetime.now().isoformat(),
-            "factory_oee": round(sum(total_oee) / len(total_oee), 2) if total_oee else 0,
-            "factory_fty": round(sum(total_fty) / len(total_fty), 2) if total_fty else 0,
-            "factory_otd": round(sum(total_otd) / len(total_otd), 2) if total_otd else 0,
-            "factory_quality": round(sum(total_quality) / len(total_quality), 3) if total_quality else 0,
-            "factory_throughput": round(total_throughput, 1),
-            "active_stations": len(self.station_metrics)
-        }
+        중단 시간은 MAX_STATUS_GAP보다 길면 가동 시간에 넣지 않는다 (last_update는 이벤트 시각).
+        """
+        restored = {}
+        for station_id, values in state.get("stations", {}).items():
+            restored[station_id] = StationMetrics(
+                station_id,
+                total_cycles=values["total_cycles"],
+                total_runtime=values["total_runtime"],
+                cycle_times=RunningWindow.from_state(values["cycle_times"], WINDOW_SIZE),
+                recent_cycle_times=RunningWindow.from_state(values["recent_cycle_times"], RECENT_SIZE),
+                target_cycle_times=RunningWindow.from_state(values.get("target_cycle_times", []), WINDOW_SIZE),
+                ideal_seconds=values.get("ideal_seconds", 0.0),
+                current_model=values.get("current_model"),
+                last_cycle_at=values.get("last_cycle_at"),
+                cycle_time_sketch=TDigest.from_state(values.get("cycle_time_sketch", {}), self.sketch_compression),
+                model_cycle_sketches={model: TDigest.from_state(sketch, self.sketch_compression)
+                                      for model, sketch in values.get("model_cycle_sketches", {}).items()},
+                total_inspections=values["total_inspections"],
+                passed_first_time=values["passed_first_time"],
+                quality_scores=RunningWindow.from_state(values["quality_scores"], WINDOW_SIZE),
+                defects=DefectStats.from_state(values["defects"], self.defect_capacity,
+                                               self.defect_bucket_seconds, self.defect_bucket_count),
+                start_time=values["start_time"],
+                last_update=values.get("last_update"),
+                last_status=values.get("last_status"),
+                last_event_times=dict(values.get("last_event_times", {}))
+            )
+        with self._lock:
+            self.station_metrics.update(restored)
+            for station_id, metrics in restored.items():
+                self._restored_until[station_id] = dict(metrics.last_event_times)
+                # 새 메시지가 없는 스테이션도 공장/라인 합계에 포함되도록 기여분 시드
+                self._calculate_station_kpis(metrics)
+        return len(restored)
+    
+    def refresh_factory_kpis(self, skip: Set[str] = frozenset()) -> int:
+        """skip 이외 스테이션의 공장/라인 기여분 재계산 (KPIPublisher 주기마다 호출)
         
-        return factory_kpis
\ No newline at end of file
+        가동률/처리량은 벽시계 기준이라 메시지가 없는 스테이션의 기여분도 주기적으로 갱신한다.
+        """
+        with self._lock:
+            stale = [metrics for station_id, metrics in self.station_metrics.items() if station_id not in skip]
+            for metrics in stale:
+                self._calculate_station_kpis(metrics)
+        return len(stale)
+    
+    def get_factory_kpis(self) -> Dict[str, Any]:
+        """전체 공장 KPI (스테이션 KPI 계산 시 증분 집계된 값 조회, 라인별 롤업 포함)"""
+        return self.factory_kpis.get_factory_kpis()
+    
+    def get_line_kpis(self) -> Dict[str, Dict[str, Any]]:
+        """라인(A/B/C/D)별 KPI"""
+        return self.factory_kpis.get_line_kpis()
+    
+    def get_cycle_time_percentiles(self) -> Dict[str, Any]:
+        """공장/라인/차종별 사이클 타임 분위수 (스테이션 스케치 병합)"""
+        with self._lock:
+            return self.factory_kpis.get_cycle_time_percentiles()
+    
+    def export_cycle_time_sketches(self, station_id: str) -> Dict[str, Any]:
+        """스테이션 사이클 타임 스케치 상태 (멀티 프로세스 모드에서 부모 집계로 전달)"""
+        with self._lock:
+            metrics = self.station_metrics.get(station_id)
+            if metrics is None:
+                return {}
+            return {
+                "overall": metrics.cycle_time_sketch.to_state(),
+                "by_model": {model: sketch.to_state() for model, sketch in metrics.model_cycle_sketches.items()}
+            }
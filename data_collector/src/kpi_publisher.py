@@ -0,0 +1,153 @@
+"""
+KPI 발행 스케줄러
+메시지마다 KPI를 전송하는 대신, 주기마다 변경된 스테이션의 스냅샷만 모아 공장 단위 1회 요청으로 전송
+"""
+
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .api_client import SEND_OK, SEND_DEFERRED
+
+# 변경 여부 판단에 사용하는 KPI 값 (timestamp/runtime_hours처럼 매번 바뀌는 값 제외)
+_FINGERPRINT_KEYS = ("oee", "fty", "otd", "quality_score", "throughput", "avg_cycle_time")
+
+
+def kpi_fingerprint(kpis: Dict[str, Any]) -> Tuple:
+    """스냅샷 비교용 값 (총 사이클 수 + 각 KPI의 value/평균)"""
+    values: List[Any] = [kpis.get("total_cycles")]
+    for key in _FINGERPRINT_KEYS:
+        entry = kpis.get(key)
+        if isinstance(entry, dict):
+            values.append(entry.get("value", entry.get("average")))
+            values.append(entry.get("inspections", entry.get("total")))
+        else:
+            values.append(entry)
+    return tuple(values)
+
+
+class KPIPublisher:
+    """스테이션 KPI 스냅샷 주기 발행
+
+    - mark_dirty: 메시지 처리 후 호출 (메트릭 갱신만, 계산/전송 없음)
+    - interval마다 dirty 스테이션의 KPI를 계산하고, 마지막 발행값과 같으면 건너뜀
+    - 스냅샷은 max_batch건씩 send_batch로 전송 (스테이션당 주기별 최대 1건)
+    - 전송 실패로 버려진 배치의 스테이션은 다시 dirty로 표시 (다음 주기에 재발행)
+    - on_snapshot: 발행한 스냅샷마다 호출 (멀티 프로세스 모드의 공장 KPI 집계 큐 등)
+    - on_tick: 주기마다 이번에 계산한 스테이션 집합으로 호출 (나머지 스테이션의 공장 KPI 기여분 갱신 등)
+    """
+
+    def __init__(self, calculate: Callable[[str], Dict[str, Any]],
+                 send_batch: Callable[[List[Dict[str, Any]]], bool], interval: float = 10.0,
+                 max_batch: int = 500, on_snapshot: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 on_tick: Optional[Callable[[Set[str]], Any]] = None):
+        self.calculate = calculate
+        self.send_batch = send_batch
+        self.interval = float(interval)
+        self.max_batch = max(1, int(max_batch))
+        self.on_snapshot = on_snapshot
+        self.on_tick = on_tick
+        self.logger = logging.getLogger(__name__)
+
+        self._dirty: Set[str] = set()
+        self._published: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.marked_count = 0
+        self.snapshots_sent = 0
+        self.unchanged_skipped = 0
+        self.batches_sent = 0
+        self.deferred_batches = 0
+        self.failed_batches = 0
+
+    def mark_dirty(self, station_id: str):
+        with self._lock:
+            self._dirty.add(station_id)
+            self.marked_count += 1
+
+    def publish(self) -> int:
+        """dirty 스테이션 스냅샷 발행 - 발행 건수 반환"""
+        with self._publish_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+
+            snapshots = []
+            for station_id in sorted(dirty):
+                kpis = self.calculate(station_id)
+                if not kpis:
+                    continue
+                fingerprint = kpi_fingerprint(kpis)
+                if self._published.get(station_id) == fingerprint:
+                    self.unchanged_skipped += 1
+                    continue
+                snapshots.append((station_id, fingerprint, kpis))
+
+            for start in range(0, len(snapshots), self.max_batch):
+                entries = snapshots[start:start + self.max_batch]
+                batch = [kpis for _, _, kpis in entries]
+                if self.on_snapshot is not None:
+                    for kpis in batch:
+                        self.on_snapshot(kpis)
+                # APIClient가 실패 시 재시도 예약/스풀 처리
+                result = self.send_batch(batch)
+                if result is True or result == SEND_OK or result == SEND_DEFERRED:
+                    if result == SEND_DEFERRED:
+                        self.deferred_batches += 1
+                    else:
+                        self.batches_sent += 1
+                    self.snapshots_sent += len(batch)
+                    # 전송(또는 재시도 예약)된 스냅샷만 발행 완료로 기록
+                    for station_id, fingerprint, _ in entries:
+                        self._published[station_id] = fingerprint
+                else:
+                    # 버려진 스냅샷은 다음 주기에 다시 계산해 전송
+                    self.failed_batches += 1
+                    with self._lock:
+                        self._dirty.update(station_id for station_id, _, _ in entries)
+
+            if self.on_tick is not None:
+                self.on_tick(dirty)
+
+            if snapshots:
+                self.logger.debug(f"📤 KPI 발행: {len(snapshots)}개 스테이션 (변경 없음 {len(dirty) - len(snapshots)})")
+            return len(snapshots)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._publish_loop, name="kpi-publisher", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📤 KPI 발행 주기: {self.interval}초 (변경된 스테이션만 일괄 전송)")
+
+    def stop(self):
+        """스레드 종료 및 남은 변경분 최종 발행"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        self.publish()
+
+    def _publish_loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                self.logger.error(f"KPI 발행 오류: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._dirty)
+        return {
+            "pending_stations": pending,
+            "marked_count": self.marked_count,
+            "snapshots_sent": self.snapshots_sent,
+            "unchanged_skipped": self.unchanged_skipped,
+            "batches_sent": self.batches_sent,
+            "deferred_batches": self.deferred_batches,
+            "failed_batches": self.failed_batches
+        }
@@ -0,0 +1,183 @@
+"""
+KPI 목표값
+config/kpi_targets.json을 스테이션별/차종별 목표 테이블로 미리 계산해 두고, 파일이 바뀌면 다시 읽어 교체
+"""
+
+import json
+import os
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+# kpi_targets.json 키 → KPIProcessor 목표 키
+_KPI_TARGET_KEYS = {
+    "oee": "oee_target",
+    "fty": "fty_target",
+    "otd": "otd_target",
+    "quality_score": "quality_target",
+    "throughput": "throughput_target",
+}
+
+DEFAULT_KPI_TARGETS = {
+    "oee": 85.0,
+    "fty": 95.0,
+    "otd": 98.0,
+    "quality_score": 0.95,
+    "throughput": 20.0  # 개/시간
+}
+
+DEFAULT_CYCLE_TIME = 180.0
+
+
+class StationTarget:
+    """스테이션 1개의 목표 (사이클 타임, 시간당 생산량, 차종별 사이클 타임)"""
+
+    __slots__ = ("cycle_time", "throughput", "model_cycle_times")
+
+    def __init__(self, cycle_time: float, throughput: float, model_cycle_times: Dict[str, float]):
+        self.cycle_time = cycle_time
+        self.throughput = throughput
+        self.model_cycle_times = model_cycle_times
+
+    def cycle_time_for(self, model: Optional[str]) -> float:
+        """차종 목표 사이클 타임 (차종을 모르면 스테이션 기본값)"""
+        if model is None:
+            return self.cycle_time
+        return self.model_cycle_times.get(model, self.cycle_time)
+
+
+class _TargetTable:
+    """파일 1회 로드 결과 (교체 단위, 생성 후 변경하지 않음)"""
+
+    __slots__ = ("kpi", "stations", "default")
+
+    def __init__(self, kpi: Dict[str, float], stations: Dict[str, StationTarget], default: StationTarget):
+        self.kpi = kpi
+        self.stations = stations
+        self.default = default
+
+
+def build_table(raw: Dict[str, Any]) -> _TargetTable:
+    """kpi_targets.json 내용으로 목표 테이블 생성
+
+    차종별 사이클 타임 = 스테이션 목표 × (차종 기본 사이클 타임 × 복잡도) / 기준 차종 값
+    """
+    kpi = dict(DEFAULT_KPI_TARGETS)
+    for name, key in _KPI_TARGET_KEYS.items():
+        if key in raw:
+            kpi[name] = float(raw[key])
+
+    model_config = raw.get("vehicle_models", {})
+    models = model_config.get("models", {})
+    factors: Dict[str, float] = {}
+    reference = models.get(model_config.get("reference_model"))
+    if reference:
+        reference_time = float(reference["cycle_time_base"]) * float(reference.get("complexity_factor", 1.0))
+        for model, spec in models.items():
+            factors[model] = float(spec["cycle_time_base"]) * float(spec.get("complexity_factor", 1.0)) / reference_time
+
+    def station_target(cycle_time: float, throughput: Optional[float]) -> StationTarget:
+        return StationTarget(
+            cycle_time,
+            float(throughput) if throughput is not None else round(3600 / cycle_time, 1),
+            {model: round(cycle_time * factor, 1) for model, factor in factors.items()}
+        )
+
+    default_cycle_time = float(raw.get("default_cycle_time_target", DEFAULT_CYCLE_TIME))
+    default = station_target(default_cycle_time, kpi["throughput"])
+    stations = {
+        station_id: station_target(float(values.get("cycle_time_target", default_cycle_time)),
+                                   values.get("throughput_target"))
+        for station_id, values in raw.get("station_targets", {}).items()
+    }
+    return _TargetTable(kpi, stations, default)
+
+
+class KPITargets:
+    """스테이션별 KPI 목표 조회 + 핫 리로드
+
+    - 조회는 미리 계산한 테이블의 dict 조회 1회 (메시지 처리 중 파일/차종 계산 없음)
+    - reload_interval마다 파일 수정 시각을 확인해 바뀌었으면 새 테이블로 통째 교체
+      (읽기 측은 참조 1개만 읽으므로 lock 불필요, 파싱 실패 시 기존 테이블 유지)
+    """
+
+    def __init__(self, path: Optional[str] = "config/kpi_targets.json", reload_interval: float = 30.0):
+        self.path = path
+        self.reload_interval = float(reload_interval)
+        self.logger = logging.getLogger(__name__)
+
+        self._table = build_table({})
+        self._mtime = None
+        # 목표가 없어 기본값을 쓴 스테이션 (스테이션당 경고 1회)
+        self._unknown_stations = set()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.reload_count = 0
+        self.failed_reloads = 0
+
+        self.reload()
+
+    @property
+    def kpi(self) -> Dict[str, float]:
+        """공통 KPI 목표 {oee, fty, otd, quality_score, throughput}"""
+        return self._table.kpi
+
+    def station(self, station_id: str) -> StationTarget:
+        table = self._table
+        target = table.stations.get(station_id)
+        if target is None:
+            if station_id not in self._unknown_stations:
+                self._unknown_stations.add(station_id)
+                self.logger.warning(f"⚠️ KPI 목표 없는 스테이션: {station_id} - 기본 목표 사용 "
+                                    f"(사이클 타임 {table.default.cycle_time}초, {self.path})")
+            return table.default
+        return target
+
+    def reload(self) -> bool:
+        """파일이 바뀌었으면 다시 로드 - 교체 여부 반환"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self._mtime:
+                return False
+            with open(self.path, 'r', encoding='utf-8') as f:
+                table = build_table(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, ZeroDivisionError) as e:
+            self.failed_reloads += 1
+            self.logger.warning(f"KPI 목표 파일 로드 실패 (기존 목표 유지): {e}")
+            return False
+
+        self._table = table
+        self._mtime = mtime
+        self._unknown_stations = set()  # 새 목표 기준으로 다시 경고
+        self.reload_count += 1
+        self.logger.info(f"🎯 KPI 목표 로드: {len(table.stations)}개 스테이션 ({self.path})")
+        return True
+
+    def start(self):
+        if self._thread is not None or self.reload_interval <= 0:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._reload_loop, name="kpi-targets", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.reload_interval)
+            self._thread = None
+
+    def _reload_loop(self):
+        while not self._stop_event.wait(self.reload_interval):
+            self.reload()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "stations": len(self._table.stations),
+            "unknown_stations": len(self._unknown_stations),
+            "reload_count": self.reload_count,
+            "failed_reloads": self.failed_reloads
+        }
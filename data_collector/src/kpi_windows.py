@@ -0,0 +1,388 @@
+"""
+이벤트 시간 KPI 윈도우
+payload timestamp 기준 시간별/교대조별 텀블링 윈도우와 15분 슬라이딩 윈도우로 KPI를 집계하고,
+워터마크가 윈도우 종료 + 허용 지연을 지나면 윈도우당 확정 레코드 1건을 방출
+"""
+
+import math
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .models.message import MQTTMessage
+
+# 교대조 기본값 (현지 시각, 3교대)
+DEFAULT_SHIFTS = [
+    {"name": "day", "start": "06:00"},
+    {"name": "swing", "start": "14:00"},
+    {"name": "night", "start": "22:00"}
+]
+
+
+class _WindowStats:
+    """윈도우(또는 슬라이딩 윈도우의 pane) 1개의 누적값 - 병합 가능"""
+
+    __slots__ = ("events", "status_samples", "running_samples", "cycles",
+                 "inspections", "passed", "score_sum", "defects", "first_event", "last_event")
+
+    def __init__(self):
+        self.events = 0
+        self.status_samples = 0
+        self.running_samples = 0
+        self.cycles = 0
+        self.inspections = 0
+        self.passed = 0
+        self.score_sum = 0.0
+        self.defects = 0
+        self.first_event = None
+        self.last_event = None
+
+    def add(self, event_time: float, data_type: str, data: Dict[str, Any], cycles: int):
+        self.events += 1
+        if self.first_event is None or event_time < self.first_event:
+            self.first_event = event_time
+        if self.last_event is None or event_time > self.last_event:
+            self.last_event = event_time
+
+        if data_type == "status":
+            self.status_samples += 1
+            if data.get("station_status") == "RUNNING":
+                self.running_samples += 1
+            self.cycles += cycles
+        elif data_type == "quality" and "overall_score" in data:
+            self.inspections += 1
+            self.score_sum += data["overall_score"]
+            if data.get("passed", False):
+                self.passed += 1
+            defects = data.get("defects_found") or data.get("defects")
+            if isinstance(defects, list):
+                self.defects += len(defects)
+
+    def merge(self, other: "_WindowStats"):
+        self.events += other.events
+        self.status_samples += other.status_samples
+        self.running_samples += other.running_samples
+        self.cycles += other.cycles
+        self.inspections += other.inspections
+        self.passed += other.passed
+        self.score_sum += other.score_sum
+        self.defects += other.defects
+        for value in (other.first_event, other.last_event):
+            if value is None:
+                continue
+            if self.first_event is None or value < self.first_event:
+                self.first_event = value
+            if self.last_event is None or value > self.last_event:
+                self.last_event = value
+
+    def to_kpis(self, window_seconds: float, target_cycle_time: float) -> Dict[str, Any]:
+        """윈도우 KPI (가동률은 RUNNING 상태 샘플 비율, 계획 시간은 윈도우 길이)"""
+        availability = self.running_samples / self.status_samples * 100 if self.status_samples else 0.0
+        runtime_seconds = window_seconds * availability / 100
+        performance = min(100.0, self.cycles * target_cycle_time / runtime_seconds * 100) if runtime_seconds > 0 else 0.0
+        quality = self.passed / self.inspections * 100 if self.inspections else 100.0
+        return {
+            "oee": round(availability * performance * quality / 10000, 2),
+            "availability": round(availability, 2),
+            "performance": round(performance, 2),
+            "quality": round(quality, 2),
+            "fty": round(quality, 2),
+            "cycles": self.cycles,
+            "throughput": round(self.cycles / (window_seconds / 3600), 1),
+            "avg_cycle_time": round(runtime_seconds / self.cycles, 1) if self.cycles else 0,
+            "inspections": self.inspections,
+            "passed": self.passed,
+            "quality_score": round(self.score_sum / self.inspections, 3) if self.inspections else None,
+            "defects": self.defects,
+            "events": self.events,
+            "status_samples": self.status_samples
+        }
+
+
+class TumblingWindows:
+    """epoch 기준 size초 단위 정렬 윈도우 (예: hourly = 3600)"""
+
+    def __init__(self, name: str, size: float):
+        self.name = name
+        self.size = float(size)
+
+    def assign(self, event_time: float) -> Tuple[float, float, Optional[str]]:
+        start = event_time - (event_time % self.size)
+        return start, start + self.size, None
+
+
+class ShiftWindows:
+    """교대조 윈도우 (현지 시각 HH:MM 시작 목록, 마지막 교대조는 다음날 첫 교대조까지)"""
+
+    def __init__(self, name: str, shifts: List[Dict[str, str]]):
+        self.name = name
+        self.shifts = sorted(
+            ((int(shift["start"][:2]) * 60 + int(shift["start"][3:5]), str(shift["name"])) for shift in shifts)
+        )
+        # 직전에 계산한 경계 (모든 스테이션이 같은 경계를 공유)
+        self._cached: Tuple[float, float, Optional[str]] = (0.0, 0.0, None)
+
+    def assign(self, event_time: float) -> Tuple[float, float, Optional[str]]:
+        cached = self._cached
+        if cached[0] <= event_time < cached[1]:
+            return cached
+
+        moment = datetime.fromtimestamp(event_time)
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        minutes = moment.hour * 60 + moment.minute + moment.second / 60
+
+        index = len(self.shifts) - 1
+        day = midnight
+        for position, (start_minute, _) in enumerate(self.shifts):
+            if start_minute <= minutes:
+                index = position
+        if minutes < self.shifts[0][0]:
+            day = midnight - timedelta(days=1)  # 자정 이후 첫 교대조 전 → 전날 마지막 교대조
+
+        start_minute, label = self.shifts[index]
+        start = day + timedelta(minutes=start_minute)
+        if index + 1 < len(self.shifts):
+            end = day + timedelta(minutes=self.shifts[index + 1][0])
+        else:
+            end = day + timedelta(days=1, minutes=self.shifts[0][0])
+
+        self._cached = (start.timestamp(), end.timestamp(), label)
+        return self._cached
+
+
+class _StationState:
+    """스테이션 1개의 워터마크와 열린 윈도우"""
+
+    __slots__ = ("max_event_time", "last_arrival", "last_production_count",
+                 "tumbling", "emitted_until", "panes", "next_sliding_end")
+
+    def __init__(self):
+        self.max_event_time = None
+        self.last_arrival = 0.0
+        self.last_production_count = None
+        # 윈도우 이름 → {윈도우 시작: (종료, 라벨, 누적값)}
+        self.tumbling: Dict[str, Dict[float, Tuple[float, Optional[str], _WindowStats]]] = {}
+        # 윈도우 이름 → 방출 완료된 마지막 윈도우 종료 시각
+        self.emitted_until: Dict[str, float] = {}
+        # 슬라이딩 윈도우 pane (slide 단위 누적값)
+        self.panes: Dict[float, _WindowStats] = {}
+        self.next_sliding_end = None
+
+
+class KPIWindowManager:
+    """이벤트 시간 KPI 윈도우 집계
+
+    - 워터마크: 스테이션별 최대 이벤트 시각 - watermark_delay (스테이션마다 발행 시계가 독립)
+    - 윈도우 [start, end)는 워터마크 ≥ end + allowed_lateness가 되면 확정 방출 (1회)
+    - 이미 방출된 윈도우에 해당하는 지연 이벤트는 late_events로 집계하고 버림
+    - 슬라이딩 윈도우는 slide 단위 pane에 누적하고 방출 시 size/slide개 pane을 병합
+    - 메시지가 idle_timeout(처리 시각 기준) 동안 없는 스테이션은 열린 윈도우를 미완료(complete=False)로 방출
+      (워터마크/방출 경계/마지막 생산 카운트는 유지 - 재개 후 중복 윈도우나 사이클 누락 없음)
+    """
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], Any], hourly: bool = True,
+                 shifts: Optional[List[Dict[str, str]]] = None, sliding_seconds: float = 900,
+                 sliding_step: float = 60, watermark_delay: float = 10.0, allowed_lateness: float = 30.0,
+                 idle_timeout: float = 300.0, target_cycle_time: float = 180.0, targets=None):
+        self.emit = emit
+        self.windows: List[Any] = []
+        if hourly:
+            self.windows.append(TumblingWindows("hourly", 3600))
+        if shifts:
+            self.windows.append(ShiftWindows("shift", shifts))
+        self.sliding_seconds = float(sliding_seconds or 0)
+        self.sliding_step = float(sliding_step)
+        self.sliding_name = f"rolling_{int(self.sliding_seconds // 60)}m"
+        self.watermark_delay = float(watermark_delay)
+        self.allowed_lateness = float(allowed_lateness)
+        self.idle_timeout = float(idle_timeout)
+        self.target_cycle_time = float(target_cycle_time)
+        self.targets = targets  # KPITargets가 있으면 스테이션별 목표 사이클 타임 사용
+        self.logger = logging.getLogger(__name__)
+
+        self._stations: Dict[str, _StationState] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.events_in = 0
+        self.late_events = 0
+        self.windows_out = 0
+
+    def add(self, message: MQTTMessage):
+        """status/quality 메시지 1건 반영 (payload timestamp 기준)"""
+        event_time = message.event_time
+        data = message.data
+
+        with self._lock:
+            self.events_in += 1
+            state = self._stations.get(message.station_id)
+            if state is None:
+                state = self._stations[message.station_id] = _StationState()
+            state.last_arrival = time.time()
+
+            cycles = 0
+            if message.data_type == "status" and "production_count" in data:
+                count = data["production_count"]
+                if state.last_production_count is not None:
+                    # 카운터 재시작(시뮬레이터 재기동)이면 새 값 자체가 증가분
+                    cycles = count - state.last_production_count if count >= state.last_production_count else count
+                state.last_production_count = count
+
+            late = False
+            for spec in self.windows:
+                start, end, label = spec.assign(event_time)
+                if start < state.emitted_until.get(spec.name, float("-inf")):
+                    late = True
+                    continue
+                windows = state.tumbling.setdefault(spec.name, {})
+                window = windows.get(start)
+                if window is None:
+                    window = windows[start] = (end, label, _WindowStats())
+                window[2].add(event_time, message.data_type, data, cycles)
+
+            if self.sliding_seconds > 0:
+                pane_start = event_time - (event_time % self.sliding_step)
+                if state.next_sliding_end is None:
+                    state.next_sliding_end = pane_start + self.sliding_step
+                if pane_start < state.next_sliding_end - self.sliding_seconds:
+                    late = True
+                else:
+                    pane = state.panes.get(pane_start)
+                    if pane is None:
+                        pane = state.panes[pane_start] = _WindowStats()
+                    pane.add(event_time, message.data_type, data, cycles)
+
+            if late:
+                self.late_events += 1
+
+            if state.max_event_time is None or event_time > state.max_event_time:
+                state.max_event_time = event_time
+            ready = self._collect_ready(message.station_id, state, state.max_event_time - self.watermark_delay)
+
+        self._emit_all(ready)
+
+    def _collect_ready(self, station_id: str, state: _StationState, watermark: float,
+                       complete: bool = True) -> List[Dict[str, Any]]:
+        """워터마크가 지난 윈도우를 레코드로 만들고 상태에서 제거 (lock 보유 상태에서 호출)"""
+        ready = []
+        deadline = watermark - self.allowed_lateness
+
+        for name, windows in state.tumbling.items():
+            for start in [start for start, (end, _, _) in windows.items() if end <= deadline]:
+                end, label, stats = windows.pop(start)
+                ready.append(self._record(station_id, name, start, end, label, stats, complete))
+                state.emitted_until[name] = max(state.emitted_until.get(name, end), end)
+
+        if self.sliding_seconds > 0 and state.next_sliding_end is not None:
+            while True:
+                if state.panes:
+                    # 이벤트가 없는 구간은 건너뜀 - 반복 횟수는 pane이 있는 윈도우 수로 제한
+                    # (epoch 0/먼 미래 timestamp에도 빈 윈도우를 한 칸씩 훑지 않음)
+                    state.next_sliding_end = max(state.next_sliding_end, min(state.panes) + self.sliding_step)
+                elif math.isfinite(deadline):
+                    state.next_sliding_end = max(state.next_sliding_end,
+                                                 deadline - deadline % self.sliding_step + self.sliding_step)
+                if not state.panes or state.next_sliding_end > deadline:
+                    break
+
+                end = state.next_sliding_end
+                start = end - self.sliding_seconds
+                merged = _WindowStats()
+                for pane_start, pane in state.panes.items():
+                    if start <= pane_start < end:
+                        merged.merge(pane)
+                ready.append(self._record(station_id, self.sliding_name, start, end, None, merged, complete))
+                state.next_sliding_end = end + self.sliding_step
+                # 다음 윈도우에 포함되지 않는 pane 제거
+                for pane_start in [pane_start for pane_start in state.panes
+                                   if pane_start < state.next_sliding_end - self.sliding_seconds]:
+                    del state.panes[pane_start]
+
+        return ready
+
+    def _record(self, station_id: str, window_type: str, start: float, end: float, label: Optional[str],
+                stats: _WindowStats, complete: bool) -> Dict[str, Any]:
+        record = {
+            "station_id": station_id,
+            "window_type": window_type,
+            "window_start": datetime.fromtimestamp(start).isoformat(),
+            "window_end": datetime.fromtimestamp(end).isoformat(),
+            "window_seconds": end - start,
+            "complete": complete,
+            "timestamp": datetime.now().isoformat()
+        }
+        if label is not None:
+            record["shift"] = label
+        target_cycle_time = self.targets.station(station_id).cycle_time if self.targets is not None else self.target_cycle_time
+        record.update(stats.to_kpis(end - start, target_cycle_time))
+        return record
+
+    def _emit_all(self, records: List[Dict[str, Any]]):
+        for record in records:
+            with self._lock:
+                self.windows_out += 1
+            try:
+                self.emit(record)
+            except Exception as e:
+                self.logger.error(f"KPI 윈도우 전달 오류 ({record['station_id']}/{record['window_type']}): {e}")
+
+    def flush_idle(self, now: Optional[float] = None):
+        """idle_timeout 동안 메시지가 없는 스테이션의 열린 윈도우를 미완료로 방출"""
+        if now is None:
+            now = time.time()
+        ready = []
+        with self._lock:
+            for station_id, state in self._stations.items():
+                if now - state.last_arrival < self.idle_timeout or not self._has_open_windows(state):
+                    continue
+                # 스테이션 상태(emitted_until, last_production_count)는 유지하고 열린 윈도우만 닫음
+                if state.max_event_time is not None:
+                    ready.extend(self._collect_ready(station_id, state, state.max_event_time - self.watermark_delay))
+                ready.extend(self._collect_ready(station_id, state, float("inf"), complete=False))
+        self._emit_all(ready)
+
+    @staticmethod
+    def _has_open_windows(state: _StationState) -> bool:
+        return bool(state.panes) or any(state.tumbling.values())
+
+    def flush_all(self):
+        """열린 윈도우를 모두 미완료로 방출 (종료 시)"""
+        self.flush_idle(float("inf"))
+
+    def start(self):
+        """유휴 스테이션 방출 스레드 시작"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._idle_loop, name="kpi-windows", daemon=True)
+        self._thread.start()
+        self.logger.info(f"🪟 이벤트 시간 KPI 윈도우: {', '.join(spec.name for spec in self.windows)}"
+                         f"{', ' + self.sliding_name if self.sliding_seconds > 0 else ''} "
+                         f"(워터마크 지연 {self.watermark_delay}초, 허용 지연 {self.allowed_lateness}초)")
+
+    def stop(self):
+        """스레드 종료 및 열린 윈도우 방출"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush_all()
+
+    def _idle_loop(self):
+        while not self._stop_event.wait(max(1.0, self.idle_timeout / 4)):
+            self.flush_idle()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stations": len(self._stations),
+                "open_windows": sum(len(windows) for state in self._stations.values()
+                                    for windows in state.tumbling.values()),
+                "events_in": self.events_in,
+                "late_events": self.late_events,
+                "windows_out": self.windows_out
+            }
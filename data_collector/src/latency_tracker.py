@@ -0,0 +1,223 @@
+"""
+종단 간 지연 추적
+시뮬레이터 발행 시각(payload timestamp) → 수신 → 가공 → 백엔드 응답까지의 지연을
+스테이션/data_type별 백분위로 집계하고 p99가 예산을 넘으면 경보
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import REGISTRY
+from .models.message import MQTTMessage, parse_timestamp
+
+# 측정 구간: 발행 시각 기준 경과 시간
+STAGE_RECEIVED = "received"    # paho 콜백 수신
+STAGE_PROCESSED = "processed"  # 인입 큐 워커에서 가공 완료
+STAGE_ACKED = "acked"          # 백엔드 200 응답
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 15.0, 30.0, 60.0, 120.0)
+
+_E2E_SECONDS = REGISTRY.histogram(
+    "collector_e2e_latency_seconds",
+    "Latency from simulator publish timestamp to each pipeline stage",
+    ("stage", "data_type"),
+    buckets=LATENCY_BUCKETS
+)
+
+
+def record_data_type(record: Dict[str, Any]) -> str:
+    """가공 레코드의 data_type (롤업은 dataType, 그 외는 토픽 마지막 단계)"""
+    return record.get("dataType") or str(record.get("topic", "")).rsplit("/", 1)[-1] or "unknown"
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """정렬된 표본의 백분위 (nearest-rank)"""
+    index = min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """(station_id, data_type, stage)별 최근 window_seconds 표본으로 p50/p95/p99 계산
+
+    - 표본은 키마다 max_samples개까지 보관 (오래된 것부터 폐기)
+    - check_interval마다 p99를 예산(budget)과 비교, 초과 시 on_alert 호출 (해소 시 1회 로그)
+    - 발행 시각이 없거나 미래(시계 오차)인 표본은 음수 대신 0으로 기록
+    """
+
+    def __init__(self, budget_seconds: float = 2.0, budgets: Optional[Dict[str, float]] = None,
+                 window_seconds: float = 60.0, check_interval: float = 10.0, min_samples: int = 20,
+                 max_samples: int = 1024, alert_stage: str = STAGE_ACKED,
+                 on_alert: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.budget_seconds = float(budget_seconds)
+        self.budgets = {data_type: float(value) for data_type, value in (budgets or {}).items()}
+        self.window_seconds = float(window_seconds)
+        self.check_interval = float(check_interval)
+        self.min_samples = int(min_samples)
+        self.max_samples = int(max_samples)
+        self.alert_stage = alert_stage
+        self.on_alert = on_alert
+        self.logger = logging.getLogger(__name__)
+
+        self._samples: Dict[Tuple[str, str, str], Deque[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+        self._alerting: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_p99: Dict[Tuple[str, str, str], float] = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.alert_count = 0
+
+        REGISTRY.gauge(
+            "collector_e2e_latency_p99_seconds",
+            "p99 end-to-end latency over the tracking window (updated every check)",
+            lambda: dict(self._last_p99),
+            ("station_id", "data_type", "stage")
+        )
+        REGISTRY.gauge(
+            "collector_e2e_latency_budget_exceeded",
+            "1 while the station/data_type p99 exceeds its latency budget",
+            lambda: {key: 1 for key in list(self._alerting)},
+            ("station_id", "data_type")
+        )
+
+    def budget_for(self, data_type: str) -> float:
+        return self.budgets.get(data_type, self.budget_seconds)
+
+    def observe(self, station_id: str, data_type: str, stage: str, latency: float, now: Optional[float] = None):
+        """표본 1건 기록"""
+        if latency < 0:
+            latency = 0.0
+        if now is None:
+            now = time.time()
+        key = (station_id, data_type, stage)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.max_samples)
+            samples.append((now, latency))
+        _E2E_SECONDS.observe(latency, stage, data_type)
+
+    def record_message(self, message: MQTTMessage, stage: str, now: Optional[float] = None):
+        """MQTT 메시지 기준 기록 (received는 수신 시각 사용)"""
+        if "timestamp" not in message.data:
+            return
+        if now is None:
+            now = message.received_at if stage == STAGE_RECEIVED else time.time()
+        self.observe(message.station_id, message.data_type, stage, now - message.event_time, now)
+
+    def record_acked(self, records: Iterable[Dict[str, Any]], now: Optional[float] = None):
+        """백엔드가 수락한 가공 레코드 배치 기록"""
+        if now is None:
+            now = time.time()
+        for record in records:
+            published = parse_timestamp(record.get("timestamp"), None)
+            if published is None:
+                continue
+            self.observe(record.get("stationId", "UNKNOWN"), record_data_type(record), STAGE_ACKED,
+                         now - published, now)
+
+    def percentiles(self, now: Optional[float] = None) -> Dict[Tuple[str, str, str], Dict[str, float]]:
+        """키별 최근 윈도우 백분위 {key: {count, p50, p95, p99, max}}"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.window_seconds
+
+        with self._lock:
+            snapshot = {key: [latency for at, latency in samples if at >= cutoff]
+                        for key, samples in self._samples.items()}
+
+        result = {}
+        for key, values in snapshot.items():
+            if not values:
+                continue
+            values.sort()
+            result[key] = {
+                "count": len(values),
+                "p50": _percentile(values, 0.50),
+                "p95": _percentile(values, 0.95),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1]
+            }
+        return result
+
+    def check(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """p99 예산 초과 확인 - 새로 초과한 (station, data_type) 경보 목록 반환"""
+        results = self.percentiles(now)
+        self._last_p99 = {key: stats["p99"] for key, stats in results.items()}
+
+        new_alerts = []
+        exceeded = set()
+        for (station_id, data_type, stage), stats in results.items():
+            if stage != self.alert_stage or stats["count"] < self.min_samples:
+                continue
+            budget = self.budget_for(data_type)
+            if stats["p99"] <= budget:
+                continue
+
+            key = (station_id, data_type)
+            exceeded.add(key)
+            if key in self._alerting:
+                continue
+
+            alert = {
+                "station_id": station_id,
+                "data_type": data_type,
+                "stage": stage,
+                "p99_ms": round(stats["p99"] * 1000, 1),
+                "budget_ms": round(budget * 1000, 1),
+                "samples": stats["count"]
+            }
+            self._alerting[key] = alert
+            self.alert_count += 1
+            new_alerts.append(alert)
+            self.logger.warning(f"🚨 지연 예산 초과: {station_id}/{data_type} p99 {alert['p99_ms']}ms "
+                                f"> {alert['budget_ms']}ms ({stats['count']}건)")
+            if self.on_alert is not None:
+                try:
+                    self.on_alert(alert)
+                except Exception as e:
+                    self.logger.error(f"지연 경보 처리 오류: {e}")
+
+        for key in [key for key in self._alerting if key not in exceeded]:
+            del self._alerting[key]
+            self.logger.info(f"✅ 지연 정상화: {key[0]}/{key[1]}")
+
+        return new_alerts
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._check_loop, name="latency-tracker", daemon=True)
+        self._thread.start()
+        self.logger.info(f"⏱️ 종단 간 지연 추적: 예산 {self.budget_seconds * 1000:.0f}ms (p99, {self.alert_stage})")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _check_loop(self):
+        while not self._stop_event.wait(self.check_interval):
+            self.check()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """data_type/stage별 백분위 요약 (스테이션 합산은 최댓값 기준)"""
+        summary: Dict[str, Dict[str, float]] = {}
+        for (_, data_type, stage), stats in self.percentiles().items():
+            entry = summary.setdefault(f"{data_type}/{stage}", {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0})
+            entry["count"] += stats["count"]
+            entry["p50"] = max(entry["p50"], stats["p50"])
+            entry["p99"] = max(entry["p99"], stats["p99"])
+            entry["max"] = max(entry["max"], stats["max"])
+        return {
+            "alert_count": self.alert_count,
+            "alerting": list(self._alerting.values()),
+            "by_type": summary
+        }
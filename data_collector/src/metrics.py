@@ -0,0 +1,340 @@
+"""
+수집기 자체 메트릭
+단계별 지연 히스토그램, 처리량 카운터, 큐 깊이 등을 모아 Prometheus 텍스트 형식으로 노출
+"""
+
+import bisect
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 지연 히스토그램 기본 버킷 (초): 5µs ~ 10s (디코딩/가공은 수 µs 단위)
+DEFAULT_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _HistogramChild:
+    """레이블 값 1세트의 히스토그램 (bucket별 개수, 합계)"""
+
+    __slots__ = ("_buckets", "_counts", "_sum", "_count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+    def quantile(self, q: float) -> float:
+        """버킷 경계 기준 근사 분위수 (버킷 내부는 선형 보간)"""
+        counts, _, total = self.snapshot()
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self._buckets[index - 1] if index > 0 else 0.0
+                upper = self._buckets[index] if index < len(self._buckets) else self._buckets[-1]
+                return lower + (upper - lower) * ((rank - cumulative) / count)
+            cumulative += count
+        return self._buckets[-1]
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _Metric:
+    """레이블별 자식 메트릭 보관 (labels()로 자식을 받아 두면 조회 비용 없음)
+
+    new_child: 레이블 값 1세트의 자식 메트릭 생성 함수 (Histogram/Counter가 전달)
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 new_child: Callable[[], Any]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._new_child = new_child
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, lambda: _HistogramChild(self.buckets))
+
+    def observe(self, value: float, *labels: str):
+        self.labels(*labels).observe(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self.children():
+            counts, total_sum, total_count = child.snapshot()
+            labels = _format_labels(self.labelnames, key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {total_count}")
+            lines.append(f"{self.name}_sum{labels} {total_sum}")
+            lines.append(f"{self.name}_count{labels} {total_count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames, _CounterChild)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.labels(*labels).inc(amount)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {child.value}"
+                for key, child in self.children()]
+
+
+class Gauge:
+    """수집 시점에 콜백으로 값을 읽는 게이지 (큐 깊이, 스풀 크기 등)
+
+    callback()은 숫자 하나 또는 {레이블 값 튜플: 숫자} dict를 반환한다.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Any],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        value = self.callback()
+        if isinstance(value, dict):
+            return {tuple(str(v) for v in (key if isinstance(key, tuple) else (key,))): float(val)
+                    for key, val in value.items()}
+        return {(): float(value)}
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                for key, value in self.values().items()]
+
+
+class MetricsRegistry:
+    """메트릭 등록 및 Prometheus 텍스트 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.logger = logging.getLogger(__name__)
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, Gauge):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], Any],
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """콜백 게이지 등록 (같은 이름이면 교체)"""
+        return self._register(Gauge(name, documentation, callback, labelnames))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            try:
+                body = metric.render()
+            except Exception as e:
+                self.logger.error(f"메트릭 수집 오류 ({metric.name}): {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(body)
+        return "\n".join(lines) + "\n"
+
+
+# 수집기 전역 레지스트리 및 공통 메트릭
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "collector_stage_seconds",
+    "Per-stage processing latency (decode, queue_wait, transform, kpi)",
+    ("stage",)
+)
+MESSAGES_TOTAL = REGISTRY.counter(
+    "collector_messages_total",
+    "Decoded MQTT messages by data_type and station",
+    ("data_type", "station_id")
+)
+BACKEND_REQUESTS_TOTAL = REGISTRY.counter(
+    "collector_backend_requests_total",
+    "Backend POST attempts by endpoint and outcome (success, http_error, connection_error, error)",
+    ("endpoint", "outcome")
+)
+BACKEND_REQUEST_SECONDS = REGISTRY.histogram(
+    "collector_backend_request_seconds",
+    "Backend POST latency by endpoint",
+    ("endpoint",)
+)
+
+
+class MetricsServer:
+    """로컬 HTTP 메트릭 엔드포인트 (GET /metrics)"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread = None
+
+    def start(self) -> bool:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.error(f"❌ 메트릭 서버 시작 실패 ({self.host}:{self.port}): {e}")
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📊 메트릭 엔드포인트: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def format_summary(registry: MetricsRegistry = REGISTRY) -> List[str]:
+    """종료 요약용 텍스트 (단계별 p50/p99, data_type별 초당 메시지, 백엔드 오류율)"""
+    lines = []
+    uptime = max(1e-9, time.time() - registry.started_at)
+
+    stages = registry.get("collector_stage_seconds")
+    if stages is not None:
+        for (stage,), child in sorted(stages.children()):
+            _, total_sum, count = child.snapshot()
+            if count:
+                lines.append(f"⏱️ {stage}: {count}건, 평균 {total_sum / count * 1000:.3f}ms, "
+                             f"p50 {child.quantile(0.5) * 1000:.3f}ms, p99 {child.quantile(0.99) * 1000:.3f}ms")
+
+    messages = registry.get("collector_messages_total")
+    if messages is not None:
+        by_type: Dict[str, float] = {}
+        for (data_type, _), child in messages.children():
+            by_type[data_type] = by_type.get(data_type, 0) + child.value
+        for data_type, count in sorted(by_type.items()):
+            lines.append(f"📨 {data_type}: {int(count)}건 ({count / uptime:.1f}/s)")
+
+    requests_total = registry.get("collector_backend_requests_total")
+    if requests_total is not None:
+        by_endpoint: Dict[str, List[float]] = {}
+        for (endpoint, outcome), child in requests_total.children():
+            total = by_endpoint.setdefault(endpoint, [0.0, 0.0])
+            total[0] += child.value
+            if outcome != "success":
+                total[1] += child.value
+        for endpoint, (total, errors) in sorted(by_endpoint.items()):
+            lines.append(f"🌐 {endpoint}: {int(total)}회 요청, 오류율 {errors / total * 100:.1f}%")
+
+    return lines
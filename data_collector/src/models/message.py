@@ -0,0 +1,75 @@
+# src/models/message.py
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, Any, Tuple, Union
+import json
+import time
+
+@dataclass
+class MQTTMessage:
+    """디코딩된 MQTT 메시지 봉투
+
+    토픽 파싱과 JSON 디코딩을 수신 시 1회만 수행하고
+    DataProcessor / KPIProcessor 등 모든 핸들러가 공유한다.
+    """
+    topic: str
+    topic_parts: Tuple[str, ...]
+    station_id: str
+    data_type: str
+    data: Dict[str, Any]
+    received_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def decode(cls, topic: str, payload: Union[bytes, str], received_at: float = None,
+               codec=None) -> 'MQTTMessage':
+        """토픽(factory/{station_id}/{data_type})과 페이로드를 파싱하여 봉투 생성
+
+        codec이 주어지면 해당 JSON 코덱(src.codec)으로 디코딩한다.
+        JSON 형식이 잘못된 경우 ValueError(json.JSONDecodeError 등)를 그대로 전파한다.
+        """
+        if received_at is None:
+            received_at = time.time()
+
+        data = codec.loads(payload) if codec is not None else json.loads(payload)
+        if not isinstance(data, dict):
+            data = {"value": data}
+
+        topic_parts = tuple(topic.split('/'))
+        if len(topic_parts) == 3:
+            station_id = topic_parts[1]
+            data_type = topic_parts[2]
+        else:
+            station_id = data.get("station_id", "UNKNOWN")
+            data_type = topic_parts[-1] if topic_parts else ""
+
+        return cls(
+            topic=topic,
+            topic_parts=topic_parts,
+            station_id=station_id,
+            data_type=data_type,
+            data=data,
+            received_at=received_at
+        )
+
+    @property
+    def is_station_topic(self) -> bool:
+        """factory/{station_id}/{data_type} 형식 여부"""
+        return len(self.topic_parts) == 3
+
+    @cached_property
+    def event_time(self) -> float:
+        """페이로드 timestamp(ISO 8601)의 epoch 초, 없거나 형식 오류면 수신 시각"""
+        return parse_timestamp(self.data.get("timestamp"), self.received_at)
+
+
+def parse_timestamp(value: Any, default: float) -> float:
+    """ISO 8601 문자열 또는 epoch 숫자를 epoch 초로 변환"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return default
@@ -1,11 +1,30 @@
 import paho.mqtt.client as mqtt
 import logging
-from typing import Callable, List
+from typing import Callable, List, Optional
 import json
 import os
+import time
+from .models.message import MQTTMessage
+from .metrics import STAGE_SECONDS, MESSAGES_TOTAL
+
+_DECODE_SECONDS = STAGE_SECONDS.labels("decode")
 
 class MQTTClient:
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", codec=None,
+                 topics: Optional[List[str]] = None,
+                 station_filter: Optional[Callable[[str, str], bool]] = None,
+                 client_suffix: Optional[str] = None):
+        """MQTT 클라이언트 초기화
+
+        topics가 주어지면 설정 파일의 구독 토픽 대신 사용 (멀티 프로세스 워커의 공유 구독 등)
+        station_filter(station_id, data_type)가 False인 메시지는 JSON 디코딩 전에 건너뜀
+        client_suffix는 mqtt.client_id 뒤에 붙여 워커별 세션을 구분
+        """
+        # 페이로드 디코딩용 JSON 코덱 (None이면 표준 json)
+        self.codec = codec
+        self.station_filter = station_filter
+        self.filtered_count = 0
+        
         # 기본 설정
         self.mqtt_config = {
             "broker_host": "localhost",
@@ -27,7 +46,15 @@ class MQTTClient:
         except FileNotFoundError:
             logging.info(f"설정 파일 {config_path}를 찾을 수 없음. 기본 설정 사용.")
         
-        self.client = mqtt.Client()
+        if topics is not None:
+            self.mqtt_config['topics'] = list(topics)
+        
+        # client_id를 고정하고 clean_session=False로 두면 중단 중 QoS 1 메시지를 브로커가 보관했다가 재연결 시 전달
+        client_id = self.mqtt_config.get('client_id') or ""
+        if client_id and client_suffix:
+            client_id = f"{client_id}-{client_suffix}"
+        clean_session = self.mqtt_config.get('clean_session', True) if client_id else True
+        self.client = mqtt.Client(client_id=client_id, clean_session=clean_session)
         self.message_handlers: List[Callable] = []
         
         # MQTT 이벤트 핸들러 설정
@@ -38,7 +65,7 @@ class MQTTClient:
         self.logger = logging.getLogger(__name__)
     
     def add_message_handler(self, handler: Callable):
-        """메시지 처리 핸들러 추가"""
+        """메시지 처리 핸들러 추가 (handler(message: MQTTMessage))"""
         self.message_handlers.append(handler)
     
     def _on_connect(self, client, userdata, flags, rc):
@@ -52,17 +79,31 @@ class MQTTClient:
             self.logger.error(f"❌ MQTT 연결 실패: {rc}")
     
     def _on_message(self, client, userdata, msg):
-        """메시지 수신 처리"""
+        """메시지 수신 처리 - 토픽 파싱/JSON 디코딩은 여기서 1회만 수행"""
         try:
             topic = msg.topic
-            payload = msg.payload.decode('utf-8')
             
             self.logger.debug(f"📨 메시지 수신: {topic}")
             
-            # 등록된 모든 핸들러에게 메시지 전달
+            # 다른 워커 담당 스테이션은 토픽만 보고 건너뜀 (factory/{station_id}/{data_type})
+            if self.station_filter is not None:
+                parts = topic.split('/')
+                if len(parts) == 3 and not self.station_filter(parts[1], parts[2]):
+                    self.filtered_count += 1
+                    return
+            
+            started = time.perf_counter()
+            message = MQTTMessage.decode(topic, msg.payload, codec=self.codec)
+            _DECODE_SECONDS.observe(time.perf_counter() - started)
+            MESSAGES_TOTAL.labels(message.data_type, message.station_id).inc()
+            
+            # 등록된 모든 핸들러에게 동일한 봉투 전달
             for handler in self.message_handlers:
-                handler(topic, payload)
+                handler(message)
                 
+        except ValueError as e:
+            # json.JSONDecodeError, orjson.JSONDecodeError 모두 ValueError 하위 클래스
+            self.logger.error(f"JSON 파싱 오류 ({msg.topic}): {e}")
         except Exception as e:
             self.logger.error(f"메시지 처리 오류: {e}")
     
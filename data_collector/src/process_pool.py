@@ -0,0 +1,196 @@
+"""
+멀티 프로세스 수집기
+스테이션 해시로 워커 프로세스를 나누어 JSON 디코딩/가공/KPI 계산을 여러 코어에서 수행
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import logging
+import zlib
+from typing import Any, Callable, Dict, Iterable, List
+
+from .factory_kpis import FactoryKPIAggregate, format_cycle_time_percentiles
+from .quantile_sketch import TDigest
+
+
+def station_worker(station_id: str, workers: int) -> int:
+    """station_id → 담당 워커 프로세스 번호
+
+    프로세스 내부 인입 큐 샤드(crc32 % 스레드 수)와 분포가 겹치지 않도록
+    접두어를 붙여 해시한다.
+    """
+    return zlib.crc32(f"process:{station_id}".encode('utf-8')) % workers
+
+
+def worker_topics(topics: Iterable[str], shared_group: str, shared_data_types: Iterable[str]) -> List[str]:
+    """워커 구독 토픽 생성
+
+    shared_data_types의 토픽은 공유 구독($share/{group}/...)으로 바꿔 브로커가 워커 간에
+    분배하게 하고, 나머지는 모든 워커가 구독한 뒤 station_filter로 담당 스테이션만 처리한다.
+    """
+    shared = set(shared_data_types)
+    result = []
+    for topic in topics:
+        if topic.rsplit('/', 1)[-1] in shared:
+            result.append(f"$share/{shared_group}/{topic}")
+        else:
+            result.append(topic)
+    return result
+
+
+def make_station_filter(index: int, workers: int, shared_data_types: Iterable[str]) -> Callable[[str, str], bool]:
+    """워커 index가 처리할 메시지인지 판별하는 필터 (공유 구독 data_type은 항상 처리)"""
+    shared = frozenset(shared_data_types)
+    owned: Dict[str, bool] = {}
+
+    def station_filter(station_id: str, data_type: str) -> bool:
+        if data_type in shared:
+            return True
+        result = owned.get(station_id)
+        if result is None:
+            result = owned[station_id] = station_worker(station_id, workers) == index
+        return result
+
+    return station_filter
+
+
+class FactoryKPIAggregator:
+    """워커 프로세스가 보낸 스테이션 KPI를 모아 공장 전체 KPI 계산
+
+    스테이션은 워커 1개에만 배정되므로 스테이션별 최신 KPI만 유지하면 된다.
+    """
+
+    def __init__(self, kpi_queue):
+        self.kpi_queue = kpi_queue
+        self.logger = logging.getLogger(__name__)
+
+        self._station_kpis: Dict[str, Dict[str, Any]] = {}
+        self._aggregate = FactoryKPIAggregate()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.received_count = 0
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="factory-kpi-aggregator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                station_id, kpis, sketches = self.kpi_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                self._station_kpis[station_id] = kpis
+                self.received_count += 1
+            self._aggregate.update(station_id, kpis)
+            if sketches:
+                self._aggregate.update_cycle_time_sketches(
+                    station_id,
+                    TDigest.from_state(sketches["overall"]),
+                    {model: TDigest.from_state(state) for model, state in sketches["by_model"].items()}
+                )
+
+    def get_station_kpis(self, station_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._station_kpis.get(station_id, {})
+
+    def get_factory_kpis(self) -> Dict[str, Any]:
+        """전체 공장 KPI (KPIProcessor.get_factory_kpis와 같은 형식, 라인별 롤업 포함)"""
+        return self._aggregate.get_factory_kpis()
+
+    def get_cycle_time_percentiles(self) -> Dict[str, Any]:
+        """워커별 스테이션 스케치를 병합한 공장/라인/차종별 사이클 타임 분위수"""
+        return self._aggregate.get_cycle_time_percentiles()
+
+
+class CollectorProcessPool:
+    """수집 워커 프로세스 N개 실행 및 공장 KPI 집계
+
+    target(config_path, index, workers, kpi_queue)는 워커 프로세스에서 실행되며
+    계산한 스테이션 KPI를 (station_id, kpis, 사이클 타임 스케치 상태) 형태로 kpi_queue에 넣는다.
+    """
+
+    def __init__(self, target: Callable, config_path: str = "config.yaml", workers: int = 4,
+                 report_interval: float = 30.0, kpi_queue_size: int = 10000):
+        self.target = target
+        self.config_path = config_path
+        self.workers = max(1, int(workers))
+        self.report_interval = float(report_interval)
+        self.logger = logging.getLogger(__name__)
+
+        # spawn: 부모의 스레드/소켓 상태를 물려받지 않도록 새 인터프리터로 시작
+        self._context = multiprocessing.get_context("spawn")
+        self.kpi_queue = self._context.Queue(maxsize=kpi_queue_size)
+        self.aggregator = FactoryKPIAggregator(self.kpi_queue)
+        self._processes: List[multiprocessing.Process] = []
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """워커 프로세스 및 KPI 집계 스레드 시작"""
+        self.aggregator.start()
+        for index in range(self.workers):
+            process = self._context.Process(
+                target=self.target,
+                args=(self.config_path, index, self.workers, self.kpi_queue),
+                name=f"collector-worker-{index}"
+            )
+            process.start()
+            self._processes.append(process)
+        self.logger.info(f"🧩 수집 워커 프로세스 {self.workers}개 시작")
+
+    def run(self):
+        """워커가 모두 종료될 때까지 공장 KPI를 주기적으로 출력"""
+        next_report = time.monotonic() + self.report_interval
+        while not self._stop_event.is_set() and any(p.is_alive() for p in self._processes):
+            self._stop_event.wait(1.0)
+            if time.monotonic() >= next_report:
+                next_report += self.report_interval
+                self.print_factory_kpis()
+
+    def signal_workers(self):
+        """워커에 SIGTERM 전달 (터미널 Ctrl+C는 프로세스 그룹 전체에 전달되므로 불필요)"""
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+    def stop(self, timeout: float = 15.0):
+        """워커 종료 대기 (워커는 각자 시그널 핸들러에서 남은 데이터 전송 후 종료)"""
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                self.logger.warning(f"⚠️ 워커 강제 종료: {process.name}")
+                process.kill()
+        self.aggregator.stop()
+
+    def print_factory_kpis(self):
+        factory_kpis = self.aggregator.get_factory_kpis()
+        if factory_kpis:
+            print(f"🏭 공장 KPI: OEE {factory_kpis['factory_oee']}%, FTY {factory_kpis['factory_fty']}%, "
+                  f"처리량 {factory_kpis['factory_throughput']}/h ({factory_kpis['active_stations']}개 스테이션)")
+            for line, kpis in factory_kpis['lines'].items():
+                print(f"   {line}라인: OEE {kpis['oee']}%, FTY {kpis['fty']}%, 처리량 {kpis['throughput']}/h "
+                      f"({kpis['active_stations']}개)")
+        for line in format_cycle_time_percentiles(self.aggregator.get_cycle_time_percentiles()):
+            print(line)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "alive_workers": sum(1 for p in self._processes if p.is_alive()),
+            "kpi_messages": self.aggregator.received_count
+        }
@@ -0,0 +1,210 @@
+"""
+스트리밍 분위수 스케치
+병합 가능한 t-digest (merging digest) - 스테이션별 사이클 타임 p50/p90/p95/p99를 고정 메모리로 추정
+"""
+
+import math
+from bisect import bisect_right
+from itertools import accumulate, chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_QUANTILES = (0.50, 0.90, 0.95, 0.99)
+
+# summary 캐시 허용 오차: 마지막 계산 이후 추가된 관측이 이 비율 이하이면 재계산 생략
+# (순위 오차 0.5%는 compression 100 t-digest 자체의 중앙값 부근 오차와 같은 수준)
+SUMMARY_STALENESS = 0.005
+
+
+def _k_to_q(k: float, compression: float) -> float:
+    """k1 스케일 함수의 역함수 (꼬리 쪽 중심점을 작게 유지)"""
+    return (math.sin(k * 2 * math.pi / compression) + 1) / 2
+
+
+def _q_to_k(q: float, compression: float) -> float:
+    return compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+class TDigest:
+    """병합 가능한 t-digest
+
+    - add: 버퍼에 쌓았다가 buffer_size마다 중심점과 정렬 병합 (값 1건당 O(1) 분할 상환)
+    - 중심점 수는 compression에 비례하는 상한을 넘지 않음 (관측 수와 무관하게 메모리 일정)
+    - merge: 다른 스케치(스테이션/라인/워커 프로세스)의 중심점을 합쳐 재압축
+    - 양 끝 분위수 정확도가 높은 k1 스케일 사용, min/max는 정확한 값 보관
+    """
+
+    __slots__ = ("compression", "buffer_size", "count", "min", "max", "_means", "_weights", "_buffer",
+                 "_summary")
+
+    def __init__(self, compression: float = 100.0, buffer_size: Optional[int] = None):
+        self.compression = float(compression)
+        self.buffer_size = int(buffer_size or max(32, 5 * compression))
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: List[float] = []
+        self._weights: List[float] = []
+        self._buffer: List[float] = []
+        # summary 결과 캐시 (count, qs, digits, 결과)
+        self._summary = None
+
+    def add(self, value: float):
+        value = float(value)
+        self._buffer.append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """다른 스케치를 이 스케치에 합침 (other는 변경하지 않음)"""
+        if not other.count:
+            return
+        items = list(zip(self._means, self._weights))
+        items.extend((value, 1.0) for value in self._buffer)
+        items.extend(zip(other._means, other._weights))
+        items.extend((value, 1.0) for value in other._buffer)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._buffer = []
+        self._rebuild(items)
+
+    def copy(self) -> "TDigest":
+        digest = TDigest(self.compression, self.buffer_size)
+        digest.count = self.count
+        digest.min = self.min
+        digest.max = self.max
+        digest._means = list(self._means)
+        digest._weights = list(self._weights)
+        digest._buffer = list(self._buffer)
+        return digest
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = list(zip(self._means, self._weights))
+        items.extend((value, 1.0) for value in self._buffer)
+        self._buffer = []
+        self._rebuild(items)
+
+    def _rebuild(self, items: List[tuple]):
+        """(평균, 가중치) 목록을 정렬 후 k1 스케일 한도 안에서 인접 중심점 병합"""
+        items.sort()
+        total = sum(weight for _, weight in items)
+        compression = self.compression
+
+        means: List[float] = []
+        weights: List[float] = []
+        current_mean, current_weight = items[0]
+        weight_before = 0.0
+        q_limit = _k_to_q(_q_to_k(0.0, compression) + 1, compression) * total
+
+        for mean, weight in items[1:]:
+            proposed = current_weight + weight
+            if weight_before + proposed <= q_limit:
+                current_weight = proposed
+                current_mean += (mean - current_mean) * weight / proposed
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                weight_before += current_weight
+                q_limit = _k_to_q(_q_to_k(weight_before / total, compression) + 1, compression) * total
+                current_mean, current_weight = mean, weight
+
+        means.append(current_mean)
+        weights.append(current_weight)
+        self._means = means
+        self._weights = weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> List[Optional[float]]:
+        """분위수 목록 추정 (누적 가중치 이진 탐색, 관측이 없으면 None)"""
+        if not self.count:
+            return [None] * len(qs)
+        if len(self._buffer) > len(self._means):
+            self._compress()
+        if self._buffer:
+            # 버퍼가 작으면 재압축 없이 중심점과 함께 정렬한 뷰에서 계산 (스케치 상태 변경 없음)
+            items = sorted(chain(zip(self._means, self._weights), ((value, 1.0) for value in self._buffer)))
+            means = [mean for mean, _ in items]
+            weights = [weight for _, weight in items]
+        else:
+            means, weights = self._means, self._weights
+        if len(means) == 1:
+            return [means[0]] * len(qs)
+
+        # 중심점 i의 누적 중앙 위치 (i 이전 가중치 합 + 자기 가중치 / 2)
+        centers = [cumulative - weight / 2 for cumulative, weight in zip(accumulate(weights), weights)]
+        total = self.count
+        results = []
+        for q in qs:
+            target = min(max(q, 0.0), 1.0) * total
+            if target <= centers[0]:
+                # 최소값 ~ 첫 중심점 사이 보간
+                results.append(self.min + (means[0] - self.min) * target / centers[0])
+            elif target >= centers[-1]:
+                # 마지막 중심점 ~ 최대값 사이 보간
+                span = total - centers[-1]
+                fraction = (target - centers[-1]) / span if span > 0 else 0.0
+                results.append(means[-1] + (self.max - means[-1]) * fraction)
+            else:
+                index = bisect_right(centers, target) - 1
+                fraction = (target - centers[index]) / (centers[index + 1] - centers[index])
+                results.append(means[index] + (means[index + 1] - means[index]) * fraction)
+        return results
+
+    def summary(self, qs: Sequence[float] = DEFAULT_QUANTILES, digits: int = 1) -> Dict[str, Any]:
+        """{count, p50, p90, ...} (KPI 페이로드용)
+
+        메시지마다 KPI를 계산해도 분위수 재계산은 관측이 SUMMARY_STALENESS 비율 이상 늘었을 때만 수행
+        (count는 분위수를 계산한 시점의 관측 수)
+        """
+        cached = self._summary
+        if cached is not None and cached[1] == (tuple(qs), digits) and \
+                cached[0] <= self.count <= cached[0] * (1 + SUMMARY_STALENESS):
+            return dict(cached[2])
+        result: Dict[str, Any] = {"count": int(self.count)}
+        for q, value in zip(qs, self.quantiles(qs)):
+            result[f"p{q * 100:g}"] = round(value, digits) if value is not None else None
+        self._summary = (self.count, (tuple(qs), digits), result)
+        return dict(result)
+
+    def __len__(self) -> int:
+        """중심점 수 (메모리 확인용)"""
+        return len(self._means) + len(self._buffer)
+
+    def to_state(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": list(self._means),
+            "weights": list(self._weights)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], compression: Optional[float] = None) -> "TDigest":
+        digest = cls(compression or state.get("compression", 100.0))
+        digest.count = float(state.get("count", 0))
+        if digest.count:
+            digest.min = float(state["min"])
+            digest.max = float(state["max"])
+        digest._means = [float(value) for value in state.get("means", [])]
+        digest._weights = [float(value) for value in state.get("weights", [])]
+        return digest
+
+
+def merge_all(digests: Iterable[TDigest], compression: float = 100.0) -> TDigest:
+    """여러 스케치를 새 스케치 1개로 병합 (원본은 변경하지 않음)"""
+    merged = TDigest(compression)
+    for digest in digests:
+        merged.merge(digest)
+    return merged
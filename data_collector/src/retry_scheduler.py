@@ -0,0 +1,115 @@
+"""
+재시도 스케줄러
+time.sleep 대신 타이머 스레드 하나에서 지연 재시도를 실행
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import logging
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+class RetryScheduler:
+    """지연 작업 스케줄러 (단일 스레드 + 힙)
+
+    - schedule(delay, task, on_cancel): delay초 뒤 task() 실행
+    - 대기 작업이 max_pending을 넘으면 즉시 on_cancel() 호출 (예: 스풀로 이관)
+    - stop() 시 남은 작업은 실행하지 않고 on_cancel() 호출
+    """
+
+    def __init__(self, max_pending: int = 1000, name: str = "retry-scheduler"):
+        self.max_pending = max(1, int(max_pending))
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._heap: List[Tuple[float, int, Callable, Optional[Callable]]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        # 통계
+        self.scheduled_count = 0
+        self.executed_count = 0
+        self.overflow_count = 0
+
+    def start(self):
+        """스케줄러 스레드 시작"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """스케줄러 종료 - 남은 작업은 on_cancel로 처리"""
+        with self._condition:
+            self._running = False
+            pending = self._heap
+            self._heap = []
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        for _, _, _, on_cancel in pending:
+            self._cancel(on_cancel)
+
+    def schedule(self, delay: float, task: Callable[[], Any], on_cancel: Optional[Callable[[], Any]] = None) -> bool:
+        """delay초 뒤 task 실행 예약 (예약 실패 시 on_cancel 호출 후 False)"""
+        with self._condition:
+            accepted = self._running and len(self._heap) < self.max_pending
+            if accepted:
+                heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), task, on_cancel))
+                self.scheduled_count += 1
+                self._condition.notify()
+            else:
+                self.overflow_count += 1
+
+        if not accepted:
+            self._cancel(on_cancel)
+        return accepted
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = (self._heap[0][0] - time.monotonic()) if self._heap else None
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+                _, _, task, _ = heapq.heappop(self._heap)
+
+            try:
+                task()
+            except Exception as e:
+                self.logger.error(f"재시도 작업 오류: {e}")
+            with self._condition:
+                self.executed_count += 1
+
+    def _cancel(self, on_cancel: Optional[Callable[[], Any]]):
+        if on_cancel is None:
+            return
+        try:
+            on_cancel()
+        except Exception as e:
+            self.logger.error(f"재시도 취소 처리 오류: {e}")
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """스케줄러 통계 반환"""
+        with self._condition:
+            return {
+                "pending": len(self._heap),
+                "scheduled_count": self.scheduled_count,
+                "executed_count": self.executed_count,
+                "overflow_count": self.overflow_count
+            }
@@ -0,0 +1,321 @@
+"""
+디스크 스풀
+백엔드 장애 시 전송 실패한 요청을 세그먼트 단위 append-only 파일에 보관하고,
+health_check() 성공 시 백그라운드에서 순서대로 재전송
+"""
+
+import os
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .codec import get_codec
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".log"
+CURSOR_FILE = "cursor"
+
+
+class DiskSpool:
+    """세그먼트 기반 append-only 스풀
+
+    - 레코드 1건 = 실패한 요청 1건 ({"endpoint": ..., "data": ...} JSON 한 줄)
+    - 세그먼트가 segment_bytes를 넘으면 새 세그먼트로 교체
+    - 전체 크기가 max_bytes를 넘으면 가장 오래된 세그먼트부터 폐기
+    - 재전송 위치는 cursor 파일(세그먼트 번호, 오프셋)에 기록하여 재시작 후에도 이어서 처리
+      (cursor_sync_records건마다, 세그먼트 완료/전송 실패/종료 시 기록 - 비정상 종료 시 최대
+      cursor_sync_records건은 재시작 후 다시 전송될 수 있음, 백엔드 배치 API는 재전송에 안전)
+    - 재전송은 봉인된 세그먼트만 대상으로 하며, 스풀 내부 순서를 보장한다
+    """
+
+    def __init__(self, directory: str = "spool", codec=None,
+                 segment_bytes: int = 8 * 1024 * 1024, max_bytes: int = 256 * 1024 * 1024,
+                 replay_interval: float = 5.0, cursor_sync_records: int = 100):
+        self.directory = directory
+        self.codec = codec or get_codec()
+        self.segment_bytes = int(segment_bytes)
+        self.max_bytes = int(max_bytes)
+        self.replay_interval = float(replay_interval)
+        self.cursor_sync_records = max(1, int(cursor_sync_records))
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._segments: List[int] = []
+        self._sizes: Dict[int, int] = {}
+        self._active = None
+        self._active_seq: Optional[int] = None
+        self._cursor: Tuple[int, int] = (0, 0)
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.spooled_batches = 0
+        self.spooled_records = 0
+        self.replayed_batches = 0
+        self.replayed_records = 0
+        self.dropped_batches = 0
+        self.corrupt_batches = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # 초기화 / 복구
+    # ------------------------------------------------------------------
+    def _recover(self):
+        """기존 세그먼트와 cursor 복구"""
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    seq = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                except ValueError:
+                    continue
+                self._segments.append(seq)
+                self._sizes[seq] = os.path.getsize(self._segment_path(seq))
+        self._segments.sort()
+
+        cursor_path = os.path.join(self.directory, CURSOR_FILE)
+        if os.path.exists(cursor_path):
+            try:
+                with open(cursor_path, 'r', encoding='utf-8') as f:
+                    seq, offset = f.read().split()
+                self._cursor = (int(seq), int(offset))
+            except (OSError, ValueError):
+                self.logger.warning("⚠️ 스풀 cursor 손상 - 처음부터 재전송")
+
+        # cursor 이전 세그먼트는 이미 재전송 완료
+        if self._segments and self._cursor[0] not in self._sizes:
+            self._cursor = (self._segments[0], 0)
+
+        if self._segments:
+            self.logger.info(f"💾 스풀 복구: 세그먼트 {len(self._segments)}개, "
+                             f"{self.pending_bytes()} bytes 재전송 대기")
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:010d}{SEGMENT_SUFFIX}")
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    def append(self, endpoint: str, data: Any) -> bool:
+        """실패한 요청 1건 기록"""
+        line = self.codec.dumps({"endpoint": endpoint, "data": data}) + b"\n"
+
+        with self._lock:
+            if len(line) > self.max_bytes:
+                self.dropped_batches += 1
+                self.logger.error(f"❌ 스풀 레코드가 최대 크기보다 큼 - 폐기 ({len(line)} bytes)")
+                return False
+
+            if self._active is None or self._sizes[self._active_seq] + len(line) > self.segment_bytes:
+                self._rotate()
+            self._enforce_limit(len(line))
+
+            self._active.write(line)
+            self._active.flush()
+            self._sizes[self._active_seq] += len(line)
+
+            self.spooled_batches += 1
+            self.spooled_records += len(data) if isinstance(data, list) else 1
+
+        return True
+
+    def _rotate(self):
+        """새 세그먼트 시작 (lock 보유 상태에서 호출)"""
+        if self._active is not None:
+            self._active.close()
+
+        seq = (self._segments[-1] + 1) if self._segments else max(1, self._cursor[0])
+        self._active = open(self._segment_path(seq), 'ab')
+        self._active_seq = seq
+        self._segments.append(seq)
+        self._sizes[seq] = 0
+
+        if len(self._segments) == 1:
+            self._cursor = (seq, 0)
+
+    def _enforce_limit(self, incoming: int):
+        """디스크 한도 초과 시 가장 오래된 봉인 세그먼트 폐기 (lock 보유 상태에서 호출)"""
+        while (sum(self._sizes.values()) + incoming > self.max_bytes
+               and len(self._segments) > 1):
+            seq = self._segments.pop(0)
+            offset = self._cursor[1] if self._cursor[0] == seq else 0
+            dropped = self._count_lines(seq, offset)
+            self._remove_segment(seq)
+
+            self.dropped_batches += dropped
+            self._cursor = (self._segments[0], 0)
+            self._write_cursor()
+            self.logger.warning(f"⚠️ 스풀 한도 초과 - 세그먼트 {seq} 폐기 ({dropped}건)")
+
+    def _count_lines(self, seq: int, offset: int) -> int:
+        try:
+            with open(self._segment_path(seq), 'rb') as f:
+                f.seek(offset)
+                return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(65536), b""))
+        except OSError:
+            return 0
+
+    def _remove_segment(self, seq: int):
+        self._sizes.pop(seq, None)
+        try:
+            os.remove(self._segment_path(seq))
+        except OSError:
+            pass
+
+    def _write_cursor(self):
+        """cursor 원자적 기록 (lock 보유 상태에서 호출)"""
+        cursor_path = os.path.join(self.directory, CURSOR_FILE)
+        tmp_path = cursor_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"{self._cursor[0]} {self._cursor[1]}")
+        os.replace(tmp_path, cursor_path)
+
+    # ------------------------------------------------------------------
+    # 재전송
+    # ------------------------------------------------------------------
+    def replay_once(self, sender: Callable[[str, Any], bool]) -> int:
+        """스풀된 요청을 순서대로 재전송 (실패 시 중단), 재전송 건수 반환"""
+        replayed = 0
+
+        while not self._stop_event.is_set():
+            with self._lock:
+                if not self._segments:
+                    break
+
+                seq = self._segments[0]
+                offset = self._cursor[1] if self._cursor[0] == seq else 0
+                if seq == self._active_seq:
+                    # 기록 중인 세그먼트는 봉인 후 재전송
+                    if self._sizes[seq] <= offset:
+                        break
+                    self._rotate()
+
+            completed, offset, count = self._replay_segment(seq, offset, sender)
+            replayed += count
+
+            with self._lock:
+                # 재전송 중 한도 초과로 폐기된 경우
+                if not self._segments or self._segments[0] != seq:
+                    continue
+
+                if completed:
+                    self._segments.pop(0)
+                    self._remove_segment(seq)
+                    next_seq = self._segments[0] if self._segments else seq + 1
+                    self._cursor = (next_seq, 0)
+                else:
+                    self._cursor = (seq, offset)
+                self._write_cursor()
+
+            if not completed:
+                break
+
+        if replayed:
+            self.logger.info(f"🔁 스풀 재전송: {replayed}건")
+        return replayed
+
+    def _replay_segment(self, seq: int, offset: int,
+                        sender: Callable[[str, Any], bool]) -> Tuple[bool, int, int]:
+        """세그먼트 하나 재전송 → (완료 여부, 다음 오프셋, 재전송 건수)"""
+        count = 0
+        try:
+            with open(self._segment_path(seq), 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if self._stop_event.is_set():
+                        return False, offset, count
+                    if not line.endswith(b"\n"):
+                        # 비정상 종료로 잘린 마지막 줄
+                        self.corrupt_batches += 1
+                        offset += len(line)
+                        continue
+
+                    try:
+                        record = self.codec.loads(line)
+                    except ValueError:
+                        self.corrupt_batches += 1
+                        offset += len(line)
+                        continue
+
+                    if not sender(record["endpoint"], record["data"]):
+                        return False, offset, count
+
+                    offset += len(line)
+                    count += 1
+                    with self._lock:
+                        self.replayed_batches += 1
+                        data = record["data"]
+                        self.replayed_records += len(data) if isinstance(data, list) else 1
+                        if self._segments[:1] == [seq]:
+                            self._cursor = (seq, offset)
+                            if count % self.cursor_sync_records == 0:
+                                self._write_cursor()
+        except FileNotFoundError:
+            pass
+
+        return True, offset, count
+
+    def start(self, sender: Callable[[str, Any], bool], health_check: Callable[[], bool]):
+        """백그라운드 재전송 스레드 시작"""
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._replay_loop,
+            args=(sender, health_check),
+            name="spool-replayer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """재전송 중지 및 파일 닫기"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.replay_interval + 5)
+            self._thread = None
+
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+                self._active_seq = None
+            self._write_cursor()
+
+    def _replay_loop(self, sender: Callable[[str, Any], bool], health_check: Callable[[], bool]):
+        while not self._stop_event.wait(self.replay_interval):
+            try:
+                if self.pending_bytes() > 0 and health_check():
+                    self.replay_once(sender)
+            except Exception as e:
+                self.logger.error(f"스풀 재전송 오류: {e}")
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+    def pending_bytes(self) -> int:
+        """재전송 대기 중인 바이트 수"""
+        with self._lock:
+            total = sum(self._sizes.values())
+            if self._cursor[0] in self._sizes:
+                total -= self._cursor[1]
+            return max(0, total)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """스풀 통계 반환"""
+        pending = self.pending_bytes()
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "pending_bytes": pending,
+                "max_bytes": self.max_bytes,
+                "spooled_batches": self.spooled_batches,
+                "spooled_records": self.spooled_records,
+                "replayed_batches": self.replayed_batches,
+                "replayed_records": self.replayed_records,
+                "dropped_batches": self.dropped_batches,
+                "corrupt_batches": self.corrupt_batches
+            }
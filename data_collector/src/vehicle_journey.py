@@ -0,0 +1,275 @@
+"""
+차량 journey 인덱스
+텔레메트리의 rfid.vehicle_id / tracking.current_station으로 차량별 스테이션 진입·진출을 기록하고
+리드 타임, 스테이션별 체류 시간, 재공(WIP) 수를 증분 계산
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .models.message import MQTTMessage
+from .quantile_sketch import TDigest
+
+# 시뮬레이터 마지막 공정 (mosquitto_MQTT/assembly/assembly_simulator.py)
+DEFAULT_FINAL_STATIONS = ("D03_WATER_LEAK_TEST",)
+# 마지막 공정 텔레메트리의 vehicle_position.next_station 값
+COMPLETE_MARKER = "COMPLETE"
+
+
+class _Journey:
+    """추적 중인 차량 1대"""
+
+    __slots__ = ("vehicle_id", "model", "first_seen", "last_seen", "last_arrival",
+                 "station_id", "entered_at", "visits", "final")
+
+    def __init__(self, vehicle_id: str, model: Optional[str], station_id: str, at: float, arrival: float,
+                 final: bool = False):
+        self.vehicle_id = vehicle_id
+        self.model = model
+        self.first_seen = at
+        self.last_seen = at
+        self.last_arrival = arrival
+        self.station_id = station_id
+        self.entered_at = at
+        # 지나온 스테이션 [station_id, 진입, 진출] (스테이션 수 이하)
+        self.visits: List[list] = []
+        # 현재 스테이션이 마지막 공정인지 (여기서 관측이 끊기면 완료)
+        self.final = final
+
+    def to_record(self, status: str) -> Dict[str, Any]:
+        visits = self.visits + [[self.station_id, self.entered_at, self.last_seen]]
+        return {
+            "vehicle_id": self.vehicle_id,
+            "model": self.model,
+            "status": status,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "lead_time": round(self.last_seen - self.first_seen, 1),
+            "visits": [{"station_id": station_id, "entered_at": entered_at, "exited_at": exited_at,
+                        "dwell": round(exited_at - entered_at, 1)}
+                       for station_id, entered_at, exited_at in visits]
+        }
+
+
+class _DurationStats:
+    """체류/리드 타임 누적 (건수, 합계, 분위수 스케치)"""
+
+    __slots__ = ("count", "total", "sketch")
+
+    def __init__(self, compression: float):
+        self.count = 0
+        self.total = 0.0
+        self.sketch = TDigest(compression)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.sketch.add(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        result = self.sketch.summary()
+        result["average"] = round(self.total / self.count, 1) if self.count else 0
+        return result
+
+
+class VehicleJourneyIndex:
+    """vehicle_id별 스테이션 이동 추적 (메모리 상한 있음)
+
+    - observe: 텔레메트리 1건 반영 - 스테이션이 바뀌면 이전 스테이션 체류 확정 (O(1))
+    - 진출 시각은 해당 스테이션에서 마지막으로 관측된 이벤트 시각, 스테이션 간 이동 시간은 리드 타임에만 포함
+    - 마지막 공정(final_stations 또는 vehicle_position.next_station == "COMPLETE")에서
+      exit_timeout 동안 관측이 없으면 완료 → 리드 타임 = 마지막 관측 - 최초 관측
+    - 그 외 스테이션에서 끊긴 차량과 max_active 초과분(가장 오래 관측 안 된 차량)은 미완료로 내보냄
+    - 내보낸 journey는 on_evict(record)로 전달 (JourneyStore 등), 메모리에는 추적 중인 차량만 유지
+    """
+
+    def __init__(self, on_evict: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 final_stations: Iterable[str] = DEFAULT_FINAL_STATIONS, exit_timeout: float = 600.0,
+                 max_active: int = 20000, sweep_interval: float = 30.0, compression: float = 100.0):
+        self.on_evict = on_evict
+        self.final_stations = set(final_stations)
+        self.exit_timeout = float(exit_timeout)
+        self.max_active = max(1, int(max_active))
+        self.sweep_interval = float(sweep_interval)
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+
+        # 최근 관측 순서 유지 (맨 앞이 가장 오래 관측 안 된 차량)
+        self._active: "OrderedDict[str, _Journey]" = OrderedDict()
+        self._wip: Dict[str, int] = {}
+        self._lead_time = _DurationStats(compression)
+        self._lead_time_by_model: Dict[str, _DurationStats] = {}
+        self._dwell: Dict[str, _DurationStats] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 통계
+        self.observed_count = 0
+        self.completed_count = 0
+        self.incomplete_count = 0
+        self.out_of_order_count = 0
+
+    def observe(self, message: MQTTMessage):
+        """텔레메트리 1건 반영 (rfid.vehicle_id가 없으면 무시)"""
+        data = message.data
+        rfid = data.get("rfid")
+        if not isinstance(rfid, dict) or not rfid.get("vehicle_id"):
+            return
+        vehicle_id = rfid["vehicle_id"]
+        tracking = data.get("tracking")
+        station_id = (tracking.get("current_station") if isinstance(tracking, dict) else None) or message.station_id
+        position = data.get("vehicle_position")
+        final = station_id in self.final_stations or (
+            isinstance(position, dict) and position.get("next_station") == COMPLETE_MARKER)
+        at = message.event_time
+
+        evicted = []
+        with self._lock:
+            self.observed_count += 1
+            journey = self._active.get(vehicle_id)
+            if journey is None:
+                journey = _Journey(vehicle_id, rfid.get("model"), station_id, at, message.received_at, final)
+                self._active[vehicle_id] = journey
+                self._wip[station_id] = self._wip.get(station_id, 0) + 1
+                while len(self._active) > self.max_active:
+                    evicted.append(self._evict_oldest())
+            elif at < journey.last_seen:
+                # 지연 도착: 이미 지난 시각의 관측은 이동 판단에 쓰지 않음
+                self.out_of_order_count += 1
+                journey.last_arrival = message.received_at
+                self._active.move_to_end(vehicle_id)
+            else:
+                if station_id != journey.station_id:
+                    self._leave_station(journey)
+                    journey.station_id = station_id
+                    journey.entered_at = at
+                    self._wip[station_id] = self._wip.get(station_id, 0) + 1
+                journey.final = final
+                journey.last_seen = at
+                journey.last_arrival = message.received_at
+                self._active.move_to_end(vehicle_id)
+
+        self._emit(evicted)
+
+    def _leave_station(self, journey: _Journey):
+        """다음 스테이션으로 이동 - 현재 스테이션 체류 확정 (lock 보유 상태에서 호출)"""
+        journey.visits.append([journey.station_id, journey.entered_at, journey.last_seen])
+        self._release(journey, record_dwell=True)
+
+    def _release(self, journey: _Journey, record_dwell: bool):
+        """현재 스테이션 WIP 차감 및 체류 시간 반영 (lock 보유 상태에서 호출)"""
+        station_id = journey.station_id
+        self._wip[station_id] -= 1
+        if not record_dwell:
+            return
+        dwell = self._dwell.get(station_id)
+        if dwell is None:
+            dwell = self._dwell[station_id] = _DurationStats(self.compression)
+        dwell.add(journey.last_seen - journey.entered_at)
+
+    def _finish(self, journey: _Journey, completed: bool) -> Dict[str, Any]:
+        """추적 종료 - 완료 차량만 마지막 스테이션 체류와 리드 타임 반영 (lock 보유 상태에서 호출)
+
+        미완료 차량은 현재 스테이션 체류가 중간에 끊긴 값이므로 통계에 넣지 않는다.
+        """
+        self._release(journey, record_dwell=completed)
+        if completed:
+            lead_time = journey.last_seen - journey.first_seen
+            self._lead_time.add(lead_time)
+            if journey.model:
+                stats = self._lead_time_by_model.get(journey.model)
+                if stats is None:
+                    stats = self._lead_time_by_model[journey.model] = _DurationStats(self.compression)
+                stats.add(lead_time)
+            self.completed_count += 1
+        else:
+            self.incomplete_count += 1
+        return journey.to_record("completed" if completed else "incomplete")
+
+    def _evict_oldest(self) -> Dict[str, Any]:
+        _, journey = self._active.popitem(last=False)
+        return self._finish(journey, journey.final)
+
+    def flush_idle(self, now: Optional[float] = None) -> int:
+        """exit_timeout 동안 관측이 없는 차량 내보내기 - 내보낸 수 반환"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.exit_timeout
+        evicted = []
+        with self._lock:
+            # 관측 순서대로 정렬되어 있으므로 앞에서부터 만료 차량만 확인
+            while self._active:
+                journey = next(iter(self._active.values()))
+                if journey.last_arrival > cutoff:
+                    break
+                del self._active[journey.vehicle_id]
+                evicted.append(self._finish(journey, journey.final))
+        self._emit(evicted)
+        return len(evicted)
+
+    def _emit(self, records: List[Dict[str, Any]]):
+        if self.on_evict is None:
+            return
+        for record in records:
+            self.on_evict(record)
+
+    def get_vehicle(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        """추적 중인 차량의 현재 journey (없으면 None)"""
+        with self._lock:
+            journey = self._active.get(vehicle_id)
+            return journey.to_record("active") if journey is not None else None
+
+    def get_wip(self) -> Dict[str, int]:
+        """스테이션별 재공 차량 수"""
+        with self._lock:
+            return {station_id: count for station_id, count in sorted(self._wip.items()) if count > 0}
+
+    def get_flow_kpis(self) -> Dict[str, Any]:
+        """리드 타임 / 스테이션 체류 시간 / WIP 요약"""
+        with self._lock:
+            return {
+                "active_vehicles": len(self._active),
+                "wip": {station_id: count for station_id, count in sorted(self._wip.items()) if count > 0},
+                "lead_time": self._lead_time.summary(),
+                "lead_time_by_model": {model: stats.summary()
+                                       for model, stats in sorted(self._lead_time_by_model.items())},
+                "dwell": {station_id: stats.summary() for station_id, stats in sorted(self._dwell.items())}
+            }
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sweep_loop, name="vehicle-journey", daemon=True)
+        self._thread.start()
+        self.logger.info(f"🚗 차량 journey 추적: 완료 스테이션 {sorted(self.final_stations)}, "
+                         f"진출 판정 {self.exit_timeout}초")
+
+    def stop(self):
+        """스레드 종료 (추적 중인 차량은 미완료 상태로 남겨 둠)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.sweep_interval)
+            self._thread = None
+
+    def _sweep_loop(self):
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.flush_idle()
+            except Exception as e:
+                self.logger.error(f"차량 journey 정리 오류: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active = len(self._active)
+        return {
+            "active_vehicles": active,
+            "observed_count": self.observed_count,
+            "completed_count": self.completed_count,
+            "incomplete_count": self.incomplete_count,
+            "out_of_order_count": self.out_of_order_count
+        }
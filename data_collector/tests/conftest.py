@@ -0,0 +1,32 @@
+"""
+data_collector 테스트 공용 설정
+data_collector 디렉토리에서 실행: python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+COLLECTOR_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COLLECTOR_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTOR_ROOT)
+
+from src.models.message import MQTTMessage  # noqa: E402
+
+
+@pytest.fixture
+def make_message():
+    """factory/{station_id}/{data_type} 메시지 생성기"""
+    def _make(station_id: str = "A01_DOOR", data_type: str = "status", data=None,
+              received_at: float = None) -> MQTTMessage:
+        kwargs = {} if received_at is None else {"received_at": received_at}
+        return MQTTMessage(
+            topic=f"factory/{station_id}/{data_type}",
+            topic_parts=("factory", station_id, data_type),
+            station_id=station_id,
+            data_type=data_type,
+            data=dict(data or {}),
+            **kwargs
+        )
+    return _make
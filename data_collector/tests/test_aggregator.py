@@ -0,0 +1,41 @@
+"""TelemetryAggregator: 윈도우 롤업과 지연 샘플 처리"""
+
+from src.aggregator import TelemetryAggregator
+
+BASE = 1_800_000_000.0
+
+
+def _telemetry(make_message, at, torque, station_id="A01_DOOR"):
+    return make_message(station_id, "telemetry",
+                        {"timestamp": at, "sensors": {"torque_sensor": {"value": torque}}})
+
+
+def test_rollup_emitted_when_next_window_starts(make_message):
+    rollups = []
+    aggregator = TelemetryAggregator(rollups.append, window_seconds=10)
+    for offset, torque in ((1, 10.0), (5, 14.0), (12, 20.0)):
+        aggregator.add(_telemetry(make_message, BASE + offset, torque))
+
+    assert len(rollups) == 1
+    assert rollups[0]["sampleCount"] == 2
+    assert rollups[0]["metrics"]["sensors.torque_sensor.value"] == {
+        "min": 10.0, "max": 14.0, "mean": 12.0, "last": 14.0, "count": 2}
+
+
+def test_late_sample_is_dropped_not_merged(make_message):
+    rollups = []
+    aggregator = TelemetryAggregator(rollups.append, window_seconds=10)
+    aggregator.add(_telemetry(make_message, BASE + 1, 10.0))
+    aggregator.add(_telemetry(make_message, BASE + 12, 20.0))
+    # 방출된 첫 윈도우의 지연 샘플 - 현재 윈도우 값을 오염시키지 않음
+    aggregator.add(_telemetry(make_message, BASE + 3, 999.0))
+    aggregator.flush_all()
+
+    assert [rollup["sampleCount"] for rollup in rollups] == [1, 1]
+    assert rollups[1]["metrics"]["sensors.torque_sensor.value"]["max"] == 20.0
+    assert aggregator.get_stats()["late_samples"] == 1
+
+    # 만료로 방출된 윈도우도 다시 열리지 않음
+    aggregator.add(_telemetry(make_message, BASE + 15, 30.0))
+    assert aggregator.get_stats()["late_samples"] == 2
+    assert len(rollups) == 2
@@ -0,0 +1,115 @@
+import pytest
+
+from src.api_client import APIClient, SEND_DEFERRED, SEND_DROPPED, SEND_OK
+
+
+def _config(tmp_path, spool: bool = True, retry_count: int = 3, failure_threshold: int = 5):
+    return {
+        "api": {
+            "backend_url": "http://backend.invalid",
+            "endpoints": {"iot_data": "/api/iot-data", "kpi_data": "/api/kpi/data"},
+            "timeout": 1,
+            "retry_count": retry_count,
+            "circuit_breaker": {"failure_threshold": failure_threshold, "reset_timeout": 60}
+        },
+        "spool": {"enabled": spool, "directory": str(tmp_path / "spool")},
+        "processing": {"json_codec": "json"}
+    }
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    clients = []
+
+    def _make(responses, **kwargs):
+        client = APIClient(_config(tmp_path, **kwargs))
+        outcomes = list(responses)
+        client.posts = []
+
+        def fake_post(endpoint, data, attempt=0):
+            client.posts.append((endpoint, attempt))
+            return outcomes.pop(0) if outcomes else False
+
+        client._post = fake_post
+        clients.append(client)
+        return client
+
+    yield _make
+    for client in clients:
+        client.close()
+
+
+def test_success_is_sent(make_client):
+    client = make_client([True])
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_OK
+    assert client.get_stats()["sent_count"] == 1
+
+
+def test_failure_with_retries_left_is_deferred(make_client):
+    client = make_client([False])
+    client.retry_scheduler.start()
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_DEFERRED
+    stats = client.get_stats()
+    assert stats["retried_count"] == 1
+    assert stats["retries"]["pending"] == 1
+    assert stats["dropped_count"] == 0
+
+
+def test_last_attempt_failure_is_spooled(make_client):
+    client = make_client([False], retry_count=1)
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_DEFERRED
+    stats = client.get_stats()
+    assert stats["spooled_count"] == 1
+    assert stats["spool"]["spooled_batches"] == 1
+
+
+def test_failure_without_spool_is_dropped(make_client):
+    client = make_client([False], retry_count=1, spool=False)
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_DROPPED
+    assert client.get_stats()["dropped_count"] == 1
+
+
+def test_unscheduled_retry_falls_back_to_spool(make_client):
+    # 스케줄러가 실행 중이 아니면 예약이 거부되고 on_cancel에서 스풀
+    client = make_client([False])
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_DEFERRED
+    assert client.get_stats()["spooled_count"] == 1
+
+
+def test_open_circuit_spools_without_request(make_client):
+    client = make_client([False, False], retry_count=1, failure_threshold=2)
+    client.send_kpi_data({"n": 1})
+    client.send_kpi_data({"n": 2})
+    assert client.breakers["/api/kpi/data"].state == "open"
+
+    posts = len(client.posts)
+    assert client.send_kpi_data({"n": 3}) == SEND_DEFERRED
+    assert len(client.posts) == posts
+    assert client.get_stats()["spooled_count"] == 3
+
+
+def test_ack_handler_sees_first_try_retry_and_spool_replay(make_client):
+    client = make_client([True, False, True, False, True], retry_count=2)
+    # 재시도를 타이머 대기 없이 바로 실행
+    client.retry_scheduler.schedule = lambda delay, task, on_cancel=None: task() or True
+    acked = []
+    client.add_ack_handler(client.endpoint("iot_data_batch"), acked.append)
+
+    assert client.send_iot_data_batch([{"n": 1}]) == SEND_OK
+    assert client.send_iot_data_batch([{"n": 2}]) == SEND_DEFERRED  # 1회 실패 후 재시도 성공
+    client._spool(client.endpoint("iot_data_batch"), [{"n": 3}])
+    client.spool.replay_once(client._replay_data)  # 재전송 1회 실패
+    client.spool.replay_once(client._replay_data)
+
+    assert acked == [[{"n": 1}], [{"n": 2}], [{"n": 3}]]
+
+
+def test_ack_handler_is_per_endpoint_and_isolated(make_client):
+    client = make_client([True, True])
+    acked = []
+    client.add_ack_handler("/api/kpi/data", lambda data: 1 / 0)  # 콜백 오류가 전송 결과에 영향 없음
+    client.add_ack_handler("/api/iot-data", acked.append)
+
+    assert client.send_kpi_data({"station_id": "A01_DOOR"}) == SEND_OK
+    assert client.send_iot_data({"stationId": "A01_DOOR"}) == SEND_OK
+    assert acked == [{"stationId": "A01_DOOR"}]
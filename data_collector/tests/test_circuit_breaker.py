@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from src import circuit_breaker
+from src.circuit_breaker import CircuitBreaker
+from src.retry_scheduler import RetryScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("/api/kpi/data", failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # 성공하면 연속 실패 초기화
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_stats()["rejected_count"] == 1
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker("/api/kpi/data", failure_threshold=2, reset_timeout=30)
+    _open(breaker)
+
+    clock[0] += 29.9
+    assert not breaker.allow_request()
+    clock[0] += 0.1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # 시험 요청 진행 중에는 추가 요청 거부
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker("/api/kpi/data", failure_threshold=2, reset_timeout=30)
+    _open(breaker)
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("/api/kpi/data", failure_threshold=2, reset_timeout=30)
+    _open(breaker)
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_stats()["open_count"] == 2
+
+    clock[0] += 29
+    assert not breaker.allow_request()
+    clock[0] += 1
+    assert breaker.allow_request()
+
+
+def test_scheduler_runs_tasks_in_due_order():
+    scheduler = RetryScheduler()
+    scheduler.start()
+    done = []
+    finished = threading.Event()
+    scheduler.schedule(0.05, lambda: done.append("late") or finished.set())
+    scheduler.schedule(0.0, lambda: done.append("early"))
+    assert finished.wait(2)
+    scheduler.stop()
+    assert done == ["early", "late"]
+
+
+def test_scheduler_overflow_and_stop_cancel_pending():
+    scheduler = RetryScheduler(max_pending=1)
+    scheduler.start()
+    cancelled = []
+    assert scheduler.schedule(60, lambda: None, on_cancel=lambda: cancelled.append("first"))
+    assert not scheduler.schedule(60, lambda: None, on_cancel=lambda: cancelled.append("overflow"))
+    assert cancelled == ["overflow"]
+
+    scheduler.stop()
+    assert cancelled == ["overflow", "first"]
+    assert scheduler.get_stats()["overflow_count"] == 1
@@ -0,0 +1,108 @@
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from src.codec import JSONCodec, available_codecs, get_codec
+
+CODECS = available_codecs()
+
+PAYLOAD = {
+    "station_id": "A01_DOOR",
+    "station_status": "RUNNING",
+    "defect_type": "도어 단차 불량",
+    "sensors": {"torque": [12.5, 13.0], "ok": True, "missing": None},
+    "production_count": 42
+}
+
+
+@pytest.fixture(params=CODECS)
+def codec(request):
+    return get_codec(request.param)
+
+
+def test_round_trip_keeps_korean_text_unescaped(codec):
+    encoded = codec.dumps(PAYLOAD)
+    assert isinstance(encoded, bytes)
+    assert "도어 단차 불량".encode("utf-8") in encoded
+    assert codec.loads(encoded) == PAYLOAD
+
+
+def test_loads_accepts_bytes_and_str(codec):
+    text = JSONCodec().dumps(PAYLOAD).decode("utf-8")
+    assert codec.loads(text) == PAYLOAD
+    assert codec.loads(text.encode("utf-8")) == PAYLOAD
+
+
+def test_output_matches_stdlib_fallback(codec):
+    # 바이트 단위가 아니라 파싱 결과가 같으면 됨 (키 순서/공백은 구현마다 다를 수 있음)
+    assert JSONCodec().loads(codec.dumps(PAYLOAD)) == JSONCodec().loads(JSONCodec().dumps(PAYLOAD))
+
+
+def test_non_finite_floats_become_null(codec):
+    encoded = codec.dumps({"a": float("nan"), "b": [1.5, float("inf")], "c": {"d": -math.inf}})
+    assert codec.loads(encoded) == {"a": None, "b": [1.5, None], "c": {"d": None}}
+
+
+def test_non_finite_literals_are_rejected(codec):
+    with pytest.raises(ValueError):
+        codec.loads('{"value": NaN}')
+
+
+def test_datetime_serialized_as_isoformat(codec):
+    naive = datetime(2024, 5, 1, 8, 30, 15, 123456)
+    aware = datetime(2024, 5, 1, 8, 30, 15, tzinfo=timezone.utc)
+    assert codec.loads(codec.dumps({"naive": naive, "aware": aware})) == {
+        "naive": naive.isoformat(),
+        "aware": aware.isoformat()
+    }
+
+
+def test_default_handles_unknown_types(codec):
+    class Station:
+        def __init__(self):
+            self.station_id = "B03_MUFFLER"
+
+    codec = get_codec(codec.name, default=lambda obj: obj.__dict__)
+    assert codec.loads(codec.dumps({"station": Station()})) == {"station": {"station_id": "B03_MUFFLER"}}
+
+
+def test_unknown_type_without_default_raises(codec):
+    with pytest.raises(TypeError):
+        codec.dumps({"value": object()})
+
+
+def test_unknown_codec_name_falls_back():
+    assert get_codec("simdjson").name in CODECS
+    assert get_codec("json").name == "json"
+
+
+def test_non_str_keys_match_stdlib(codec):
+    payload = {1: "one", 2.5: "half", None: "none", True: "yes", "nested": {7: [1, 2]}}
+    assert codec.loads(codec.dumps(payload)) == JSONCodec().loads(JSONCodec().dumps(payload)) == {
+        "1": "yes", "2.5": "half", "null": "none", "nested": {"7": [1, 2]}}
+
+
+def test_numpy_values_serialized_as_numbers(codec):
+    np = pytest.importorskip("numpy")
+    payload = {"f64": np.float64(1.5), "f32": np.float32(2.5), "i64": np.int64(3), "flag": np.bool_(True),
+               "nan": np.float32("nan"), "array": np.array([1.0, np.nan])}
+    assert codec.loads(codec.dumps(payload)) == {
+        "f64": 1.5, "f32": 2.5, "i64": 3, "flag": True, "nan": None, "array": [1.0, None]}
+
+
+def test_integer_beyond_64_bits_falls_back(codec):
+    assert codec.loads(codec.dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
+
+
+def test_simulator_codec_matches_collector_codec():
+    np = pytest.importorskip("numpy")
+    from benchmarks.station_payloads import STATION_CLASSES  # noqa: F401 (시뮬레이터 경로 등록)
+    from mosquitto_MQTT.utils import json_codec as simulator
+
+    payload = dict(PAYLOAD, at=datetime(2024, 5, 1, 8, 30), torque=np.float64(12.5), counts={1: np.int64(2)},
+                   nan=float("nan"))
+    for name in CODECS:
+        assert simulator.get_codec(name).name == name
+        assert simulator.get_codec(name).loads(simulator.get_codec(name).dumps(payload)) == \
+            get_codec(name).loads(get_codec(name).dumps(payload))
@@ -0,0 +1,56 @@
+"""DefectStats: Space-Saving 상위 유형과 시간 버킷 크기 상한"""
+
+import random
+
+from src.defect_stats import OTHER, DefectStats
+
+BASE = 1_800_000_000 - 1_800_000_000 % 3600
+
+
+def test_exact_counts_within_capacity():
+    stats = DefectStats(capacity=4)
+    for name in ["scratch", "dent", "scratch", "gap", "scratch", "dent"]:
+        stats.add([name], BASE)
+    assert stats.top(2) == [{"type": "scratch", "count": 3, "error": 0},
+                            {"type": "dent", "count": 2, "error": 0}]
+    assert stats.recent(3600, BASE + 1) == {"scratch": 3, "dent": 2, "gap": 1}
+
+
+def test_bucket_keys_bounded_by_capacity():
+    stats = DefectStats(capacity=4, bucket_seconds=3600, bucket_count=24)
+    rng = random.Random(3)
+    for n in range(5000):
+        # 빈번한 유형 2개 + 1000가지 드문 유형
+        name = rng.choice(["scratch", "dent", f"rare_{rng.randrange(1000)}"])
+        stats.add([name], BASE + n % 7200)
+
+    assert len(stats._counts) <= 4
+    for _, counts in stats._buckets:
+        assert len(counts) <= stats.capacity + 1
+        assert OTHER in counts
+    recent = stats.recent(7200, BASE + 7199)
+    assert sum(recent.values()) == 5000
+    assert {entry["type"] for entry in stats.top(2)} == {"scratch", "dent"}
+
+
+def test_state_round_trip():
+    stats = DefectStats(capacity=4)
+    for n in range(20):
+        stats.add([f"type_{n % 6}", "scratch"], BASE + n * 600)
+    restored = DefectStats.from_state(stats.to_state(), capacity=4)
+    assert restored.to_dict() == stats.to_dict()
+    assert restored.recent(86400, BASE + 20 * 600) == stats.recent(86400, BASE + 20 * 600)
+
+
+def test_top_is_cached_until_next_add():
+    stats = DefectStats(capacity=4)
+    stats.add(["scratch", "dent", "scratch"], BASE)
+    first = stats.top(2)
+    cached = stats._top
+    first[0]["count"] = 999  # 반환값을 바꿔도 캐시는 그대로
+    assert stats.top(2) == [{"type": "scratch", "count": 2, "error": 0}, {"type": "dent", "count": 1, "error": 0}]
+    assert stats._top is cached
+    assert stats.pareto(2)[-1]["cumulative_percent"] == 100.0
+
+    stats.add(["dent", "dent"], BASE)
+    assert stats.top(1) == [{"type": "dent", "count": 3, "error": 0}]
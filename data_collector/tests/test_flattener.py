@@ -0,0 +1,93 @@
+"""PayloadFlattener: 컴파일된 추출 함수가 일반 순회(flatten_numeric)와 같은 결과를 내는지"""
+
+import pytest
+
+from src.flattener import PayloadFlattener, flatten_numeric
+from src.influx_sink import FIELD_SOURCES, to_line_protocol
+
+
+def generic(data, fields=None):
+    out = {}
+    if fields is None:
+        flatten_numeric(data, "", out)
+    else:
+        for field in fields:
+            flatten_numeric(data.get(field), field, out)
+    return out
+
+
+def check_sequence(payloads, fields=None):
+    """같은 키로 payload를 차례로 평탄화하며 매번 일반 순회와 비교"""
+    flattener = PayloadFlattener(fields)
+    for payload in payloads:
+        assert flattener.flatten("A01_DOOR", payload) == generic(payload, fields)
+    return flattener
+
+
+def test_nested_payload():
+    payload = {"sensors": {"torque": {"value": 12, "unit": "Nm"}, "speed": 1.5},
+               "production": {"count": 3}}
+    flattener = check_sequence([payload, payload])
+    assert flattener.flatten("A01_DOOR", payload) == {
+        "sensors.torque.value": 12.0, "sensors.speed": 1.5, "production.count": 3.0}
+    assert flattener.get_stats()["compiled_count"] == 1
+
+
+def test_lists_and_non_numeric_values_ignored():
+    payload = {"readings": [1, 2, 3], "status": "RUNNING", "note": None, "ok": True, "value": 4}
+    check_sequence([payload, dict(payload, readings=[4, 5])])
+
+
+def test_missing_and_added_keys():
+    base = {"sensors": {"torque": 1.0, "speed": 2.0}}
+    check_sequence([base, {"sensors": {"torque": 1.0}}, {"sensors": {"torque": 1.0, "temp": 3.0}},
+                    {"sensors": {}}, {}, base])
+
+
+@pytest.mark.parametrize("changed", [True, False, "12.5", None, [1.0], {"value": 3.0}])
+def test_number_leaf_type_change(changed):
+    base = {"sensors": {"torque": 12.5, "speed": 1.0}}
+    flattener = check_sequence([base, {"sensors": {"torque": changed, "speed": 1.0}}, base])
+    result = flattener.flatten("A01_DOOR", {"sensors": {"torque": changed, "speed": 1.0}})
+    if not isinstance(changed, dict):
+        assert "sensors.torque" not in result
+
+
+@pytest.mark.parametrize("original", [True, "12.5", None, [1.0]])
+def test_non_numeric_leaf_becomes_number(original):
+    base = {"sensors": {"torque": original, "speed": 1.0}}
+    check_sequence([base, {"sensors": {"torque": 12.5, "speed": 1.0}},
+                    {"sensors": {"torque": {"value": 2.0}, "speed": 1.0}}, base])
+
+
+def test_selected_fields_type_changes():
+    fields = ("sensors", "quality")
+    check_sequence([
+        {"sensors": None, "other": 1},
+        {"sensors": {"torque": 1.0}, "other": 1},
+        {"sensors": 5, "quality": {"score": 0.9}},
+        {"sensors": False, "quality": {"score": True}},
+        {"other": 2},
+    ], fields)
+
+
+def test_non_string_keys_use_generic_path():
+    payload = {"sensors": {1: 2.0, "quote'\"key": 3.0, "def f(): pass": 4.0}}
+    flattener = check_sequence([payload, payload])
+    assert flattener.get_stats()["fallback_count"] == 2
+
+
+def test_string_keys_with_quotes_compiled():
+    payload = {"sensors": {"quote'\"key": 3.0, "__import__('os')": 4.0}}
+    flattener = check_sequence([payload, payload])
+    assert flattener.get_stats()["compiled_count"] == 1
+
+
+def test_influx_line_matches_generic_after_type_change():
+    flattener = PayloadFlattener(FIELD_SOURCES)
+    base = {"stationId": "A01_DOOR", "dataType": "status",
+            "sensors": {"torque": 12.5, "door_closed": 1}}
+    changed = dict(base, sensors={"torque": 12.5, "door_closed": True})
+    for record in (base, changed, base):
+        assert to_line_protocol(record, flattener=flattener) == to_line_protocol(record)
+    assert "door_closed" not in to_line_protocol(changed, flattener=flattener)
@@ -0,0 +1,147 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.history_store import HistoryStore
+
+
+def _store(tmp_path, **kwargs):
+    return HistoryStore(directory=str(tmp_path / "history"), retention_days=0, **kwargs)
+
+
+def _status(make_message, station_id, count, at, received_at):
+    return make_message(station_id, "status",
+                        {"timestamp": datetime.fromtimestamp(at).isoformat(), "production_count": count},
+                        received_at=received_at)
+
+
+def test_iter_since_replays_in_receive_order(tmp_path, make_message):
+    store = _store(tmp_path)
+    now = time.time()
+    for n in range(6):
+        store.add(_status(make_message, "A01_DOOR" if n % 2 else "B03_MUFFLER", n, now + n, now + n))
+    store.add(make_message("A01_DOOR", "telemetry", {"timestamp": now}, received_at=now + 10))
+    store.flush()
+
+    replayed = list(store.iter_since(now + 1.5, ["status", "quality"]))
+    assert [message.data["production_count"] for message in replayed] == [2, 3, 4, 5]
+    assert all(message.data_type == "status" for message in replayed)
+    assert replayed[0].event_time == pytest.approx(replayed[0].received_at, abs=1e-5)
+    store.stop()
+
+
+def test_iter_since_uses_received_at_index(tmp_path, make_message):
+    store = _store(tmp_path)
+    store.add(_status(make_message, "A01_DOOR", 1, time.time(), time.time()))
+    store.stop()
+
+    path = str(tmp_path / "history" / f"history_{datetime.now().date().isoformat()}.db")
+    connection = sqlite3.connect(path)
+    plan = " ".join(row[-1] for row in connection.execute(
+        "EXPLAIN QUERY PLAN SELECT station_id FROM messages WHERE received_at > ? ORDER BY received_at, rowid",
+        (0,)))
+    connection.close()
+    assert "idx_messages_received_at" in plan
+
+
+def test_index_is_added_to_existing_files(tmp_path, make_message):
+    directory = tmp_path / "history"
+    directory.mkdir()
+    path = str(directory / f"history_{datetime.now().date().isoformat()}.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE messages (station_id TEXT NOT NULL, data_type TEXT NOT NULL, "
+                       "ts REAL NOT NULL, received_at REAL NOT NULL, payload BLOB NOT NULL)")
+    connection.commit()
+    connection.close()
+
+    assert list(_store(tmp_path).iter_since(0)) == []
+    connection = sqlite3.connect(path)
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list(messages)")}
+    connection.close()
+    assert "idx_messages_received_at" in indexes
+
+
+def test_concurrent_writers_share_directory(tmp_path, make_message):
+    # 멀티 프로세스 워커처럼 저장소 인스턴스(연결)가 따로인 기록자들
+    stores = [_store(tmp_path, batch_size=1) for _ in range(4)]
+    now = time.time()
+    errors = []
+
+    def write(index, store):
+        try:
+            for n in range(50):
+                store.add(_status(make_message, f"S{index}", n, now, now + n))
+        except Exception as e:  # pragma: no cover - 실패 시 메시지 확인용
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(index, store)) for index, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sum(store.get_stats()["failed_records"] for store in stores) == 0
+    assert len(list(stores[0].iter_since(0))) == 200
+    for store in stores:
+        store.stop()
+
+
+def test_summarize_counts_production_and_fty(tmp_path, make_message):
+    store = _store(tmp_path)
+    now = time.time()
+    for n, count in enumerate((10, 11, 13)):
+        store.add(_status(make_message, "A01_DOOR", count, now + n, now + n))
+    for n, passed in enumerate((True, True, False, True)):
+        store.add(make_message("A01_DOOR", "quality",
+                               {"timestamp": now + n, "passed": passed, "overall_score": 0.9},
+                               received_at=now + n))
+    store.flush()
+
+    summary = store.summarize("A01_DOOR", now - 1, now + 10)
+    assert summary["produced"] == 3
+    assert summary["inspections"] == 4
+    assert summary["fty"] == 0.75
+    assert summary["message_counts"] == {"status": 3, "quality": 4}
+    store.stop()
+
+
+def test_future_dated_message_does_not_delete_current_file(tmp_path, make_message):
+    store = _store(tmp_path, batch_size=1)
+    store.retention_days = 30
+    now = time.time()
+    store.add(_status(make_message, "A01_DOOR", 1, now, now))
+    # 시계가 틀어진 스테이션: 2030년 timestamp
+    future = datetime(2030, 1, 1).timestamp() + 86400 * 365
+    store.add(_status(make_message, "B03_MUFFLER", 2, future, now + 1))
+    store.flush()
+
+    assert store.list_days() == [datetime.now().date()]
+    assert store.get_stats()["clamped_count"] == 1
+    replayed = list(store.iter_since(now - 1))
+    assert [message.station_id for message in replayed] == ["A01_DOOR", "B03_MUFFLER"]
+    store.stop()
+
+
+def test_retention_uses_wall_clock_and_keeps_open_files(tmp_path, make_message):
+    store = _store(tmp_path, batch_size=1)
+    now = time.time()
+    old = now - 40 * 86400
+    # 보관 기간이 지난 날짜 파일이 열려 있는 동안에는 삭제하지 않음
+    store.add(_status(make_message, "A01_DOOR", 1, old, now))
+    store.retention_days = 30
+    store.add(_status(make_message, "A01_DOOR", 2, now, now))
+    assert len(store.list_days()) == 2
+
+    store._enforce_retention()
+    assert len(store.list_days()) == 2
+    with store._write_lock:
+        for connection in store._connections.values():
+            connection.close()
+        store._connections.clear()
+        store._enforce_retention()
+    assert store.list_days() == [datetime.now().date()]
+    store.stop()
@@ -0,0 +1,37 @@
+from src.influx_sink import to_line_protocol
+
+
+def _record(sensors, **extra):
+    record = {"stationId": "A01_DOOR", "dataType": "telemetry", "timestamp": "2024-05-01T08:00:00",
+              "sensors": sensors}
+    record.update(extra)
+    return record
+
+
+def _fields(line):
+    return dict(item.split("=", 1) for item in line.split(" ")[1].split(","))
+
+
+def test_fields_are_always_floats():
+    line = to_line_protocol(_record({"torque": 12, "speed": 1.5}))
+    assert _fields(line) == {"sensors.torque": "12.0", "sensors.speed": "1.5"}
+
+
+def test_non_finite_fields_are_skipped():
+    line = to_line_protocol(_record({"torque": float("nan"), "speed": float("inf"), "ok": 2.0}))
+    assert _fields(line) == {"sensors.ok": "2.0"}
+
+
+def test_record_with_only_non_finite_fields_is_skipped():
+    assert to_line_protocol(_record({"torque": float("nan")})) is None
+
+
+def test_bool_leaves_are_not_fields():
+    line = to_line_protocol(_record({"running": True, "torque": 3}))
+    assert _fields(line) == {"sensors.torque": "3.0"}
+
+
+def test_tags_and_timestamp():
+    line = to_line_protocol(_record({"torque": 1}, stationId="A 01,X"), measurement="station data")
+    assert line.startswith("station\\ data,station_id=A\\ 01\\,X,data_type=telemetry ")
+    assert int(line.rsplit(" ", 1)[-1]) > 0
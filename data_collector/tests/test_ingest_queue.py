@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from src.ingest_queue import IngestQueue, LaneQueue, POLICY_BLOCK, POLICY_DROP_OLDEST, _STOP
+
+
+def _block_lanes(capacity: int = 2):
+    return {
+        "status": {"priority": 0, "policy": POLICY_BLOCK, "capacity": capacity},
+        "default": {"priority": 2, "policy": POLICY_DROP_OLDEST, "capacity": capacity},
+    }
+
+
+def test_full_block_lane_gives_up_after_timeout(make_message):
+    shard = LaneQueue(_block_lanes(), shard_count=1, default_capacity=2)
+    assert shard.put(make_message(data={"n": 1}))
+    assert shard.put(make_message(data={"n": 2}))
+
+    started = time.monotonic()
+    assert not shard.put(make_message(data={"n": 3}), block_timeout=0.1)
+    elapsed = time.monotonic() - started
+
+    assert 0.09 <= elapsed < 1.0
+    lane = shard.lanes["status"]
+    assert lane.block_timeout_count == 1
+    assert lane.dropped_count == 1
+    assert len(lane) == 2
+
+
+def test_block_lane_accepts_when_worker_frees_space(make_message):
+    shard = LaneQueue(_block_lanes(capacity=1), shard_count=1, default_capacity=1)
+    assert shard.put(make_message(data={"n": 1}))
+
+    consumer = threading.Timer(0.05, shard.get)
+    consumer.start()
+    try:
+        assert shard.put(make_message(data={"n": 2}), block_timeout=2.0)
+    finally:
+        consumer.join()
+    assert shard.lanes["status"].block_timeout_count == 0
+
+
+def test_put_after_close_is_rejected(make_message):
+    shard = LaneQueue(_block_lanes(), shard_count=1, default_capacity=2)
+    shard.close()
+    assert not shard.put(make_message())
+    assert shard.get() is _STOP
+
+
+def test_submit_does_not_stall_receive_thread(make_message):
+    release = threading.Event()
+    queue = IngestQueue(lambda message: release.wait(), workers=1, capacity=1,
+                        lanes=_block_lanes(capacity=1), block_timeout=0.05)
+    queue.start()
+    try:
+        started = time.monotonic()
+        results = [queue.submit(make_message(data={"n": n})) for n in range(5)]
+        elapsed = time.monotonic() - started
+
+        # 워커가 1건 처리 중, 1건 적재, 나머지는 대기 초과로 폐기
+        assert results[:2] == [True, True]
+        assert not any(results[2:])
+        assert elapsed < 1.0
+        stats = queue.get_stats()
+        assert stats["block_timeout_count"] == 3
+        assert queue.rejected_count == 3
+    finally:
+        release.set()
+        queue.stop()
+
+
+def test_same_station_is_processed_in_order(make_message):
+    seen = []
+    queue = IngestQueue(lambda message: seen.append((message.station_id, message.data["n"])),
+                        workers=3, capacity=300, lanes=_block_lanes(capacity=300))
+    queue.start()
+    for n in range(50):
+        for station_id in ("A01_DOOR", "B03_MUFFLER", "C05_TIRE"):
+            assert queue.submit(make_message(station_id, data={"n": n}))
+    queue.stop()
+
+    for station_id in ("A01_DOOR", "B03_MUFFLER", "C05_TIRE"):
+        assert [n for seen_station, n in seen if seen_station == station_id] == list(range(50))
+    assert queue.get_stats()["processed_count"] == 150
+
+
+def test_block_timeout_hands_message_to_callback(make_message):
+    release = threading.Event()
+    saved = []
+    queue = IngestQueue(lambda message: release.wait(), workers=1, capacity=1,
+                        lanes=_block_lanes(capacity=1), block_timeout=0.05, on_block_timeout=saved.append)
+    queue.start()
+    try:
+        for n in range(4):
+            queue.submit(make_message(data={"n": n}))
+        assert [message.data["n"] for message in saved] == [2, 3]
+        stats = queue.get_stats()
+        assert (stats["overflow_count"], stats["lost_count"]) == (2, 0)
+    finally:
+        release.set()
+        queue.stop()
+
+
+def test_block_timeout_without_callback_logs_each_loss(make_message, caplog):
+    queue = IngestQueue(lambda message: None, workers=1, capacity=1,
+                        lanes=_block_lanes(capacity=1), block_timeout=0.01)
+    # 워커를 시작하지 않아 첫 건 이후는 모두 대기 초과
+    with caplog.at_level(logging.ERROR, logger="src.ingest_queue"):
+        for n in range(3):
+            queue.submit(make_message(data={"n": n}))
+    assert queue.lost_count == 2
+    assert len([record for record in caplog.records if "데이터 유실" in record.getMessage()]) == 2
+
+
+def test_lane_config_is_validated(caplog):
+    with pytest.raises(ValueError):
+        IngestQueue(print, lanes={"status": {"policy": "drop_newest"}})
+    with pytest.raises(ValueError):
+        IngestQueue(print, lanes={"status": {"policy": POLICY_BLOCK, "capacity": 0}})
+
+    with caplog.at_level(logging.WARNING, logger="src.ingest_queue"):
+        queue = IngestQueue(print, workers=4, capacity=100, lanes=_block_lanes(capacity=2))
+    # 용량이 샤드 수보다 작아도 샤드당 최소 1
+    assert all(shard.lanes["status"].capacity == 1 for shard in queue._queues)
+    assert any("status" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,120 @@
+"""KPICheckpointer 저장/복원과 복원 후 중복 제거 범위"""
+
+import gzip
+import json
+import os
+
+from src.kpi_checkpoint import KPICheckpointer
+from src.kpi_processor import KPIProcessor
+from src.kpi_targets import KPITargets
+
+BASE = 1_800_000_000.0
+
+
+def _processor():
+    return KPIProcessor({}, targets=KPITargets(None))
+
+
+def _status(make_message, at, count, cycle_time=170.0):
+    return make_message("A01_DOOR", "status", {"timestamp": at, "production_count": count,
+                                               "cycle_time": cycle_time, "station_status": "RUNNING"})
+
+
+def _quality(make_message, at, passed=True):
+    return make_message("A01_DOOR", "quality", {"timestamp": at, "overall_score": 0.9 if passed else 0.4,
+                                                "passed": passed, "defects": [] if passed else ["scratch"]})
+
+
+def _feed(processor, make_message, start, count, catch_up=False):
+    for n in range(count):
+        processor.update_metrics(_status(make_message, BASE + start + n * 10, start // 10 + n + 1), catch_up)
+        processor.update_metrics(_quality(make_message, BASE + start + n * 10 + 5, passed=n % 4 != 0), catch_up)
+
+
+def test_round_trip_restores_station_state(tmp_path, make_message):
+    path = str(tmp_path / "checkpoint" / "kpi_state.json.gz")
+    source = _processor()
+    _feed(source, make_message, 0, 20)
+    checkpointer = KPICheckpointer(source, path=path)
+    assert checkpointer.save()
+    assert not os.path.exists(path + ".tmp")
+
+    target = _processor()
+    saved_at = KPICheckpointer(target, path=path).restore()
+    assert saved_at == checkpointer.last_saved_at
+    assert target.export_state() == source.export_state()
+
+    # 가동률/처리량은 벽시계 기준이라 제외
+    restored_kpis = target.calculate_station_kpis("A01_DOOR")
+    source_kpis = source.calculate_station_kpis("A01_DOOR")
+    for key in ("fty", "quality_score", "avg_cycle_time", "total_cycles"):
+        assert restored_kpis[key] == source_kpis[key]
+    assert target.station_metrics["A01_DOOR"].cycle_time_sketch.count == 20
+
+    # 복원 직후(새 메시지 없이도) 공장/라인 합계에 복원한 스테이션이 포함됨
+    factory = target.get_factory_kpis()
+    assert factory["active_stations"] == 1
+    assert factory["factory_fty"] == source_kpis["fty"]["value"]
+    assert target.get_line_kpis()["A"]["active_stations"] == 1
+
+
+def test_restore_rejects_missing_corrupt_and_other_versions(tmp_path):
+    path = tmp_path / "kpi_state.json.gz"
+    processor = _processor()
+    checkpointer = KPICheckpointer(processor, path=str(path))
+    assert checkpointer.restore() is None
+
+    path.write_bytes(b"not gzip")
+    assert checkpointer.restore() is None
+
+    path.write_bytes(gzip.compress(json.dumps({"version": 999, "stations": {"A01_DOOR": {}}}).encode()))
+    assert checkpointer.restore() is None
+    assert processor.station_metrics == {}
+
+
+def test_restore_dedupes_only_up_to_snapshot_and_catch_up(tmp_path, make_message):
+    path = str(tmp_path / "kpi_state.json.gz")
+    source = _processor()
+    _feed(source, make_message, 0, 10)  # 이벤트 BASE ~ BASE+95
+    KPICheckpointer(source, path=path).save()
+
+    restored = _processor()
+    KPICheckpointer(restored, path=path).restore()
+    inspections = restored.station_metrics["A01_DOOR"].total_inspections
+
+    # 캐치업 겹침 구간(스냅샷에 포함)은 중복, 이후 구간은 반영하며 경계를 넓힘
+    _feed(restored, make_message, 50, 10, catch_up=True)  # BASE+50 ~ BASE+145
+    assert restored.duplicate_count == 10
+    assert restored.station_metrics["A01_DOOR"].total_inspections == inspections + 5
+
+    # 재연결 후 브로커가 다시 보낸 캐치업 구간 메시지는 중복
+    assert not restored.update_metrics(_quality(make_message, BASE + 145))
+    # 경계 이후의 지연 도착 메시지는 정상 반영
+    assert restored.update_metrics(_quality(make_message, BASE + 150))
+    assert restored.update_metrics(_quality(make_message, BASE + 148))
+    assert restored.station_metrics["A01_DOOR"].total_inspections == inspections + 7
+
+
+def test_without_restore_late_and_replayed_messages_are_applied(make_message):
+    processor = _processor()
+    _feed(processor, make_message, 0, 10)
+    # 같은 캡처를 다시 재생하거나 지연 도착한 메시지도 버리지 않음
+    _feed(processor, make_message, 0, 10)
+    assert processor.update_metrics(_quality(make_message, BASE + 1))
+    assert processor.duplicate_count == 0
+    assert processor.station_metrics["A01_DOOR"].total_inspections == 21
+
+
+def test_catch_up_runtime_uses_event_time(make_message):
+    processor = _processor()
+    # 10초 간격 상태 메시지 10건을 한 번에 재생 - 처리 시각과 무관하게 90초 가동
+    _feed(processor, make_message, 0, 10, catch_up=True)
+    metrics = processor.station_metrics["A01_DOOR"]
+    assert metrics.total_runtime == 90 / 60
+    assert metrics.last_update == BASE + 90
+
+    # 순서가 뒤바뀐 메시지와 MAX_STATUS_GAP을 넘는 공백은 가동 시간에 넣지 않음
+    processor.update_metrics(_status(make_message, BASE + 50, 10))
+    processor.update_metrics(_status(make_message, BASE + 3600, 11))
+    assert metrics.total_runtime == 90 / 60
+    assert metrics.last_update == BASE + 3600
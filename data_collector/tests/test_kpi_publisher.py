@@ -0,0 +1,68 @@
+"""KPIPublisher: 변경된 스테이션만 발행, 버려진 배치는 다음 주기에 재발행"""
+
+from src.api_client import SEND_DEFERRED, SEND_DROPPED, SEND_OK
+from src.kpi_processor import KPIProcessor
+from src.kpi_publisher import KPIPublisher
+from src.kpi_targets import KPITargets
+
+
+def _publisher(results):
+    kpis = {"A01_DOOR": {"station_id": "A01_DOOR", "total_cycles": 10, "oee": 85.0}}
+    sent = []
+    outcomes = list(results)
+
+    def send_batch(batch):
+        sent.append([entry["station_id"] for entry in batch])
+        return outcomes.pop(0)
+
+    return KPIPublisher(lambda station_id: dict(kpis[station_id]), send_batch), kpis, sent
+
+
+def test_unchanged_snapshot_is_skipped_after_send():
+    publisher, _, sent = _publisher([SEND_OK])
+    publisher.mark_dirty("A01_DOOR")
+    assert publisher.publish() == 1
+    publisher.mark_dirty("A01_DOOR")
+    assert publisher.publish() == 0
+    assert sent == [["A01_DOOR"]]
+    assert publisher.get_stats()["unchanged_skipped"] == 1
+
+
+def test_dropped_batch_is_republished_next_tick():
+    publisher, _, sent = _publisher([SEND_DROPPED, SEND_DEFERRED])
+    publisher.mark_dirty("A01_DOOR")
+    publisher.publish()
+    # 변경이 없어도 마지막 발행값으로 기록되지 않았으므로 다시 전송
+    assert publisher.get_stats()["pending_stations"] == 1
+    publisher.publish()
+    assert sent == [["A01_DOOR"], ["A01_DOOR"]]
+
+    stats = publisher.get_stats()
+    assert (stats["failed_batches"], stats["deferred_batches"], stats["snapshots_sent"]) == (1, 1, 1)
+    assert stats["pending_stations"] == 0
+
+
+def test_on_tick_receives_calculated_stations():
+    ticks = []
+    publisher, _, _ = _publisher([SEND_OK])
+    publisher.on_tick = ticks.append
+    publisher.mark_dirty("A01_DOOR")
+    publisher.publish()
+    publisher.publish()
+    assert ticks == [{"A01_DOOR"}, set()]
+
+
+def test_refresh_factory_kpis_updates_idle_stations(make_message):
+    processor = KPIProcessor({}, targets=KPITargets(None))
+    for station_id in ("A01_DOOR", "B03_MUFFLER"):
+        processor.update_metrics(make_message(station_id, "status", {"production_count": 1,
+                                                                     "station_status": "RUNNING"}))
+    assert processor.get_factory_kpis() == {}
+
+    publisher = KPIPublisher(processor.calculate_station_kpis, lambda batch: SEND_OK,
+                             on_tick=processor.refresh_factory_kpis)
+    publisher.mark_dirty("A01_DOOR")
+    publisher.publish()
+    # 발행 대상이 아닌 B03도 주기마다 공장 합계에 반영
+    assert processor.get_factory_kpis()["active_stations"] == 2
+    assert set(processor.get_line_kpis()) == {"A", "B"}
@@ -0,0 +1,51 @@
+"""KPITargets: 목표 파일이 시뮬레이터 스테이션/차종 사양과 일치하는지, 목표 없는 스테이션 경고"""
+
+import json
+import logging
+import os
+
+from benchmarks.station_payloads import STATION_CLASSES
+from mosquitto_MQTT.models.vehicle_models import VEHICLE_SPECS
+from src.kpi_targets import KPITargets
+
+TARGETS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "config", "kpi_targets.json")
+
+
+def _raw():
+    with open(TARGETS_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_station_targets_match_simulator_station_ids():
+    assert set(_raw()["station_targets"]) == set(STATION_CLASSES)
+
+
+def test_vehicle_models_match_vehicle_specs():
+    models = _raw()["vehicle_models"]["models"]
+    assert models == {
+        model.value: {"cycle_time_base": spec.cycle_time_base, "complexity_factor": spec.complexity_factor}
+        for model, spec in VEHICLE_SPECS.items()
+    }
+
+
+def test_every_simulator_station_has_configured_target(caplog):
+    targets = KPITargets(TARGETS_PATH, reload_interval=0)
+    with caplog.at_level(logging.WARNING, logger="src.kpi_targets"):
+        for station_id in STATION_CLASSES:
+            assert targets.station(station_id) is not targets._table.default
+    assert caplog.records == []
+    assert targets.station("D03_WATER_LEAK_TEST").cycle_time == 200
+    # 차종 목표 = 스테이션 목표 × (기본 사이클 타임 × 복잡도) / 기준 차종(AVANTE)
+    assert targets.station("A01_DOOR").cycle_time_for("PALISADE") == round(180 * 280 * 1.8 / 180, 1)
+
+
+def test_unknown_station_warns_once_and_uses_default(caplog):
+    targets = KPITargets(TARGETS_PATH, reload_interval=0)
+    with caplog.at_level(logging.WARNING, logger="src.kpi_targets"):
+        for _ in range(3):
+            assert targets.station("D03_LEAK").cycle_time == 180
+        targets.station("Z99_UNKNOWN")
+    assert len(caplog.records) == 2
+    assert "D03_LEAK" in caplog.records[0].getMessage() and "Z99_UNKNOWN" in caplog.records[1].getMessage()
+    assert targets.get_stats()["unknown_stations"] == 2
@@ -0,0 +1,144 @@
+"""KPIWindowManager: 워터마크, 허용 지연, 지연 이벤트, 슬라이딩 윈도우"""
+
+from datetime import datetime
+
+from src.kpi_windows import KPIWindowManager
+
+# 시간 경계에 정렬된 기준 시각 (payload timestamp는 epoch 초)
+BASE = 1_800_000_000 - 1_800_000_000 % 3600
+
+
+def _manager(**kwargs):
+    emitted = []
+    options = {"hourly": True, "sliding_seconds": 0, "watermark_delay": 10, "allowed_lateness": 30}
+    options.update(kwargs)
+    return KPIWindowManager(emitted.append, **options), emitted
+
+
+def _status(make_message, at, count, station_id="A01_DOOR", status="RUNNING"):
+    return make_message(station_id, "status",
+                        {"timestamp": at, "production_count": count, "station_status": status})
+
+
+def test_window_emitted_once_watermark_passes_end_plus_lateness(make_message):
+    manager, emitted = _manager()
+    manager.add(_status(make_message, BASE + 10, 0))
+    manager.add(_status(make_message, BASE + 1800, 5))
+
+    # 워터마크 = 최대 이벤트 - 10초, 방출 조건은 워터마크 ≥ 종료 + 30초
+    manager.add(_status(make_message, BASE + 3600 + 39, 6))
+    assert emitted == []
+
+    manager.add(_status(make_message, BASE + 3600 + 40, 7))
+    assert len(emitted) == 1
+    record = emitted[0]
+    assert record["window_type"] == "hourly"
+    assert record["window_start"] == datetime.fromtimestamp(BASE).isoformat()
+    assert record["window_seconds"] == 3600
+    assert record["complete"] is True
+    assert record["events"] == 2
+    assert record["cycles"] == 5
+
+    # 같은 윈도우는 다시 방출되지 않음
+    manager.add(_status(make_message, BASE + 3600 + 500, 8))
+    assert len(emitted) == 1
+
+
+def test_out_of_order_event_within_lateness_is_counted(make_message):
+    manager, emitted = _manager()
+    manager.add(_status(make_message, BASE + 10, 0))
+    manager.add(_status(make_message, BASE + 3600 + 20, 4))
+    # 다음 윈도우 이벤트 이후에 도착했지만 아직 방출 전 → 원래 윈도우에 반영
+    manager.add(_status(make_message, BASE + 3500, 3))
+    manager.add(_status(make_message, BASE + 3600 + 40, 5))
+
+    assert [record["events"] for record in emitted] == [2]
+    assert manager.get_stats()["late_events"] == 0
+
+
+def test_event_after_emission_is_late_and_dropped(make_message):
+    manager, emitted = _manager()
+    manager.add(_status(make_message, BASE + 10, 0))
+    manager.add(_status(make_message, BASE + 3600 + 40, 1))
+    assert len(emitted) == 1
+
+    manager.add(_status(make_message, BASE + 100, 1))
+    stats = manager.get_stats()
+    assert stats["late_events"] == 1
+    assert stats["open_windows"] == 1  # 다음 시간 윈도우만 열려 있음
+
+    manager.flush_all()
+    assert [record["window_start"] for record in emitted] == [
+        datetime.fromtimestamp(BASE).isoformat(), datetime.fromtimestamp(BASE + 3600).isoformat()]
+    assert emitted[1]["complete"] is False
+    assert emitted[1]["events"] == 1
+
+
+def test_watermark_is_per_station(make_message):
+    manager, emitted = _manager()
+    manager.add(_status(make_message, BASE + 10, 0, station_id="A01_DOOR"))
+    manager.add(_status(make_message, BASE + 10, 0, station_id="B03_MUFFLER"))
+    manager.add(_status(make_message, BASE + 7200, 1, station_id="B03_MUFFLER"))
+
+    assert [record["station_id"] for record in emitted] == ["B03_MUFFLER"]
+    # A01의 시계는 B03과 무관 - 같은 구간 이벤트도 지연이 아님
+    manager.add(_status(make_message, BASE + 20, 1, station_id="A01_DOOR"))
+    assert manager.get_stats()["late_events"] == 0
+
+
+def test_idle_station_emits_incomplete_windows(make_message):
+    manager, emitted = _manager(idle_timeout=300)
+    manager.add(_status(make_message, BASE + 10, 0))
+    arrival = manager._stations["A01_DOOR"].last_arrival
+
+    manager.flush_idle(arrival + 299)
+    assert emitted == []
+    manager.flush_idle(arrival + 300)
+    assert len(emitted) == 1 and emitted[0]["complete"] is False
+    assert manager.get_stats()["open_windows"] == 0
+    manager.flush_idle(arrival + 600)
+    assert len(emitted) == 1
+
+    # 재개 후: 방출된 윈도우는 다시 열리지 않고, 사이클은 마지막 생산 카운트 기준
+    manager.add(_status(make_message, BASE + 20, 1))
+    assert manager.get_stats()["late_events"] == 1
+    manager.add(_status(make_message, BASE + 3600 + 10, 4))
+    manager.flush_all()
+    assert len(emitted) == 2 and emitted[1]["cycles"] == 3
+
+
+def test_sliding_window_merges_panes_and_rejects_expired_panes(make_message):
+    manager, emitted = _manager(hourly=False, sliding_seconds=900, sliding_step=60,
+                                watermark_delay=0, allowed_lateness=0)
+    for minute in range(20):
+        manager.add(_status(make_message, BASE + minute * 60 + 5, minute))
+
+    # 워터마크 BASE+19분 → 종료 시각 1분~19분 윈도우 방출
+    assert len(emitted) == 19
+    assert {record["window_type"] for record in emitted} == {"rolling_15m"}
+    assert all(record["window_seconds"] == 900 for record in emitted)
+    assert [record["events"] for record in emitted[:3]] == [1, 2, 3]
+    assert emitted[-1]["events"] == 15
+    assert emitted[0]["cycles"] == 0  # 첫 production_count는 기준값
+    assert emitted[-1]["cycles"] == 15
+
+    # 다음 윈도우 시작보다 오래된 pane은 지연 이벤트
+    manager.add(_status(make_message, BASE + 60, 19))
+    assert manager.get_stats()["late_events"] == 1
+
+
+def test_sliding_catch_up_skips_empty_panes(make_message):
+    manager, emitted = _manager(hourly=False, sliding_seconds=900, sliding_step=60,
+                                watermark_delay=0, allowed_lateness=0)
+    # epoch 0 이벤트 다음 현재 시각 이벤트 - 빈 윈도우 수천만 개를 훑지 않고 건너뜀
+    manager.add(_status(make_message, 5, 0))
+    manager.add(_status(make_message, BASE + 5, 1))
+    assert len(emitted) == 15
+    assert all(record["events"] == 1 for record in emitted)
+
+    # 먼 미래 timestamp도 pane이 있는 윈도우만 방출
+    manager.add(_status(make_message, BASE + 10 ** 9, 2))
+    assert len(emitted) == 30
+    assert manager._stations["A01_DOOR"].next_sliding_end == BASE + 10 ** 9 + 20  # 미래 pane 종료
+    manager.flush_all()
+    assert len(emitted) == 45
@@ -0,0 +1,78 @@
+from src.ingest_queue import (
+    DEFAULT_LANES, LaneQueue, POLICY_BLOCK, POLICY_COALESCE, POLICY_DROP_OLDEST, POLICY_SAMPLE
+)
+
+
+def _shard(**lanes):
+    return LaneQueue(lanes, shard_count=1, default_capacity=100)
+
+
+def _drain(shard):
+    items = []
+    for lane in shard._ordered:
+        while lane.items:
+            items.append(lane.pop())
+    return items
+
+
+def test_drop_oldest_keeps_newest(make_message):
+    shard = _shard(default={"policy": POLICY_DROP_OLDEST, "capacity": 3})
+    for n in range(5):
+        assert shard.put(make_message(data_type="alerts", data={"n": n}))
+    assert [message.data["n"] for message in _drain(shard)] == [2, 3, 4]
+    assert shard.lanes["default"].dropped_count == 2
+
+
+def test_coalesce_keeps_latest_per_station(make_message):
+    shard = _shard(telemetry={"policy": POLICY_COALESCE, "capacity": 10})
+    for n in range(3):
+        for station_id in ("A01_DOOR", "A02_WIRING"):
+            shard.put(make_message(station_id, "telemetry", {"n": n}))
+
+    drained = _drain(shard)
+    assert [(message.station_id, message.data["n"]) for message in drained] == [
+        ("A01_DOOR", 2), ("A02_WIRING", 2)
+    ]
+    assert shard.lanes["telemetry"].coalesced_count == 4
+
+
+def test_coalesce_evicts_oldest_station_when_full(make_message):
+    shard = _shard(telemetry={"policy": POLICY_COALESCE, "capacity": 2})
+    for station_id in ("A01_DOOR", "A02_WIRING", "A03_HEADLINER"):
+        shard.put(make_message(station_id, "telemetry"))
+    assert [message.station_id for message in _drain(shard)] == ["A02_WIRING", "A03_HEADLINER"]
+    assert shard.lanes["telemetry"].dropped_count == 1
+
+
+def test_sample_sheds_above_threshold(make_message):
+    shard = _shard(sensors={"policy": POLICY_SAMPLE, "capacity": 100, "sample_rate": 10, "shed_threshold": 0.5})
+    accepted = sum(shard.put(make_message(data_type="sensors", data={"n": n})) for n in range(150))
+
+    # 50건까지는 모두 적재, 이후 100건 중 10건만 적재
+    assert accepted == 60
+    lane = shard.lanes["sensors"]
+    assert len(lane) == 60
+    assert lane.sampled_out_count == 90
+
+
+def test_higher_priority_lane_drains_first(make_message):
+    shard = _shard(
+        status={"priority": 0, "policy": POLICY_BLOCK},
+        telemetry={"priority": 1, "policy": POLICY_COALESCE},
+        default={"priority": 2, "policy": POLICY_DROP_OLDEST}
+    )
+    shard.put(make_message(data_type="alerts"))
+    shard.put(make_message(data_type="telemetry"))
+    shard.put(make_message(data_type="status"))
+
+    assert [shard.get().data_type for _ in range(3)] == ["status", "telemetry", "alerts"]
+
+
+def test_unknown_data_type_uses_default_lane(make_message):
+    shard = LaneQueue(DEFAULT_LANES, shard_count=1, default_capacity=10)
+    assert shard.lane_for("robot") is shard.lanes["default"]
+
+
+def test_capacity_is_split_across_shards():
+    shard = LaneQueue({"status": {"policy": POLICY_BLOCK, "capacity": 1000}}, shard_count=4, default_capacity=10)
+    assert shard.lanes["status"].capacity == 250
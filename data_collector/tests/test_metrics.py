@@ -0,0 +1,48 @@
+from src.metrics import MetricsRegistry
+
+
+def test_labels_return_the_same_child():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "help", ("endpoint",))
+    assert counter.labels("/a") is counter.labels("/a")
+    assert counter.labels("/a") is not counter.labels("/b")
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+    first = registry.histogram("test_seconds", "help", ("stage",))
+    assert registry.histogram("test_seconds", "help", ("stage",)) is first
+
+
+def test_counter_and_histogram_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Requests", ("endpoint", "outcome"))
+    counter.inc("/api/kpi/data", "success")
+    counter.inc("/api/kpi/data", "success", amount=2)
+    histogram = registry.histogram("test_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "kpi")
+
+    text = registry.render()
+    assert '# TYPE test_total counter' in text
+    assert 'test_total{endpoint="/api/kpi/data",outcome="success"} 3.0' in text
+    assert 'test_seconds_bucket{stage="kpi",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="kpi",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="kpi",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="kpi"} 3' in text
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    registry = MetricsRegistry()
+    child = registry.histogram("test_seconds", "Latency", buckets=(1.0, 2.0)).labels()
+    for value in (1.5, 1.5, 1.5, 1.5):
+        child.observe(value)
+    assert 1.0 < child.quantile(0.5) <= 2.0
+
+
+def test_gauge_reads_callback_with_labels():
+    registry = MetricsRegistry()
+    registry.gauge("test_depth", "Depth", lambda: {"status": 3, "telemetry": 1}, ("lane",))
+    text = registry.render()
+    assert 'test_depth{lane="status"} 3.0' in text
+    assert 'test_depth{lane="telemetry"} 1.0' in text
@@ -0,0 +1,112 @@
+"""TDigest: 분위수 정확도, 병합(스테이션 → 라인/공장) 정확도, 상태 직렬화"""
+
+import random
+from bisect import bisect_left
+
+import pytest
+
+from src.quantile_sketch import TDigest, merge_all
+
+QS = (0.01, 0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def _rank_error(sorted_values, digest, q):
+    """추정값의 실제 순위(0~1)와 q의 차이"""
+    return abs(bisect_left(sorted_values, digest.quantile(q)) / len(sorted_values) - q)
+
+
+def _tolerance(q):
+    # k1 스케일은 꼬리 쪽 중심점이 작아 양 끝 오차가 더 작음
+    return 0.002 if q <= 0.01 or q >= 0.99 else 0.005
+
+
+def _digest(values, compression=100):
+    digest = TDigest(compression)
+    for value in values:
+        digest.add(value)
+    return digest
+
+
+@pytest.fixture(scope="module")
+def shards():
+    """스테이션 8개의 사이클 타임 (스테이션마다 분포 위치가 다름)"""
+    rng = random.Random(7)
+    return [[rng.lognormvariate(5 + 0.1 * index, 0.3) for _ in range(10000)] for index in range(8)]
+
+
+def test_single_digest_rank_error(shards):
+    values = [value for shard in shards for value in shard]
+    digest = _digest(values)
+    ordered = sorted(values)
+    for q in QS:
+        assert _rank_error(ordered, digest, q) <= _tolerance(q), q
+    assert digest.min == ordered[0] and digest.max == ordered[-1]
+    assert len(digest) <= 2 * digest.compression  # 관측 8만 건에도 중심점 수는 compression 수준
+
+
+def test_merged_digest_matches_exact_quantiles(shards):
+    digests = [_digest(shard) for shard in shards]
+    before = [(digest.count, list(digest._means)) for digest in digests]
+    ordered = sorted(value for shard in shards for value in shard)
+
+    merged = merge_all(digests)
+    # 워커 → 부모처럼 단계적으로 병합해도 같은 정확도
+    staged = merge_all([merge_all(digests[:4]), merge_all(digests[4:])])
+
+    for digest in (merged, staged):
+        assert digest.count == len(ordered)
+        assert (digest.min, digest.max) == (ordered[0], ordered[-1])
+        for q in QS:
+            assert _rank_error(ordered, digest, q) <= _tolerance(q), q
+    # 원본 스케치는 변경되지 않음
+    assert [(digest.count, digest._means) for digest in digests] == before
+
+
+def test_merge_includes_unflushed_buffers():
+    left = _digest([1.0, 2.0, 3.0])
+    right = _digest([10.0, 20.0])
+    left.merge(right)
+    left.merge(TDigest())
+    assert left.count == 5
+    assert (left.min, left.max) == (1.0, 20.0)
+    assert left.quantile(0.0) == 1.0 and left.quantile(1.0) == 20.0
+    assert merge_all([]).quantiles() == [None, None, None, None]
+
+
+def test_state_round_trip_preserves_quantiles(shards):
+    digest = _digest(shards[0])
+    restored = TDigest.from_state(digest.to_state())
+    assert restored.count == digest.count
+    assert restored.quantiles(QS) == digest.quantiles(QS)
+    assert TDigest.from_state(TDigest().to_state()).quantile(0.5) is None
+
+
+def test_summary_cache_refreshes_after_staleness_bound():
+    digest = _digest(range(1000))
+    first = digest.summary()
+    assert first["count"] == 1000
+    for value in range(4):
+        digest.add(10000 + value)
+    assert digest.summary() == first  # 0.5% 이내 추가는 캐시 사용
+    digest.add(20000)
+    digest.add(20001)
+    assert digest.summary()["count"] == 1006
+
+
+def test_station_kpi_percentiles_rebuilt_only_after_new_cycle(make_message):
+    from src.kpi_processor import KPIProcessor
+    from src.kpi_targets import KPITargets
+
+    processor = KPIProcessor({}, targets=KPITargets(None))
+    processor.update_metrics(make_message("A01_DOOR", "status", {"production_count": 1, "cycle_time": 170.0}))
+    metrics = processor.station_metrics["A01_DOOR"]
+    first = processor.calculate_station_kpis("A01_DOOR")["avg_cycle_time"]["percentiles"]
+    cached = metrics.cycle_time_summary
+
+    # 사이클이 없는 메시지 후에는 캐시 재사용, 새 사이클이 기록되면 다시 계산
+    processor.update_metrics(make_message("A01_DOOR", "quality", {"overall_score": 0.9, "passed": True}))
+    processor.calculate_station_kpis("A01_DOOR")
+    assert metrics.cycle_time_summary is cached
+    processor.update_metrics(make_message("A01_DOOR", "status", {"production_count": 2, "cycle_time": 190.0}))
+    assert processor.calculate_station_kpis("A01_DOOR")["avg_cycle_time"]["percentiles"]["count"] == 2
+    assert first["count"] == 1
@@ -0,0 +1,138 @@
+import os
+
+from src.spool import CURSOR_FILE, DiskSpool, SEGMENT_PREFIX
+
+
+def _spool(tmp_path, **kwargs):
+    return DiskSpool(directory=str(tmp_path / "spool"), **kwargs)
+
+
+def _collect(sent):
+    def sender(endpoint, data):
+        sent.append((endpoint, data))
+        return True
+    return sender
+
+
+def test_replay_preserves_append_order(tmp_path):
+    spool = _spool(tmp_path, segment_bytes=64)
+    for n in range(10):
+        assert spool.append("/api/iot-data/batch", [{"n": n}])
+    assert spool.get_stats()["segments"] > 1
+
+    sent = []
+    assert spool.replay_once(_collect(sent)) == 10
+    assert [data[0]["n"] for _, data in sent] == list(range(10))
+    assert spool.pending_bytes() == 0
+    stats = spool.get_stats()
+    assert stats["replayed_batches"] == 10
+    assert stats["replayed_records"] == 10
+
+
+def test_failed_replay_stops_and_resumes_from_cursor(tmp_path):
+    spool = _spool(tmp_path)
+    for n in range(5):
+        spool.append("/api/kpi/data", {"n": n})
+
+    sent = []
+
+    def flaky(endpoint, data):
+        if data["n"] == 2:
+            return False
+        sent.append(data["n"])
+        return True
+
+    assert spool.replay_once(flaky) == 2
+    assert sent == [0, 1]
+    assert spool.pending_bytes() > 0
+
+    sent.clear()
+    assert spool.replay_once(lambda endpoint, data: sent.append(data["n"]) or True) == 3
+    assert sent == [2, 3, 4]
+
+
+def test_cursor_survives_restart(tmp_path):
+    spool = _spool(tmp_path)
+    for n in range(4):
+        spool.append("/api/kpi/data", {"n": n})
+    sent = []
+    spool.replay_once(lambda endpoint, data: data["n"] < 2 and (sent.append(data["n"]) or True))
+    spool.stop()
+    assert os.path.exists(tmp_path / "spool" / CURSOR_FILE)
+
+    restarted = _spool(tmp_path)
+    assert restarted.pending_bytes() > 0
+    sent.clear()
+    assert restarted.replay_once(_collect(sent)) == 2
+    assert [data["n"] for _, data in sent] == [2, 3]
+
+
+def test_corrupt_cursor_restarts_from_first_segment(tmp_path):
+    spool = _spool(tmp_path)
+    spool.append("/api/kpi/data", {"n": 0})
+    spool.stop()
+    with open(tmp_path / "spool" / CURSOR_FILE, "w") as f:
+        f.write("garbage")
+
+    sent = []
+    assert _spool(tmp_path).replay_once(_collect(sent)) == 1
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    spool = _spool(tmp_path)
+    spool.append("/api/kpi/data", {"n": 0})
+    spool.stop()
+    segment = next(name for name in os.listdir(tmp_path / "spool") if name.startswith(SEGMENT_PREFIX))
+    with open(tmp_path / "spool" / segment, "ab") as f:
+        f.write(b'{"endpoint": "/api/kpi/data", "da')
+
+    restarted = _spool(tmp_path)
+    sent = []
+    assert restarted.replay_once(_collect(sent)) == 1
+    assert restarted.get_stats()["corrupt_batches"] == 1
+
+
+def test_size_limit_drops_oldest_segment(tmp_path):
+    spool = _spool(tmp_path, segment_bytes=100, max_bytes=300)
+    for n in range(20):
+        spool.append("/api/kpi/data", {"n": n, "pad": "x" * 20})
+
+    stats = spool.get_stats()
+    assert stats["dropped_batches"] > 0
+    assert sum(os.path.getsize(tmp_path / "spool" / name)
+               for name in os.listdir(tmp_path / "spool") if name.startswith(SEGMENT_PREFIX)) <= 300
+
+    sent = []
+    spool.replay_once(_collect(sent))
+    numbers = [data["n"] for _, data in sent]
+    # 오래된 요청부터 폐기되고 최신 요청은 순서대로 남음
+    assert numbers == sorted(numbers)
+    assert numbers[-1] == 19
+    assert len(numbers) + stats["dropped_batches"] == 20
+
+
+def test_cursor_written_every_n_records_and_at_segment_end(tmp_path, monkeypatch):
+    spool = _spool(tmp_path, cursor_sync_records=4)
+    for n in range(10):
+        spool.append("/api/kpi/data", {"n": n})
+    writes = []
+    original = spool._write_cursor
+    monkeypatch.setattr(spool, "_write_cursor", lambda: writes.append(spool._cursor) or original())
+
+    sent = []
+    assert spool.replay_once(_collect(sent)) == 10
+    # 4건, 8건째 + 세그먼트 완료 시 1회 (레코드마다 기록하지 않음)
+    assert len(writes) == 3
+    assert spool.pending_bytes() == 0
+
+
+def test_failure_between_syncs_persists_cursor(tmp_path):
+    spool = _spool(tmp_path, cursor_sync_records=100)
+    for n in range(5):
+        spool.append("/api/kpi/data", {"n": n})
+    spool.replay_once(lambda endpoint, data: data["n"] < 3)
+
+    # 동기화 주기 전이라도 전송 실패 시점의 위치는 기록됨
+    sent = []
+    assert _spool(tmp_path).replay_once(_collect(sent)) == 2
+    assert [data["n"] for _, data in sent] == [3, 4]
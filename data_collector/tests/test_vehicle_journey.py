@@ -0,0 +1,72 @@
+"""VehicleJourneyIndex: 실제 시뮬레이터 스테이션 순서로 차량 1대를 재생해 리드 타임 확정"""
+
+import contextlib
+import io
+
+from benchmarks.station_payloads import STATION_CLASSES
+from src.vehicle_journey import VehicleJourneyIndex
+
+BASE = 1_800_000_000.0
+DWELL = 120.0
+
+
+def _journey_messages(make_message, vehicle_id="HMC202610170001", station_ids=tuple(STATION_CLASSES)):
+    """스테이션 시뮬레이터 텔레메트리를 같은 차량으로 맞춰 스테이션마다 2건씩 생성"""
+    messages = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, station_id in enumerate(station_ids):
+            simulator = STATION_CLASSES[station_id](station_id)
+            for offset in (0.0, DWELL):
+                data = simulator.generate_telemetry()
+                data["rfid"]["vehicle_id"] = vehicle_id
+                data["rfid"]["model"] = "TUCSON"
+                data["tracking"]["vehicle_id"] = vehicle_id
+                if isinstance(data.get("vehicle_position"), dict) and "vehicle_id" in data["vehicle_position"]:
+                    data["vehicle_position"]["vehicle_id"] = vehicle_id
+                data["timestamp"] = BASE + index * 150 + offset
+                messages.append(make_message(station_id, "telemetry", data, received_at=BASE + index * 150 + offset))
+    return messages
+
+
+def test_vehicle_through_real_station_sequence_produces_lead_time(make_message):
+    records = []
+    index = VehicleJourneyIndex(records.append, exit_timeout=600)
+    messages = _journey_messages(make_message)
+    for message in messages:
+        index.observe(message)
+
+    assert index.get_wip() == {"D03_WATER_LEAK_TEST": 1}
+    assert index.flush_idle(messages[-1].received_at + 599) == 0
+    assert index.flush_idle(messages[-1].received_at + 600) == 1
+
+    expected = (len(STATION_CLASSES) - 1) * 150 + DWELL
+    assert [record["status"] for record in records] == ["completed"]
+    assert records[0]["lead_time"] == expected
+    assert [visit["station_id"] for visit in records[0]["visits"]] == list(STATION_CLASSES)
+
+    kpis = index.get_flow_kpis()
+    assert kpis["lead_time"]["count"] == 1
+    assert kpis["lead_time"]["p50"] == expected
+    assert kpis["lead_time_by_model"]["TUCSON"]["count"] == 1
+    assert kpis["dwell"]["A01_DOOR"]["p50"] == DWELL
+    assert index.get_stats()["completed_count"] == 1
+
+
+def test_complete_marker_finishes_journey_without_configured_station(make_message):
+    # 설정된 마지막 공정 ID가 달라도 next_station == "COMPLETE"면 완료
+    index = VehicleJourneyIndex(final_stations=("NOT_A_STATION",))
+    messages = _journey_messages(make_message, station_ids=("D02_HEADLAMP", "D03_WATER_LEAK_TEST"))
+    for message in messages:
+        index.observe(message)
+    index.flush_idle(float("inf"))
+    assert index.get_stats()["completed_count"] == 1
+
+
+def test_vehicle_leaving_mid_line_is_incomplete(make_message):
+    records = []
+    index = VehicleJourneyIndex(records.append)
+    for message in _journey_messages(make_message, station_ids=("A01_DOOR", "A02_WIRING")):
+        index.observe(message)
+    index.flush_idle(float("inf"))
+    assert [record["status"] for record in records] == ["incomplete"]
+    assert index.get_flow_kpis()["lead_time"]["count"] == 0
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+MQTT 캡처/재생 도구
+실제 스테이션 트래픽을 기록해 두고 같은 간격(또는 N배속/최대 속도)으로 다시 흘려보내 부하 테스트
+
+사용법 (data_collector 디렉토리에서):
+    python tools/mqtt_capture.py record capture.mqcap --duration 600
+    python tools/mqtt_capture.py info capture.mqcap
+    python tools/mqtt_capture.py replay capture.mqcap --mode publish --speed 10
+    python tools/mqtt_capture.py replay capture.mqcap --mode inject --speed 0
+    python tools/mqtt_capture.py generate synthetic.mqcap --stations 15 --seconds 300
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+COLLECTOR_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COLLECTOR_ROOT not in sys.path:
+    sys.path.insert(0, COLLECTOR_ROOT)
+
+from src.capture import CaptureWriter, read_capture, replay  # noqa: E402
+
+
+def _load_mqtt_config(config_path: str) -> dict:
+    import yaml
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f).get('mqtt', {})
+
+
+def _write_inject_config(config_path: str, work_dir: str) -> str:
+    """inject 재생용 설정 파일 - 운영 수집기의 상태 파일을 읽거나 덮어쓰지 않도록 분리
+
+    KPI 체크포인트는 끄고(운영 스냅샷 복원/덮어쓰기 방지), 스풀/이력/journey DB는 work_dir 아래로 옮긴다.
+    읽기 전용 KPI 목표 파일은 설정 파일 기준 절대 경로로 고정.
+    """
+    import yaml
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    base_dir = os.path.dirname(os.path.abspath(config_path))
+
+    config.setdefault('spool', {})['directory'] = os.path.join(work_dir, "spool")
+    config.setdefault('history', {})['directory'] = os.path.join(work_dir, "history")
+    config.setdefault('journey', {})['database'] = os.path.join(work_dir, "history", "journeys.db")
+    kpi_config = config.setdefault('kpi', {})
+    kpi_config.setdefault('checkpoint', {})['enabled'] = False
+    targets_config = kpi_config.setdefault('targets', {})
+    targets_config['path'] = os.path.join(base_dir, targets_config.get('path', 'config/kpi_targets.json'))
+
+    path = os.path.join(work_dir, "config.yaml")
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return path
+
+
+def cmd_record(args):
+    """factory/# 구독 후 수신 메시지를 캡처 파일에 기록"""
+    import paho.mqtt.client as mqtt
+
+    mqtt_config = _load_mqtt_config(args.config)
+    host = args.host or mqtt_config.get('broker_host', 'localhost')
+    port = args.port or mqtt_config.get('broker_port', 1883)
+
+    writer = CaptureWriter(args.output)
+    stop_event = threading.Event()
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            client.subscribe(args.topic, qos=args.qos)
+            print(f"🎙️ 기록 시작: {args.topic} → {args.output}")
+        else:
+            print(f"❌ MQTT 연결 실패: {rc}")
+            stop_event.set()
+
+    def on_message(client, userdata, msg):
+        writer.write(msg.topic, msg.payload)
+        if args.count and writer.record_count >= args.count:
+            stop_event.set()
+
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    client.connect(host, port, 60)
+    client.loop_start()
+    started = time.monotonic()
+    while not stop_event.wait(1.0):
+        if args.duration and time.monotonic() - started >= args.duration:
+            break
+        print(f"\r📥 {writer.record_count}건 기록", end="", flush=True)
+    client.loop_stop()
+    client.disconnect()
+    writer.close()
+
+    print(f"\n💾 {writer.record_count}건, 페이로드 {writer.payload_bytes / 1024:.1f}KB → "
+          f"파일 {os.path.getsize(args.output) / 1024:.1f}KB")
+
+
+def cmd_info(args):
+    """캡처 파일 요약 (data_type/스테이션별 건수, 기간, 평균 속도)"""
+    by_type = Counter()
+    by_station = Counter()
+    first_at = last_at = None
+    total_bytes = 0
+
+    for received_at, topic, payload in read_capture(args.capture):
+        parts = topic.split('/')
+        by_type[parts[-1]] += 1
+        if len(parts) == 3:
+            by_station[parts[1]] += 1
+        total_bytes += len(payload)
+        first_at = received_at if first_at is None else first_at
+        last_at = received_at
+
+    total = sum(by_type.values())
+    if not total:
+        print("빈 캡처 파일")
+        return
+
+    duration = max(1e-9, last_at - first_at)
+    print(f"📼 {args.capture}: {total}건, {duration:.1f}초 ({total / duration:.1f} msg/s), "
+          f"평균 페이로드 {total_bytes / total:.0f} bytes")
+    print("data_type: " + ", ".join(f"{name} {count}" for name, count in by_type.most_common()))
+    print(f"스테이션 {len(by_station)}개: " + ", ".join(f"{name} {count}" for name, count in sorted(by_station.items())))
+
+
+def cmd_replay(args):
+    """캡처 재생 - publish(브로커로 재발행) 또는 inject(DataCollector에 직접 주입)"""
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    if args.mode == "publish":
+        import paho.mqtt.client as mqtt
+
+        mqtt_config = _load_mqtt_config(args.config)
+        client = mqtt.Client()
+        client.connect(args.host or mqtt_config.get('broker_host', 'localhost'),
+                       args.port or mqtt_config.get('broker_port', 1883), 60)
+        client.loop_start()
+
+        def deliver(topic, payload):
+            client.publish(topic, payload, qos=args.qos)
+
+        count, elapsed = replay(read_capture(args.capture), deliver, args.speed, stop_event)
+        client.loop_stop()
+        client.disconnect()
+        print(f"📤 재발행 {count}건, {elapsed:.2f}초 ({count / max(elapsed, 1e-9):.0f} msg/s)")
+        return
+
+    # inject: MQTT 없이 DataCollector.handle_mqtt_message로 직접 전달
+    # (체크포인트 없이, 디스크 상태는 임시 디렉토리에 - 같은 캡처를 반복 재생해도 결과 동일)
+    from main import DataCollector
+    from src.models.message import MQTTMessage
+
+    work_dir = tempfile.mkdtemp(prefix="mqtt_inject_")
+    try:
+        collector = DataCollector(_write_inject_config(args.config, work_dir))
+
+        def deliver(topic, payload):
+            try:
+                message = MQTTMessage.decode(topic, payload, codec=collector.codec)
+            except ValueError:
+                return
+            collector.handle_mqtt_message(message)
+
+        count, elapsed = replay(read_capture(args.capture), deliver, args.speed, stop_event)
+
+        # 인입 큐가 비워질 때까지 포함한 처리량 계산
+        drain_started = time.monotonic()
+        while collector.ingest_queue.get_depth() and not stop_event.is_set():
+            time.sleep(0.01)
+        total_elapsed = elapsed + (time.monotonic() - drain_started)
+        queue_stats = collector.ingest_queue.get_stats()
+        collector.shutdown()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n📥 주입 {count}건, 처리 완료까지 {total_elapsed:.2f}초 ({count / max(total_elapsed, 1e-9):.0f} msg/s), "
+          f"처리 {queue_stats['processed_count']}건, 병합 {queue_stats['coalesced_count']}건, "
+          f"폐기 {queue_stats['dropped_count']}건")
+
+
+def cmd_generate(args):
+    """MQTT 브로커 없이 스테이션 시뮬레이터 페이로드로 합성 캡처 생성
+
+    generate_messages 1라운드(10초 분량)의 메시지를 10초 구간에 고르게 배치하고
+    payload timestamp도 배치한 시각으로 맞춘다.
+    """
+    from datetime import datetime
+    from src.codec import get_codec
+    from benchmarks.station_payloads import create_stations, generate_messages
+
+    codec = get_codec()
+    writer = CaptureWriter(args.output)
+    stations = create_stations(args.stations)
+    start = time.time()
+
+    for round_index in range(max(1, args.seconds // 10)):
+        messages = list(generate_messages(stations, 1))
+        for index, (topic, payload) in enumerate(messages):
+            at = start + round_index * 10 + 10 * index / len(messages)
+            payload["timestamp"] = datetime.fromtimestamp(at).isoformat()
+            writer.write(topic, codec.dumps(payload), at)
+    writer.close()
+
+    print(f"💾 합성 캡처 {writer.record_count}건 ({args.stations}개 스테이션, {args.seconds}초) → {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MQTT 캡처/재생 도구")
+    parser.add_argument("--config", default="config.yaml")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="브로커 메시지를 캡처 파일로 기록")
+    record.add_argument("output")
+    record.add_argument("--topic", default="factory/#")
+    record.add_argument("--host")
+    record.add_argument("--port", type=int)
+    record.add_argument("--qos", type=int, default=1)
+    record.add_argument("--duration", type=float, default=0, help="기록 시간(초), 0이면 Ctrl+C까지")
+    record.add_argument("--count", type=int, default=0, help="기록할 메시지 수, 0이면 제한 없음")
+    record.set_defaults(func=cmd_record)
+
+    info = sub.add_parser("info", help="캡처 파일 요약")
+    info.add_argument("capture")
+    info.set_defaults(func=cmd_info)
+
+    replay_parser = sub.add_parser("replay", help="캡처 재생")
+    replay_parser.add_argument("capture")
+    replay_parser.add_argument("--mode", choices=["publish", "inject"], default="publish")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="1=원래 속도, N=N배속, 0=최대 속도")
+    replay_parser.add_argument("--host")
+    replay_parser.add_argument("--port", type=int)
+    replay_parser.add_argument("--qos", type=int, default=1)
+    replay_parser.set_defaults(func=cmd_replay)
+
+    generate = sub.add_parser("generate", help="시뮬레이터 페이로드로 합성 캡처 생성")
+    generate.add_argument("output")
+    generate.add_argument("--stations", type=int, default=15)
+    generate.add_argument("--seconds", type=int, default=60)
+    generate.set_defaults(func=cmd_generate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
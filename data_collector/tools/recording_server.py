@@ -0,0 +1,141 @@
+"""
+요청 기록용 로컬 HTTP 서버
+InfluxDB / Spring Boot 백엔드 대신 띄워서 싱크가 보내는 요청을 확인
+(벤치마크에서는 응답 지연/오류 주입용 가짜 백엔드로 사용)
+
+    python tools/recording_server.py --port 8086
+    (config.yaml의 influxdb.url 을 http://localhost:8086 으로 지정)
+    python tools/recording_server.py --port 8080 --status 200 --latency-ms 20 --error-rate 0.05
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+
+class RecordingServer:
+    """수신한 요청(method, path, query, headers, body)을 메모리에 기록
+
+    gzip으로 압축된 본문은 풀어서 저장한다. 모든 요청에 status_code로 응답.
+    latency_ms만큼 응답을 지연하고, error_rate 비율로 error_status를 반환한다.
+    record_bodies=False면 요청 내용은 저장하지 않고 경로별 건수만 센다 (장시간 벤치마크용).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, status_code: int = 204,
+                 verbose: bool = False, latency_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, record_bodies: bool = True):
+        self.status_code = status_code
+        self.verbose = verbose
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.record_bodies = record_bodies
+        self.requests: List[Dict[str, Any]] = []
+        self.request_counts: Dict[str, int] = {}
+        self.error_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (requests.Session 연결 재사용)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+
+                parts = urlsplit(self.path)
+                server.record({
+                    "method": self.command,
+                    "path": parts.path,
+                    "query": {key: values[0] for key, values in parse_qs(parts.query).items()},
+                    "headers": dict(self.headers),
+                    "body": body.decode("utf-8", errors="replace") if server.record_bodies else ""
+                })
+
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                status = server.status_code
+                if server.error_rate > 0 and random.random() < server.error_rate:
+                    status = server.error_status
+                    with server._lock:
+                        server.error_count += 1
+
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            do_GET = do_POST = do_PUT = _handle
+
+            def log_message(self, format, *args):
+                if server.verbose:
+                    super().log_message(format, *args)
+
+        return Handler
+
+    def record(self, request: Dict[str, Any]):
+        with self._lock:
+            self.request_counts[request["path"]] = self.request_counts.get(request["path"], 0) + 1
+            if self.record_bodies:
+                self.requests.append(request)
+        if self.verbose:
+            print(f"📥 {request['method']} {request['path']} {request['query']}")
+            print(request["body"])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="recording-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def get_requests(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요청 기록용 로컬 HTTP 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--status", type=int, default=204, help="응답 상태 코드")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--output", help="종료 시 기록한 요청을 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    server = RecordingServer(args.host, args.port, status_code=args.status, verbose=True,
+                             latency_ms=args.latency_ms, error_rate=args.error_rate)
+    print(f"🎙️ 요청 기록 서버: {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(server.get_requests(), f, ensure_ascii=False, indent=2)
+            print(f"💾 {len(server.requests)}건 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
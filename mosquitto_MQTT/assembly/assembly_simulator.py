@@ -28,8 +28,8 @@ from .D_03_water_leak_test import D03WaterLeakTestSimulator
 class AssemblyLineSimulator:
     """통합 조립라인 시뮬레이터"""
     
-    def __init__(self, broker_host: str = "localhost", broker_port: int = 1883):
-        self.mqtt_publisher = MQTTPublisher(broker_host, broker_port)
+    def __init__(self, broker_host: str = "localhost", broker_port: int = 1883, json_codec: str = "auto"):
+        self.mqtt_publisher = MQTTPublisher(broker_host, broker_port, json_codec)
         self.running = False
         self.station_threads = []
         
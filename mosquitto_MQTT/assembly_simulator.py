@@ -101,7 +101,8 @@ class AssemblyProcessSimulator:
             mqtt_config = self.config["mqtt"]
             self.mqtt_publisher = MQTTPublisher(
                 mqtt_config["broker"], 
-                mqtt_config["port"]
+                mqtt_config["port"],
+                mqtt_config.get("json_codec", "auto")
             )
             
             if not self.mqtt_publisher.connect():
@@ -9,9 +9,11 @@ __author__ = "Manufacturing IoT Team"
 from .mqtt_publisher import MQTTPublisher
 from .config_loader import ConfigLoader
 from .data_generator import DataGenerator
+from .json_codec import get_codec
 
 __all__ = [
     'MQTTPublisher',
     'ConfigLoader', 
-    'DataGenerator'
+    'DataGenerator',
+    'get_codec'
 ]
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+JSON 코덱 유틸리티
+orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 대체 (dumps는 UTF-8 bytes 반환)
+
+수집기(data_collector/src/codec.py)와 같은 직렬화 규칙을 따른다:
+- NaN/Infinity는 null
+- datetime/date/time은 isoformat() 문자열
+- numpy 스칼라/배열은 숫자/리스트
+- 문자열이 아닌 dict 키는 문자열 키
+"""
+
+import json
+import logging
+import math
+from datetime import date, datetime, time
+from typing import Any, Callable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _is_numpy(obj: Any) -> bool:
+    return type(obj).__module__ == "numpy" and hasattr(obj, "tolist")
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/Infinity → None"""
+    if _is_numpy(obj):
+        return _finite(obj.tolist())
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+class JSONCodec:
+    """표준 json 코덱"""
+
+    name = "json"
+
+    def __init__(self, default: Optional[Callable[[Any], Any]] = None):
+        self.default = default
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if _is_numpy(obj):
+            return obj.tolist()
+        if self.default is not None:
+            return self.default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                              allow_nan=False, default=self._default)
+        except ValueError:
+            text = json.dumps(_finite(obj), ensure_ascii=False, separators=(',', ':'),
+                              allow_nan=False, default=self._default)
+        return text.encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """orjson 코덱 (직렬화하지 못하는 값은 표준 json 경로로 다시 시도)"""
+
+    name = "orjson"
+
+    def __init__(self, default: Optional[Callable[[Any], Any]] = None):
+        import orjson
+        super().__init__(default)
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._orjson.dumps(obj, default=self.default, option=self._options)
+        except self._orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+
+def get_codec(name: str = "auto", default: Optional[Callable[[Any], Any]] = None) -> JSONCodec:
+    """설정 이름으로 코덱 생성 (auto | orjson | json, 그 외/미설치는 표준 json)"""
+    name = (name or "auto").lower()
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonCodec(default)
+        except ImportError:
+            if name == "orjson":
+                logger.warning("⚠️ orjson 미설치 - 표준 json 사용")
+    elif name != "json":
+        logger.warning(f"⚠️ 지원하지 않는 JSON 코덱 '{name}' - 표준 json 사용")
+    return JSONCodec(default)
+
+
+def available_codecs() -> List[str]:
+    """현재 환경에서 사용 가능한 코덱 이름 목록"""
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return ["json"]
+    return ["orjson", "json"]
@@ -3,20 +3,23 @@ MQTT 데이터 발행 유틸리티
 Raw 데이터만 전송 (KPI 계산 제거)
 """
 
-import json
 import time
 import logging
 from typing import Dict, Any, Optional
 import paho.mqtt.client as mqtt
+from .json_codec import get_codec
 
 class MQTTPublisher:
     """MQTT 데이터 발행기 - Raw 데이터 전용"""
     
-    def __init__(self, broker_host: str = "localhost", broker_port: int = 1883):
+    def __init__(self, broker_host: str = "localhost", broker_port: int = 1883, json_codec: str = "auto"):
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.connected = False
         
+        # JSON 코덱 (orjson 설치 시 사용, 없으면 표준 json)
+        self.codec = get_codec(json_codec, default=self._json_serializer)
+        
         # MQTT 클라이언트 초기화
         self.client = mqtt.Client(client_id=f"assembly_simulator_{int(time.time())}")
         self.client.on_connect = self._on_connect
@@ -30,7 +33,7 @@ class MQTTPublisher:
         # 로깅 설정
         self.logger = logging.getLogger(__name__)
         
-        print(f"📡 MQTT Publisher 초기화: {broker_host}:{broker_port}")
+        print(f"📡 MQTT Publisher 초기화: {broker_host}:{broker_port} (JSON: {self.codec.name})")
     
     def connect(self) -> bool:
         """MQTT 브로커에 연결"""
@@ -72,8 +75,8 @@ class MQTTPublisher:
             return False
         
         try:
-            # JSON 직렬화
-            payload = json.dumps(data, ensure_ascii=False, default=self._json_serializer)
+            # JSON 직렬화 (UTF-8 bytes)
+            payload = self.codec.dumps(data)
             
             # MQTT 발행
             result = self.client.publish(topic, payload, qos=qos, retain=retain)